@@ -2,13 +2,14 @@ from pygamehack.c import *
 from .struct import Struct
 from .reclassnet import ReClassNet
 from .struct_file import StructFile
-from .struct_meta import TypeWrapper, StructType
+from .struct_meta import StructMeta, TypeWrapper, StructType
 from .variable import Variable, ConstVariable, ListVariable, DictVariable
 from .code import Code, CodeFindConfig, CodeFindTarget, CodeFinder, CodeScanResult, CodeScanner
+from . import msvc, unreal
 
 __all__ = [
     # pygamehack.c
-    'Address', 'Buffer', 'Hack',
+    'Address', 'AddressTable', 'Buffer', 'Hack',
     'Process', 'ProcessInfo', 'MemoryScan',
     'Instruction', 'InstructionDecoder',
     'CheatEnginePointerScanSettings',
@@ -23,7 +24,7 @@ __all__ = [
     'Variable', 'ConstVariable',
     'ListVariable', 'DictVariable',
     # pygamehack extras
-    'Code', 'StructFile', 'ReClassNet',
+    'Code', 'StructFile', 'ReClassNet', 'msvc', 'unreal',
     'CodeFinder', 'CodeFindConfig', 'CodeFindTarget',
     'CodeScanner', 'CodeScanResult',
 ]
@@ -55,4 +56,79 @@ def _convert_arr_getitem(typ):
 
 arr.__class_getitem__ = _convert_arr_getitem
 
+
+# Array.as_records() decodes arrays of structs from local storage
+def _arr_as_records(self):
+    """
+    Decode every element of an array of structs into a dict that maps field names to values.
+    Fields are decoded from the local storage of the array, call 'read' first to fetch the array in a single read.
+    """
+    struct_type = getattr(self.value_type, 'type', self.value_type)
+    if not isinstance(struct_type, type) or not StructMeta.is_struct(struct_type):
+        raise RuntimeError("'as_records' can only be called on arrays of structs")
+
+    arch = 32 if self.address.hack.process.arch == Process.Arch.x86 else 64
+    names = list(StructMeta.struct(struct_type, arch).fields)
+    return [{name: getattr(element, name) for name in names} for element in self]
+
+
+arr.as_records = _arr_as_records
+
+
+# Array.gather() reads a value through each pointer of an array of pointers
+def _arr_gather(self, offsets, dtype, count=1, threaded=False):
+    """
+    Follow the pointer path 'offsets' from each pointer in an array of pointers and read 'count' values of type 'dtype' at the end of each path.
+    Pointers are taken from the local storage of the array, call 'read' first to fetch the array in a single read.
+    Returns tuple(values, valid), see Hack.gather.
+    """
+    value_type = self.value_type
+    if getattr(value_type, 'type', value_type) not in (ptr, usize) and not getattr(value_type, 'is_pointer', False):
+        raise RuntimeError("'gather' can only be called on arrays of pointers")
+    return self.address.hack.gather(self, offsets, dtype, count, threaded)
+
+
+arr.gather = _arr_gather
+
+
+# Hack.read_records() reads many structs into a numpy record array
+def _hack_read_records(self, struct_type, addresses, count=None, stride=0, buffer=None):
+    """
+    Read many instances of a struct into a numpy record array with the struct's dtype, without creating Struct objects (requires numpy).
+        read_records(MyStruct, addresses)           - Read one struct from each address, null/unreadable addresses are read as zeros
+        read_records(MyStruct, base, count, stride) - Read 'count' structs 'stride' bytes apart (default: the struct size) from 'base'
+    The records are stored in a new buffer that is released with the array, or in 'buffer' which can be reused across calls
+    (the array is a view of the buffer, so it is overwritten by the next call that uses the same buffer).
+    """
+    arch = 32 if self.process.arch == Process.Arch.x86 else 64
+    definition = StructMeta.struct(struct_type, arch)
+    if definition is None:
+        raise RuntimeError(f"'{getattr(struct_type, '__name__', struct_type)}' is not a defined struct")
+
+    from_addresses = count is None
+    if from_addresses:
+        addresses = addresses if isinstance(addresses, list) else list(addresses)
+        count, stride = len(addresses), definition.size
+        dtype = definition.dtype()
+    else:
+        stride = stride or definition.size
+        dtype = definition.dtype(stride)
+
+    if buffer is None:
+        buffer = Buffer(self, max(1, count * stride))
+    elif buffer.size < count * stride:
+        raise RuntimeError(f'Buffer of {buffer.size} bytes is too small for {count} records of {stride} bytes')
+
+    if from_addresses:
+        self.read_many(addresses, buffer, definition.size)
+    elif count:
+        # The padding after the last struct is not read, so the read does not cross into unmapped memory
+        buffer.read_from(addresses, (count - 1) * stride + definition.size)
+
+    import numpy
+    return numpy.frombuffer(buffer, dtype=dtype, count=count).view(numpy.recarray)
+
+
+Hack.read_records = _hack_read_records
+
 #endregion
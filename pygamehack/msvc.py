@@ -0,0 +1,379 @@
+import pygamehack.c as cgh
+from .struct_meta import StructMeta, StructType
+
+__all__ = [
+    'vector', 'list', 'set', 'map', 'unordered_set', 'unordered_map',
+    'string', 'wstring', 'pair'
+]
+
+_Containers = cgh.Hack.StlContainer
+
+
+# region Layout
+
+def _ptr_size(address):
+    return 4 if address.hack.process.arch == cgh.Process.Arch.x86 else 8
+
+
+def _align(offset, align):
+    return (offset + align - 1) // align * align
+
+
+def _layout(t, ptr_size):
+    """
+    Size and alignment of a value of the given type in a process with the given pointer size
+    """
+    if isinstance(t, pair):
+        (key_size, key_align), (value_size, value_align) = _layout(t.key, ptr_size), _layout(t.value, ptr_size)
+        align = max(key_align, value_align)
+        return _align(_align(key_size, value_align) + value_size, align), align
+
+    if isinstance(t, StructType):
+        field_type = t.container_type if t.is_container else t.type
+        if t.is_pointer or StructType.is_pointer_to_buffer(t.type):
+            return ptr_size, ptr_size
+        elif hasattr(field_type, 'field_size'):
+            return _layout(field_type, ptr_size)
+        elif t.is_buffer_class:
+            return t.element_size * t.element_count, 1
+        size, align = _layout(t.type, ptr_size)
+        return size * t.element_count, align
+
+    # Types whose size depends on the architecture are pointer aligned, unless they define their alignment
+    if hasattr(t, 'field_size'):
+        return t.field_size(ptr_size), t.field_align(ptr_size) if hasattr(t, 'field_align') else ptr_size
+
+    if StructMeta.is_struct(t):
+        definition = StructMeta.struct(t, 32 if ptr_size == 4 else 64)
+        align = max((_layout(f.type, ptr_size)[1] for f in definition.fields.values()), default=1)
+        return _align(definition.size, align), align
+
+    # ptr and usize do not have the 'size' property defined at compile time
+    size = getattr(t, 'size', ptr_size)
+    return size, size
+
+
+def _unwrap(t):
+    while isinstance(t, StructType) and not t.is_pointer and not t.is_container and not t.is_buffer_class:
+        t = t.type
+    return t
+
+
+# endregion
+
+# region Types
+
+class pair(object):
+    """
+    Element type of maps - std::pair<const Key, Value>
+    """
+
+    def __init__(self, key, value):
+        self.key = StructType.detect(key)
+        self.value = StructType.detect(value)
+
+    @property
+    def __name__(self):
+        return f'{self.key.__name__}, {self.value.__name__}'
+
+
+class _String(object):
+    """
+    Base of std::basic_string variables, which are read as python strings
+    """
+    char_size = 1
+    encoding = 'utf-8'
+
+    __slots__ = ('address', 'value')
+
+    def __init__(self, address, **kwargs):
+        self.address = address
+        self.value = ''
+
+    def __str__(self):
+        return self.value
+
+    @staticmethod
+    def field_size(ptr_size):
+        # union { buffer[16], pointer }, size, capacity
+        return 16 + 2 * ptr_size
+
+    @classmethod
+    def decode(cls, hack, addresses, max_size=0):
+        return [s.decode(cls.encoding, errors='replace') for s in hack.read_stl_strings(addresses, cls.char_size, max_size)]
+
+    def get(self):
+        return self.value
+
+    def read(self, max_size=0):
+        if not self.address.loaded:
+            self.address.load()
+        self.value = self.decode(self.address.hack, [self.address.value], max_size)[0]
+        return self.value
+
+    def write(self, value):
+        raise RuntimeError('Writing to MSVC standard library strings is not supported')
+
+    def reset(self):
+        self.value = ''
+
+
+class string(_String):
+    """
+    std::string
+    """
+    __slots__ = ()
+
+
+class wstring(_String):
+    """
+    std::wstring
+    """
+    char_size = 2
+    encoding = 'utf-16-le'
+    __slots__ = ()
+
+
+# endregion
+
+# region Containers
+
+class _Container(object):
+    """
+    Base of the variables of MSVC standard library containers (release build layout).
+
+    The elements are read with 'Hack.read_stl' in native code into local storage when 'read' is called,
+    and are decoded into values (basic types and strings), struct views (structs) or variables (everything else) when they are accessed.
+    Struct elements are buffer struct views of the local storage, without an address, so they are refreshed by reading the container.
+    """
+    container = None
+
+    __slots__ = ('address', 'value_type', '_storage', '_addresses', '_elements')
+
+    def __init__(self, address, count=1, **kwargs):
+        self.address = address
+        self.value_type = kwargs['type']
+        self._storage = None
+        self._addresses = []
+        self._elements = None
+
+    def __class_getitem__(cls, t):
+        return StructType(t, StructType.LAZY_SIZE, 1, container_type=cls)
+
+    def __len__(self):
+        return len(self._addresses)
+
+    @staticmethod
+    def field_size(ptr_size):
+        # _Myhead, _Mysize
+        return 2 * ptr_size
+
+    @property
+    def addresses(self):
+        return self._addresses
+
+    @property
+    def storage(self) -> cgh.Buffer:
+        return self._storage.get() if self._storage is not None else None
+
+    @property
+    def value_layout(self):
+        return _layout(self.value_type, _ptr_size(self.address))
+
+    def get(self):
+        return self
+
+    def read(self, max_size=0):
+        if not self.address.loaded:
+            self.address.load()
+        size, align = self.value_layout
+        self._addresses = self.address.hack.read_stl(self.container, self.address.value, self._local_storage(size), size, align, max_size)
+        self._elements = None
+        return self
+
+    def write(self, value):
+        raise RuntimeError('Writing to MSVC standard library containers is not supported')
+
+    def reset(self):
+        self._storage = None
+        self._addresses = []
+        self._elements = None
+
+    def _local_storage(self, size):
+        # The local storage is a buffer variable of the container, so that struct elements can be views of it
+        if self._storage is None:
+            self._storage = cgh.buf(self.address, max(1, size))
+        return self._storage.get()
+
+    def _view(self, t, offset, stride):
+        name = t.__name__
+        if name == 'ptr':
+            name = 'u32' if _ptr_size(self.address) == 4 else 'u64'
+        return self.storage.view(name, offset, [len(self)], [stride])
+
+    def _decode(self, t, offset):
+        # Values of the component of type 't' at 'offset' in each element
+        t = _unwrap(t)
+        hack = self.address.hack
+        stride, _ = self.value_layout
+        if not self._addresses:
+            return []
+        elif StructMeta.is_struct(t):
+            return [t(None, buffer=True, parent_buffer=self._storage, offset_in_parent=i * stride + offset)
+                    for i in range(len(self._addresses))]
+        elif isinstance(t, type) and hasattr(t, 'decode'):
+            return t.decode(hack, [a + offset for a in self._addresses])
+        elif StructType.is_basic_type(t) and not StructType.is_buffer_subclass(t):
+            return self._view(t, offset, stride).tolist()
+        elif isinstance(t, StructType) and t.is_pointer:
+            pointers = self._view(cgh.ptr, offset, stride).tolist()
+            return [t.type(cgh.Address(hack, p)) if p else None for p in pointers]
+        else:
+            return [t(cgh.Address(hack, a + offset)) for a in self._addresses]
+
+
+class _SequenceContainer(_Container):
+    __slots__ = ()
+
+    def array(self):
+        """
+        Elements as a typed array over the local storage, a memoryview for basic types and a numpy record array for structs
+        """
+        t = _unwrap(self.value_type)
+        size, _ = self.value_layout
+        if StructMeta.is_struct(t):
+            import numpy
+            dtype = StructMeta.struct(t, 8 * _ptr_size(self.address)).dtype(size)
+            return numpy.frombuffer(self.storage, dtype=dtype, count=len(self)).view(numpy.recarray)
+        return self._view(t, 0, size)
+
+    def __getitem__(self, i):
+        return self.elements[i]
+
+    def __iter__(self):
+        return iter(self.elements)
+
+    @property
+    def elements(self):
+        if self._elements is None:
+            self._elements = self._decode(self.value_type, 0)
+        return self._elements
+
+
+class _MapContainer(_Container):
+    __slots__ = ()
+
+    def __class_getitem__(cls, kv):
+        return StructType(pair(*kv), StructType.LAZY_SIZE, 1, False, container_type=cls)
+
+    def __getitem__(self, key):
+        return self.elements[key]
+
+    def __contains__(self, key):
+        return key in self.elements
+
+    def __iter__(self):
+        return iter(self.elements)
+
+    @property
+    def value_offset(self):
+        ptr_size = _ptr_size(self.address)
+        key_size, _ = _layout(self.value_type.key, ptr_size)
+        _, value_align = _layout(self.value_type.value, ptr_size)
+        return _align(key_size, value_align)
+
+    @property
+    def elements(self) -> dict:
+        if self._elements is None:
+            keys = self._decode(self.value_type.key, 0)
+            values = self._decode(self.value_type.value, self.value_offset)
+            self._elements = dict(zip(keys, values))
+        return self._elements
+
+    def keys(self):
+        return self.elements.keys()
+
+    def values(self):
+        return self.elements.values()
+
+    def items(self):
+        return self.elements.items()
+
+
+class vector(_SequenceContainer):
+    """
+    std::vector<T> - read with a single read
+
+    Usage:
+        class MyStruct(gh.Struct):
+            values: gh.msvc.vector[gh.u32] = 0x10
+
+        values = MyStruct(address).values.read()
+        values[0], values.array()
+    """
+    container = _Containers.Vector
+    __slots__ = ()
+
+    @staticmethod
+    def field_size(ptr_size):
+        # _Myfirst, _Mylast, _Myend
+        return 3 * ptr_size
+
+
+class list(_SequenceContainer):
+    """
+    std::list<T> - read one node at a time in list order
+    """
+    container = _Containers.List
+    __slots__ = ()
+
+
+class set(_SequenceContainer):
+    """
+    std::set<T> - read one level of the tree at a time, elements are in key order
+    """
+    container = _Containers.Map
+    __slots__ = ()
+
+
+class unordered_set(_SequenceContainer):
+    """
+    std::unordered_set<T> - read one node of every bucket at a time, elements are in bucket order
+    """
+    container = _Containers.UnorderedMap
+    __slots__ = ()
+
+    @staticmethod
+    def field_size(ptr_size):
+        # _Max_bucket_size (padded to a pointer), _List, _Vec, _Mask, _Maxidx
+        return 8 * ptr_size
+
+
+class map(_MapContainer):
+    """
+    std::map<K, V> - read one level of the tree at a time
+
+    Usage:
+        class MyStruct(gh.Struct):
+            players: gh.msvc.map[gh.u32, Player] = 0x10
+
+        players = MyStruct(address).players.read()
+        players[1].health, dict(players.items())
+    """
+    container = _Containers.Map
+    __slots__ = ()
+
+
+class unordered_map(_MapContainer):
+    """
+    std::unordered_map<K, V> - read one node of every bucket at a time
+    """
+    container = _Containers.UnorderedMap
+    __slots__ = ()
+
+    @staticmethod
+    def field_size(ptr_size):
+        return 8 * ptr_size
+
+
+# endregion
@@ -48,6 +48,10 @@ class Struct(ABC, metaclass=StructMeta):
     def clear_types():
         StructMeta.clear_types()
 
+    @staticmethod
+    def cached(path: str, cache_path: Optional[str] = None):
+        return StructMeta.cached(path, cache_path)
+
     @staticmethod
     def is_struct(o: Union['Struct', StructMeta]):
         return StructMeta.is_struct(o)
@@ -64,9 +68,11 @@ class Struct(ABC, metaclass=StructMeta):
     def walk(struct: 'Struct'):
         return StructMeta.walk(struct)
 
+    # Instances have a fixed layout (address, buffer, size and the variables of the fields that have been accessed)
+    __slots__ = StructMeta.slots(())
+
     # These definitions are never used, they are provided for documentation purposes
 
-    size = 0
     _info = StructInfo()
 
     def __init__(self, address: Optional[Address], *args, **kwargs):
@@ -75,16 +81,23 @@ class Struct(ABC, metaclass=StructMeta):
     def dataclass(self, **properties) -> StructData:
         return StructData(self.__class__)
 
+    @staticmethod
+    def dtype(arch: int, itemsize: int = 0):
+        return None
+
     def get(self) -> 'Struct':
         return self
 
-    def read(self) -> 'Struct':
+    def read(self, mode: Optional[str] = None, depth: int = 0) -> 'Struct':
+        return self
+
+    def snapshot(self, enabled: bool = True) -> 'Struct':
         return self
 
     def write(self, value: Union['Struct', StructData]):
         return
 
-    def flush(self):
+    def flush(self, all: bool = False, depth: int = 0):
         return
 
     def reset(self):
@@ -6,6 +6,7 @@ from typing import List, Tuple, Union
 
 from pygamehack.c import Address
 from .code import Code
+from .struct_meta import StructMeta
 from .struct_parser import *
 
 __all__ = [
@@ -110,11 +111,13 @@ class StructFileImpl(object):
         self.imported_name = StructFileImpl.detect_imported_name(str(self.path), self.src, 'pygamehack')
 
     def load_module(self):
-        if self.module:
-            importlib.reload(self.module)
-        else:
-            with StructFileImpl.working_directory(self.path.cwd()):
-                self.module = importlib.import_module(self.path.stem)
+        # Struct definitions are loaded from a cache on disk when the file has not changed
+        with StructMeta.cached(self.path):
+            if self.module:
+                importlib.reload(self.module)
+            else:
+                with StructFileImpl.working_directory(self.path.cwd()):
+                    self.module = importlib.import_module(self.path.stem)
 
     def load_classes(self):
         all_classes = string_to_classes(self.src)
@@ -1,5 +1,13 @@
+import hashlib
+import importlib.util
 import inspect
+import marshal
+import pathlib
+import pickle
+import weakref
 from abc import ABCMeta, abstractmethod
+from collections import deque
+from collections.abc import Mapping
 import pygamehack.c as cgh
 
 __all__ = [
@@ -35,31 +43,63 @@ class StructMeta(ABCMeta):
             my_struct: MyStructChild = 0x1C
     """
 
+    # Largest size of the struct across architectures, stored on the class so instances can have a 'size' slot.
+    # Pending definitions are parsed first, unless a definition is being parsed (which sets the sizes itself)
+    @property
+    def size(cls) -> int:
+        if '_struct_size' not in cls.__dict__ and not _StructDefinitions.arch:
+            for arch in _StructDefinitions.pending:
+                _StructDefinitions.define_pending(arch)
+        return getattr(cls, '_struct_size', 0)
+
+    @size.setter
+    def size(cls, value: int):
+        cls._struct_size = value
+
     @staticmethod
     def clear_types():
         _StructDefinitions.to_define.clear()
+        _StructDefinitions.graph = StructDependencies()
+        for pending in _StructDefinitions.pending.values():
+            pending.clear()
         for definitions in [_defined_32, _defined_64]:
             definitions.defined.clear()
             definitions.defined_by_name.clear()
             definitions.dependencies.clear()
 
+    @staticmethod
+    def cached(path, cache_path=None) -> '_StructCache':
+        """
+        Context manager that defines the structs created inside of it from a definition cache on disk.
+        The cache of a struct file is keyed by the contents of the file and the pygamehack version,
+        and is stored in '__pycache__/<name>.pygamehack.cache' next to the file by default.
+        Structs are defined when the context exits.
+
+        Usage:
+            with gh.StructMeta.cached('my_structs.py'):
+                import my_structs
+        """
+        return _StructCache(path, cache_path)
+
     @staticmethod
     def is_struct(cls) -> bool:
         return hasattr(cls, '__is_struct_type') or hasattr(cls.__class__, '__is_struct_type')
 
     @staticmethod
     def struct(cls: 'StructMeta', arch: int) -> 'StructDefinition':
+        _StructDefinitions.define_pending(arch)
         return _StructDefinitions.defs(arch).defined.get(cls, None)
 
     @staticmethod
     def named(name: str, arch: int) -> 'StructDefinition':
+        _StructDefinitions.define_pending(arch)
         return _StructDefinitions.defs(arch).defined_by_name.get(name, None)
 
     @staticmethod
     def iter_variables(struct):
         if hasattr(struct, 'buffer'):
             arch = 32 if struct.buffer.address.hack.process.arch == cgh.Process.Arch.x86 else 64
-            definition = _StructDefinitions.defs(arch).defined.get(struct.__class__, None)
+            definition = StructMeta.struct(struct.__class__, arch)
             if definition is not None:
                 for name, field in definition.fields.items():
                     yield name, field
@@ -73,7 +113,7 @@ class StructMeta(ABCMeta):
         def _recurse(k, s, p):
             yield k, s, p
             if StructMeta.is_struct(s) and not s._info.is_custom_type:
-                for sk, sv in s.variables.items():
+                for sk, sv in s.variables.materialised():
                     for gk, gv, gp in _recurse(sk, sv, s):
                         yield gk, gv, gp
 
@@ -113,6 +153,7 @@ class StructMeta(ABCMeta):
             return super().__new__(mcs, name, bases, attrs)
 
         definition = {k: v for k, v in attrs.items() if StructDefinition.is_struct_offset(v) or k == '__init__'}
+        definition['__slots__'] = attrs.get('__slots__', StructMeta.slots(bases))
         definition['_info'] = StructInfo()
         definition['_info'].arch = kwargs.get('architecture', 'all')
         definition['__is_struct_type'] = True  # dummy property used to detect struct types
@@ -120,24 +161,35 @@ class StructMeta(ABCMeta):
         subclass = super().__new__(mcs, name, bases, definition)
         return subclass
 
+    @staticmethod
+    def slots(bases):
+        # Root structs get the instance layout, derived structs only add their fields (which are class properties).
+        # Custom types are declared with 'define=False' and without '__slots__', so they keep a '__dict__' for their own state
+        if any(isinstance(b, StructMeta) for b in bases):
+            return ()
+        return _StructMethods.slots
+
     # Called when a new TYPE is INSTANTIATED (where TYPE is defined, after this you can make instances of the TYPE)
     def __init__(cls, name, bases, attrs, **kwargs):
         if name == 'Struct':
             super().__init__(name, bases, attrs)
             return
 
-        _StructDefinitions.to_define.append(cls)
-        _StructDefinitions.add_definitions_for_class(cls)
         _StructDefinitions.configure_class(cls, attrs, kwargs)
+        StructDefinition.check_class(cls)
+        _StructDefinitions.to_define.append(cls)
 
         if not cls._info.is_custom_type:
             cls.__init__ = _StructMethods.init
             cls.__str__ = _StructMethods.str
             cls.read = _StructMethods.read
+            cls.snapshot = _StructMethods.snapshot
             cls.write = _StructMethods.write
             cls.flush = _StructMethods.flush
             cls.reset = _StructMethods.reset
+            cls.variables = _StructMethods.variables
             cls.dataclass = lambda **kw: StructData.create(cls, **kw)
+            cls.dtype = staticmethod(lambda arch, itemsize=0: StructMeta.struct(cls, arch).dtype(itemsize))
 
         super().__init__(name, bases, attrs, **kwargs)
 
@@ -149,6 +201,7 @@ class StructMeta(ABCMeta):
 # region StructData
 
 class StructData(object):
+    __slots__ = ('_cls',)
 
     def __init__(self, cls):
         self._cls = cls
@@ -158,7 +211,7 @@ class StructData(object):
 
     @staticmethod
     def create(cls, **kwargs):
-        data = StructData(cls)
+        data = StructData.data_type(cls)(cls)
         for k, t in cls.__annotations__.items():
             if k not in kwargs:
                 defined_factory = getattr(t, 'default_factory', lambda: None)
@@ -168,6 +221,17 @@ class StructData(object):
                 setattr(data, k, kwargs[k])
         return data
 
+    @staticmethod
+    def data_type(cls):
+        # Subclass with one slot per field of the struct, created on first use
+        data_type = StructData._data_types.get(cls)
+        if data_type is None:
+            data_type = type(f'{cls.__name__}Data', (StructData,), {'__slots__': tuple(cls.__annotations__)})
+            StructData._data_types[cls] = data_type
+        return data_type
+
+    _data_types = weakref.WeakKeyDictionary()
+
     _default_factories = {
         k: {
             'i': int, 'u': int, 'p': int,
@@ -184,12 +248,14 @@ class StructData(object):
 
 class StructDefinition(object):
 
-    def __init__(self, cls):
+    def __init__(self, cls, arch):
         self.size = 0
+        self.arch = arch
         self.cls = cls
         self.info = self.cls._info
         self.fields = {}
-        self.offsets = {}
+        self.offsets = {k: list(v) if isinstance(v, list) else v for k, v in self.info.offsets.items()}
+        self.snapshot_span = (0, 0)
 
     def __repr__(self):
         s = self.cls.__name__ + f'(size={self.size}):\n'
@@ -250,14 +316,10 @@ class StructDefinition(object):
             if name not in self.offsets:
                 raise RuntimeError(f'Did not define offset for property: {self.cls.__name__}.{name}')
 
-            # Create field
+            # Create field (properties are generated once all architectures are defined)
             field = _StructField(name, t, self, field_indexes[name])
             self.fields[name] = field
 
-            # Create property for field
-            prop = _StructProperty(field, field.getter, field.setter)
-            setattr(self.cls, name, prop)
-
             # Pointers require an extra read with no offset to get the value pointed at by the address
             t = field.type
             while t and getattr(t, 'is_pointer', False):
@@ -270,6 +332,101 @@ class StructDefinition(object):
             self.size = max(self.size, self.offsets[name][0] + self.fields[name].size)
         self.cls.size = max(self.cls.size, self.size)
 
+        # Minimal span that covers every field that can be read from a snapshot
+        spans = [(self.offsets[f.name][0], self.offsets[f.name][0] + f.size) for f in self.fields.values() if f.is_snapshot_field]
+        if spans:
+            self.snapshot_span = (min(b for b, _ in spans), max(e for _, e in spans))
+
+    def dtype(self, itemsize=0):
+        """
+        Create a numpy structured dtype with the memory layout of this struct (requires numpy).
+        Every field must be stored inside of the struct: basic types, pointers (as their address) and nested structs.
+        If 'itemsize' is not 0, each record is padded to 'itemsize' bytes (e.g. the stride of an array of structs).
+        """
+        np = _import_numpy()
+        if itemsize and itemsize < self.size:
+            raise RuntimeError(f'dtype itemsize ({itemsize}) is smaller than {self.cls.__name__} ({self.size})')
+
+        names, formats, offsets = [], [], []
+        for name, field in self.fields.items():
+            names.append(name)
+            formats.append(self._field_dtype(field))
+            offsets.append(self.offsets[name][0])
+
+        return np.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': itemsize or self.size})
+
+    def _field_dtype(self, field):
+        t = field.type
+        ptr_format = 'u4' if self.arch == 32 else 'u8'
+
+        pointer_depth = 0
+        pointee = t
+        while pointee and getattr(pointee, 'is_pointer', False):
+            pointer_depth += 1
+            pointee = getattr(pointee, 'type', None)
+
+        if len(self.offsets[field.name]) != 1 + pointer_depth or t.is_container:
+            raise RuntimeError(f'Cannot create dtype for {self.cls.__name__}.{field.name}: {t.name}, '
+                               f'only fields stored inside of the struct are supported')
+
+        if pointer_depth or StructType.is_pointer_to_buffer(t.type):
+            return ptr_format
+        elif t.is_buffer_class:
+            return f'S{t.size}' if issubclass(t.type, cgh.str) else f'V{t.size}'
+        elif t.is_basic:
+            return _StructDefinitions.dtype_formats.get(t.__name__, ptr_format)
+        else:
+            struct_type = t.type
+            while isinstance(struct_type, StructType):
+                struct_type = struct_type.type
+            return StructMeta.struct(struct_type, self.arch).dtype()
+
+    def load_cached(self, cached):
+        # Equivalent to 'parse_dependencies', 'parse_fields' and 'parse_size' with the offsets and sizes that they produced
+        StructDefinition._update_with_dicts_of_bases(
+            self.cls, self.arch,
+            self.cls.__annotations__, lambda s: s.cls.__annotations__)
+
+        self.info.is_pod_type = cached['is_pod_type']
+        self.offsets = {name: list(offsets) for name, offsets in cached['offsets'].items()}
+        field_indexes = {name: index for index, name in enumerate(self.offsets)}
+        for name, t in self.cls.__annotations__.items():
+            self.fields[name] = _StructField(name, t, self, field_indexes[name])
+
+        self.size = cached['size']
+        self.snapshot_span = tuple(cached['snapshot_span'])
+
+    def dump_cached(self):
+        return {
+            'is_pod_type': self.info.is_pod_type,
+            'offsets': self.offsets,
+            'size': self.size,
+            'snapshot_span': self.snapshot_span,
+        }
+
+    @staticmethod
+    def check_class(cls):
+        # Errors that do not depend on the architecture are raised when the struct is created, not when it is defined
+        offsets = {}
+        for base in reversed(cls.__mro__):
+            if StructMeta.is_struct(base) and '_info' in base.__dict__:
+                offsets.update(base._info.offsets)
+
+        seen_offsets = {}
+        for name, offset in offsets.items():
+            first = offset[0] if isinstance(offset, list) else offset
+            if first in seen_offsets:
+                raise RuntimeError(f'Duplicate offsets: {cls.__name__}.{name} and '
+                                   f'{cls.__name__}.{seen_offsets[first]} - {hex(first)}')
+            seen_offsets[first] = name
+
+        for name, t in cls.__annotations__.items():
+            if name not in offsets:
+                raise RuntimeError(f'Did not define offset for property: {cls.__name__}.{name}')
+            # Forward declarations can only be resolved when the struct is defined
+            if isinstance(t, type) or (isinstance(t, tuple) and not any(isinstance(i, str) for i in t)):
+                StructType.detect(t)
+
     @staticmethod
     def is_struct_offset(value):
         return isinstance(value, int) or (isinstance(value, list) and all(isinstance(i, int) for i in value))
@@ -289,7 +446,9 @@ class StructDefinition(object):
 class StructInfo(object):
     def __init__(self):
         self.arch = 'all'
+        self.offsets = {}
         self.line_defined = 0
+        self.file_defined = None
         self.is_custom_type = False
         self.is_pod_type = False
 
@@ -353,7 +512,16 @@ class StructType(object):
 
     @property
     def size(self):
-        if self.element_size == StructType.LAZY_SIZE:
+        # Pointers to buffers only occupy a pointer in their parent, the buffer is stored separately
+        if self.is_buffer_class and StructType.is_pointer_to_buffer(self.type):
+            return _StructDefinitions.ptr_size * self.element_count
+        # Types whose size depends on the architecture, like the containers of 'pygamehack.msvc'
+        elif hasattr(self.container_type if self.is_container else self.type, 'field_size'):
+            field_type = self.container_type if self.is_container else self.type
+            return field_type.field_size(_StructDefinitions.ptr_size) * self.element_count
+        elif self.definition_size is not None:
+            return self.definition_size * self.element_count
+        elif self.element_size == StructType.LAZY_SIZE:
             if self.is_pointer:
                 return _StructDefinitions.ptr_size
             else:
@@ -363,6 +531,17 @@ class StructType(object):
         else:
             return (self.element_size or self.type.size) * self.element_count
 
+    @property
+    def definition_size(self):
+        # Size of a struct type for the architecture that is being defined, since 'cls.size' is the largest of all architectures
+        t = self
+        while isinstance(t, StructType) and not t.is_pointer and not t.is_container:
+            t = t.type
+        if not _StructDefinitions.arch or isinstance(t, StructType) or not isinstance(t, type) or not StructMeta.is_struct(t):
+            return None
+        definition = _StructDefinitions.defs(_StructDefinitions.arch).defined.get(t)
+        return definition.size if definition is not None else None
+
     @property
     def name(self):
         if self.is_pointer:
@@ -383,6 +562,10 @@ class StructType(object):
             return any(issubclass(getattr(cgh, n, object), cls) for n in ['buf', 'p_buf', 'str', 'c_str'])
         return False
 
+    @staticmethod
+    def is_pointer_to_buffer(cls):
+        return isinstance(cls, type) and issubclass(cls, cgh.p_buf)
+
     @staticmethod
     def is_compound_type_tuple(typ: tuple):
         return len(typ) == 2 and (typ[1] == cgh.ptr.Tag or StructType.is_buffer_subclass(typ[0]))
@@ -513,6 +696,14 @@ class _StructDefinitions(object):
     arch = 0
     ptr_size = 0
     to_define = []
+    graph = None  # StructDependencies of every declared struct, created below
+    pending = {32: [], 64: []}
+    deferred = False
+    dtype_formats = {
+        'i8': 'i1', 'i16': 'i2', 'i32': 'i4', 'i64': 'i8',
+        'u8': 'u1', 'u16': 'u2', 'u32': 'u4', 'u64': 'u8',
+        'bool': '?', 'float': 'f4', 'double': 'f8'
+    }
 
     def __init__(self):
         self.defined = {}
@@ -524,62 +715,70 @@ class _StructDefinitions(object):
         return _defined_32 if arch == 32 else _defined_64
 
     @staticmethod
-    def define_types(arch: int):
+    def define_types(arch: int, classes):
         assert arch == 32 or arch == 64, "Architecture must be 32 or 64"
         _StructDefinitions.ptr_size = 4 if arch == 32 else 8
         _StructDefinitions.arch = arch
 
         definitions = _StructDefinitions.defs(arch)
 
-        for cls in _StructDefinitions.to_define:
-            definition = definitions.defined[cls]
+        for cls in classes:
+            definition = definitions.defined[cls] = StructDefinition(cls, arch)
             definitions.defined_by_name[cls.__name__] = definition
             definitions.dependencies[cls.__name__] = definition.parse_dependencies()
 
-        StructDependencies.sort(_StructDefinitions.to_define, definitions.dependencies,
-                                 get_key=lambda t: t.__name__)
+        StructDependencies.sort(classes, definitions.dependencies, get_key=lambda t: t.__name__)
 
-        for cls in _StructDefinitions.to_define:
-            StructMeta.struct(cls, arch).parse_fields()
+        for cls in classes:
+            definitions.defined[cls].parse_fields()
 
-        for cls in _StructDefinitions.to_define:
-            StructMeta.struct(cls, arch).parse_size()
+        for cls in classes:
+            definitions.defined[cls].parse_size()
 
         _StructDefinitions.ptr_size = 0
         _StructDefinitions.arch = 0
 
     @staticmethod
-    def add_definitions_for_class(cls: 'StructMeta'):
-        arches = [32, 64]
-        defs = [StructDefinition(cls), StructDefinition(cls)]
-        for d, arch in zip(defs, arches):
-            _StructDefinitions.defs(arch).defined[cls] = d
+    def define_pending(arch: int):
+        # Structs are only defined for an architecture when they are first used with it
+        groups = _StructDefinitions.pending.get(arch)
+        if not groups:
+            return
+
+        _StructDefinitions.pending[arch] = []
+        for classes in groups:
+            _StructDefinitions.define_types(arch, classes)
+            for cls in classes:
+                _StructAccessors.define(cls)
 
     @staticmethod
     def configure_class(cls: 'StructMeta', attrs, kwargs):
         cls.__annotations__ = attrs.get('__annotations__', {})
         cls._info = getattr(cls, '_info', StructInfo())
-        cls._info.line_defined = inspect.getouterframes(inspect.currentframe())[1].lineno  # gets line of class def
+        cls._info.line_defined = inspect.currentframe().f_back.f_lineno  # gets line of class def
+        # The class statement runs in the caller of the metaclass, its file is part of the key of definition caches
+        class_frame = inspect.currentframe().f_back.f_back
+        cls._info.file_defined = class_frame.f_code.co_filename if class_frame is not None else None
         cls._info.is_custom_type = kwargs.pop('custom', cls._info.is_custom_type)
-        for arch in [32, 64]:
-            offsets_from_attrs = {k: v for k, v in attrs.items() if StructDefinition.is_struct_offset(v)}
-            StructMeta.struct(cls, arch).offsets.update(offsets_from_attrs)
+        cls._info.offsets = {k: v for k, v in attrs.items() if StructDefinition.is_struct_offset(v)}
+
+    @staticmethod
+    def check_arch(cls: 'StructMeta'):
+        if cls._info.arch not in ['all', 'x86', 'x64']:
+            raise RuntimeError(f"Invalid architecture: {cls._info.arch} - must be one of ['all', 'x86', 'x64']")
+        return [a for a, n in [(32, 'x86'), (64, 'x64')] if cls._info.arch in ['all', n]]
 
     @staticmethod
     def check_dependencies_define(cls: 'StructMeta'):
-        if not StructDependencies.has_unresolved(
-                _StructDefinitions.to_define,
-                get_key=lambda c: c.__name__,
-                get_types=lambda c: c.__annotations__
-        ):
-            if cls._info.arch not in ['all', 'x86', 'x64']:
-                raise RuntimeError(f"Invalid architecture: {cls._info.arch} - must be one of ['all', 'x86', 'x64']")
+        _StructDefinitions.graph.add(cls)
 
-            if cls._info.arch == 'all' or cls._info.arch == 'x86':
-                _StructDefinitions.define_types(32)
+        # Structs created in a 'StructMeta.cached' context are defined together when the context exits
+        if _StructDefinitions.deferred:
+            return
 
-            if cls._info.arch == 'all' or cls._info.arch == 'x64':
-                _StructDefinitions.define_types(64)
+        if not _StructDefinitions.graph.unresolved:
+            for arch in _StructDefinitions.check_arch(cls):
+                _StructDefinitions.pending[arch].append(list(_StructDefinitions.to_define))
 
             _StructDefinitions.to_define.clear()
 
@@ -588,6 +787,169 @@ _defined_32 = _StructDefinitions()
 _defined_64 = _StructDefinitions()
 
 
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("numpy is required for struct dtypes, install it with 'pip install numpy'") from None
+    return numpy
+
+
+# endregion
+
+# region _StructCache
+
+class _StructCache(object):
+    """
+    Defines the structs created while it is active, from the resolved definitions (dependency order, offsets, sizes
+    and compiled accessors) stored on disk when the cache key matches, and by parsing them (then storing them) otherwise.
+    """
+
+    FORMAT = 2
+
+    def __init__(self, path, cache_path=None):
+        self.path = pathlib.Path(path)
+        self.cache_path = pathlib.Path(cache_path) if cache_path else \
+            self.path.parent / '__pycache__' / f'{self.path.stem}.pygamehack.cache'
+        self.key = None
+        self.hit = False
+        self._active = False
+
+    def __enter__(self):
+        # Nested contexts are defined by the outermost one
+        self._active = not _StructDefinitions.deferred
+        if self._active:
+            _StructDefinitions.deferred = True
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if not self._active:
+            return False
+        _StructDefinitions.deferred = False
+        if exc_type is not None:
+            _StructDefinitions.to_define.clear()
+            _StructDefinitions.graph.clear_unresolved()
+            return False
+
+        classes = _StructDefinitions.to_define
+        if not classes:
+            return False
+
+        arches = sorted(set(a for cls in classes for a in _StructDefinitions.check_arch(cls)))
+        names = [cls.__name__ for cls in classes]
+        self.key = self.make_key(classes)
+        cached = self.load() if self.key is not None else None
+
+        self.hit = cached is not None and len(set(names)) == len(names) \
+            and cached.get('arches') == arches and set(cached.get('classes', ())) == set(names)
+
+        # Structs created before the context are defined first, since these can depend on them
+        for arch in arches:
+            _StructDefinitions.define_pending(arch)
+
+        if self.hit:
+            sizes = [cls.size for cls in classes]
+            try:
+                self.define_cached(cached, arches)
+            except Exception:
+                # Any entry that cannot be loaded is a miss, the structs are parsed again and the cache is rewritten
+                self.hit = False
+                _StructDefinitions.ptr_size = 0
+                _StructDefinitions.arch = 0
+                for cls, size in zip(classes, sizes):
+                    cls.size = size
+
+        if not self.hit:
+            for arch in arches:
+                _StructDefinitions.define_types(arch, classes)
+            codes = {cls.__name__: _StructAccessors.define(cls) for cls in classes}
+            if self.key is not None and len(set(names)) == len(names):
+                self.store(arches, codes)
+
+        classes.clear()
+        _StructDefinitions.graph.clear_unresolved()
+        return False
+
+    def make_key(self, classes):
+        # Structs can be declared in modules that are first imported inside the context, so the key covers the source of
+        # every file that declares one of them. Structs without a readable source file (e.g. from exec) are never cached
+        paths = {self.path.resolve()}
+        for cls in classes:
+            if cls._info.file_defined is None:
+                return None
+            paths.add(pathlib.Path(cls._info.file_defined).resolve())
+
+        # Cached accessors are marshalled bytecode, which is only valid for the interpreter that compiled it
+        data = f'{_StructCache.FORMAT}:{getattr(cgh, "__version__", "dev")}:'.encode() + importlib.util.MAGIC_NUMBER
+        try:
+            for path in sorted(paths):
+                source = path.read_bytes()
+                data += len(source).to_bytes(8, 'little') + source
+        except OSError:
+            return None
+        return hashlib.sha256(data).hexdigest()
+
+    def define_cached(self, cached, arches):
+        order = {name: i for i, name in enumerate(cached['order'])}
+        _StructDefinitions.to_define.sort(key=lambda c: order[c.__name__])
+
+        for arch in arches:
+            _StructDefinitions.ptr_size = 4 if arch == 32 else 8
+            _StructDefinitions.arch = arch
+            definitions = _StructDefinitions.defs(arch)
+
+            for cls in _StructDefinitions.to_define:
+                definitions.defined[cls] = StructDefinition(cls, arch)
+                definitions.defined_by_name[cls.__name__] = definitions.defined[cls]
+                definitions.dependencies[cls.__name__] = set(cached['classes'][cls.__name__]['dependencies'])
+
+            for cls in _StructDefinitions.to_define:
+                definitions.defined[cls].load_cached(cached['classes'][cls.__name__]['definitions'][arch])
+
+            _StructDefinitions.ptr_size = 0
+            _StructDefinitions.arch = 0
+
+        for cls in _StructDefinitions.to_define:
+            entry = cached['classes'][cls.__name__]
+            cls.size = max(cls.size, entry['size'])
+            _StructAccessors.define(cls, marshal.loads(entry['code']) if entry['code'] else None)
+
+    def load(self):
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, AttributeError, ImportError, IndexError, TypeError):
+            # Corrupt or truncated files, and files that refer to objects that do not exist anymore
+            return None
+        return cached if isinstance(cached, dict) and cached.get('key') == self.key else None
+
+    def store(self, arches, codes):
+        classes = {}
+        for cls in _StructDefinitions.to_define:
+            name = cls.__name__
+            classes[name] = {
+                'size': cls.size,
+                'code': marshal.dumps(codes[name]) if codes[name] else None,
+                'dependencies': sorted(_StructDefinitions.defs(arches[0]).dependencies.get(name, set())),
+                'definitions': {arch: StructMeta.struct(cls, arch).dump_cached() for arch in arches},
+            }
+
+        cached = {
+            'key': self.key,
+            'arches': arches,
+            'order': [cls.__name__ for cls in _StructDefinitions.to_define],
+            'classes': classes,
+        }
+
+        # The cache is only an optimization, structs are still defined when it cannot be written
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, 'wb') as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
+
+
 # endregion
 
 # region _StructMethods
@@ -596,10 +958,12 @@ class _StructMethods(object):
 
     # TODO: Equality and hashing
 
+    # Instance layout of structs, materialised field variables are stored in '_fields' at the index of their field
+    slots = ('address', 'buffer', 'size', '_arch', '_buffer', '_snapshot', '_definition', '_fields', '_kwargs')
+
     @staticmethod
     def init(self, address, *args, **kwargs):
         self.address = address
-        self.variables = {}
         is_buffer_type = kwargs.get('buffer', False)
 
         StructMeta.check_buffer_view_kwargs(address, kwargs)
@@ -607,30 +971,67 @@ class _StructMethods(object):
         arch = StructMeta.get_architecture_from_address_kwargs(address, kwargs)
         struct = StructMeta.struct(self.__class__, arch)
         if struct is None:
-            raise RuntimeError("Struct is not defined. Since struct definition is automatic now we need a better error message here")
+            unresolved = _StructDefinitions.graph.describe_unresolved()
+            if unresolved:
+                raise RuntimeError(f'{self.__class__.__name__} is not defined, since the structs declared with it '
+                                   f'refer to types that have not been declared: {unresolved}')
+            raise RuntimeError(f'{self.__class__.__name__} is not defined for {arch}-bit processes')
 
         self.size = struct.size
-        self._getters = [None for _ in struct.fields]
-        self._setters = [None for _ in struct.fields]
+        self._arch = arch
+        self._buffer = None
+        self._snapshot = None
+        self._definition = struct
+        self._fields = [None] * len(struct.fields)
+        self._kwargs = kwargs
 
         if is_buffer_type:
             if 'offset_in_parent' in kwargs:
                 self.buffer = cgh.buf(kwargs['parent_buffer'], kwargs['offset_in_parent'], struct.size)
             else:
                 self.buffer = cgh.buf(address, struct.size)
+            self._buffer = self.buffer.get()
 
         else:
-            kwargs['parent_buffer'] = getattr(self, 'buffer', None)
+            kwargs['parent_buffer'] = None
 
-            for name, field in struct.fields.items():
-                self.variables[name] = _StructLazyField(field, kwargs)
+    @staticmethod
+    def read(self, mode=None, depth=0):
+        if mode == 'snapshot':
+            return _StructMethods.snapshot(self)
+        if hasattr(self, 'buffer'):
+            # Buffer views (e.g. elements of an array) read their own range through their parent's address
+            self.buffer.read()
+            # Child structs behind pointers are read with one scatter read per pointer depth
+            level = [self]
+            for _ in range(depth):
+                # Pointers to raw buffers end the walk, only child structs are walked to the next depth
+                pointers, buffers, level = _StructMethods.pointer_children(level)
+                if not pointers:
+                    break
+                self.buffer.address.hack.read_buffers(pointers, buffers)
+        return self
 
     @staticmethod
-    def read(self):
+    def snapshot(self, enabled=True):
         if hasattr(self, 'buffer'):
-            # TODO: Read nested buffers
-            # print(self.buffer, self.buffer.get())
-            self.buffer.get().read_from(self.address.value)
+            raise RuntimeError("'snapshot' can only be called on structs created without 'buffer=True', use 'read' instead")
+
+        if not enabled:
+            self._snapshot = None
+            return self
+
+        # The span of the direct fields is read in one go into a buffer that is addressed with the field offsets
+        begin, end = StructMeta.struct(self.__class__, self._arch).snapshot_span
+        if end > begin:
+            if not self.address.loaded:
+                self.address.load()
+            # The buffer is owned by this instance, it is reused by later snapshots and released with the instance
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.size != end - begin:
+                snapshot = cgh.Buffer(self.address.hack, end - begin)
+            snapshot.read_from(self.address.value + begin, end - begin, 0)
+            self._snapshot = snapshot
         return self
 
     @staticmethod
@@ -667,11 +1068,42 @@ class _StructMethods(object):
                         setattr(self, k, v)
 
     @staticmethod
-    def flush(self):
+    def flush(self, all=False, depth=0):
         if not hasattr(self, 'buffer'):
             raise RuntimeError("'write_contents' can only be called on structs created with 'buffer=True'")
-        # TODO: Write nested buffers
-        self.buffer.get().write_to(self.address.value)
+        # Only the bytes modified since the last read/flush are written, unless 'all=True'
+        self.buffer.flush(all=all)
+        level = [self]
+        for _ in range(depth):
+            pointers, buffers, level = _StructMethods.pointer_children(level)
+            if not pointers:
+                break
+            self.buffer.address.hack.write_buffers(pointers, buffers, all)
+
+    @staticmethod
+    def pointer_children(structs):
+        # Pointer values (from the parent buffers), buffers and child structs of the pointers to structs of buffer structs,
+        # including those of inline child structs since those share the memory of their parent
+        pointers, buffers, children = [], [], []
+        pending = list(structs)
+        while pending:
+            struct = pending.pop()
+            definition = struct._definition
+            for name, field in definition.fields.items():
+                if not field.is_buffer_child:
+                    continue
+                child = struct._fields[field.index]
+                child = child if child is not None else field.buffer_child(struct)
+                if field.is_pointer_to_buffer:
+                    pointers.append(struct._buffer.read_ptr(definition.offsets[name][0]))
+                    buffers.append(child.get())
+                elif field.type.is_pointer:
+                    pointers.append(struct._buffer.read_ptr(definition.offsets[name][0]))
+                    buffers.append(child._buffer)
+                    children.append(child)
+                else:
+                    pending.append(child)
+        return pointers, buffers, children
 
     @staticmethod
     def reset(self):
@@ -679,7 +1111,8 @@ class _StructMethods(object):
         if buffer is not None:
             buffer.clear()
         else:
-            for v in self.variables.items():
+            # Only the variables that have been materialised hold local storage
+            for _, v in self.variables.materialised():
                 v.reset()
 
     @staticmethod
@@ -688,24 +1121,54 @@ class _StructMethods(object):
             return self.__class__.__name__
         return f'{self.__class__.__name__}({cgh.Address.make_string(self.address.value, self.address.hack.process.arch)})'
 
+    variables = property(lambda self: _StructVariables(self))
+
 
 # endregion
 
 # region _StructField
 
-class _StructLazyField(object):
-    def __init__(self, field, kwargs):
-        self.field = field
-        self.kwargs = kwargs
+class _StructVariables(Mapping):
+    """
+    Field variables of a struct by name. Fields of structs with an address are created when they are first accessed,
+    buffer structs only contain the child structs that have been created.
+    """
+    __slots__ = ('_struct',)
+
+    def __init__(self, struct):
+        self._struct = struct
 
     def __repr__(self):
-        return f'LazyField[{self.field}]'
+        return f'Variables[{dict(self.materialised())}]'
 
-    def __bool__(self):
-        return False
+    def __getitem__(self, name):
+        struct = self._struct
+        field = struct._definition.fields[name]
+        variable = struct._fields[field.index]
+        if variable is None:
+            if struct._buffer is not None:
+                raise KeyError(name)
+            variable = field.materialise(struct)
+        return variable
+
+    def __iter__(self):
+        if self._struct._buffer is None:
+            return iter(self._struct._definition.fields)
+        return (name for name, _ in self.materialised())
+
+    def __len__(self):
+        if self._struct._buffer is None:
+            return len(self._struct._fields)
+        return sum(1 for _ in self.materialised())
+
+    def materialised(self):
+        fields, variables = self._struct._definition.fields, self._struct._fields
+        return ((name, variables[field.index]) for name, field in fields.items() if variables[field.index] is not None)
 
 
 class _StructField(object):
+    __slots__ = ('name', 'struct', 'index', 'type', 'method_suffix')
+
     def __init__(self, name, typ, struct, index):
         self.name = name
         self.struct = struct
@@ -721,40 +1184,62 @@ class _StructField(object):
         return self.type.__name__
 
     @property
-    def getter(self):
-        # Closure that creates a variable and getter function if it does not exist
-        index = self.index
-
-        def _get(instance):
-            getter = instance._getters[index]
-            if not getter:
-                is_buffer_type = hasattr(instance, 'buffer')
-                if not is_buffer_type and isinstance(instance.variables[self.name], _StructLazyField):
-                    kwargs = instance.variables[self.name].kwargs
-                    instance.variables[self.name] = self.create_field_variable(instance, kwargs)
-                getter = self.create_struct_or_buffer_getter(instance, is_buffer_type)
-                instance._getters[index] = getter
-            return getter(instance)
-
-        return _get
+    def is_snapshot_field(self):
+        # Basic values stored directly in the struct, pointers are followed lazily
+        t = self.type
+        return t.is_basic and not t.is_pointer and not t.is_buffer_class and len(self.struct.offsets[self.name]) == 1
+
+    @property
+    def struct_type(self):
+        # Struct stored inline or behind a single pointer, None for every other type
+        t, pointer_depth = self.type, 0
+        while isinstance(t, StructType):
+            pointer_depth += t.is_pointer
+            if t.is_container or pointer_depth > 1:
+                return None
+            t = t.type
+        return t if isinstance(t, type) and StructMeta.is_struct(t) else None
+
+    @property
+    def is_pointer_to_buffer(self):
+        # Pointers to buffers stored directly in the struct
+        t = self.type
+        return t.is_buffer_class and StructType.is_pointer_to_buffer(t.type) and len(self.struct.offsets[self.name]) == 1
+
+    @property
+    def is_buffer_child(self):
+        # Buffer structs create child buffer structs for inline structs and pointers to structs,
+        # and a pointer to buffer variable (with its own buffer) for pointers to buffers
+        if self.is_pointer_to_buffer:
+            return True
+        return self.struct_type is not None and len(self.struct.offsets[self.name]) == 1 + self.type.is_pointer
 
     @property
-    def setter(self):
-        # Closure that creates a variable and setter function if it does not exist
-        index = self.index
-
-        def _set(instance, value):
-            setter = instance._setters[index]
-            if not setter:
-                is_buffer_type = hasattr(instance, 'buffer')
-                if not is_buffer_type and isinstance(instance.variables[self.name], _StructLazyField):
-                    kwargs = instance.variables[self.name].kwargs
-                    instance.variables[self.name] = self.create_field_variable(instance, kwargs)
-                setter = self.create_struct_or_buffer_setter(instance, is_buffer_type)
-                instance._setters[index] = setter
-            setter(instance, value)
-
-        return _set
+    def returns_variable(self):
+        # Arrays are returned as variables, everything else is read
+        return self.type.is_container
+
+    @property
+    def flushes_on_write(self):
+        return self.type.is_buffer_class and isinstance(self.type.type, type) and issubclass(self.type.type, cgh.str)
+
+    def materialise(self, instance):
+        # Create the variable of the field the first time that it is accessed
+        variable = instance._fields[self.index] = self.create_field_variable(instance, instance._kwargs)
+        return variable
+
+    def buffer_child(self, instance):
+        # Inline structs are views of the parent buffer, pointers to structs and buffers have their own buffer
+        offset = self.struct.offsets[self.name][0]
+        if self.is_pointer_to_buffer:
+            child = self.type(None, parent_buffer=instance.buffer, offset_in_parent=offset)
+        elif self.type.is_pointer:
+            address = cgh.Address(instance.buffer.address, [instance.buffer.offset_in_parent + offset, 0])
+            child = self.struct_type(address, buffer=True)
+        else:
+            child = self.struct_type(None, buffer=True, parent_buffer=instance.buffer, offset_in_parent=offset)
+        instance._fields[self.index] = child
+        return child
 
     def create_field_variable(self, instance, kwargs):
         kwargs['offset_in_parent'] = True
@@ -764,56 +1249,114 @@ class _StructField(object):
             address = cgh.Address(instance.address, self.struct.offsets[self.name])
         return self.type(address, **field_kwargs)
 
-    def create_struct_or_buffer_getter(self, instance, is_buffer_type):
-        # Closure that reads from buffer memory for buffer-types and from a variable otherwise
-        variable = instance.variables.get(self.name, None)
-        if is_buffer_type and not variable:
-            offset = self.struct.offsets[self.name][0]
-            method = getattr(instance.buffer.get(), f'read_{self.method_suffix}')
-            return lambda i: method(offset)
-        return _StructField.create_variable_getter(variable, is_buffer_type)
-
-    def create_struct_or_buffer_setter(self, instance, is_buffer_type):
-        # Closure that writes to buffer memory for buffer-types and to a variable otherwise
-        variable = instance.variables.get(self.name, None)
-        if is_buffer_type and not variable:
-            offset = self.struct.offsets[self.name][0]
-            method = getattr(instance.buffer.get(), f'write_{self.method_suffix}')
-            return lambda i, v: method(offset, v)
-        return _StructField.create_variable_setter(variable)
-
-    @staticmethod
-    def create_variable_getter(variable, is_buffer):
-        # Closure that loads the variable's address if it has not been loaded
-        if is_buffer or isinstance(variable, cgh.arr) or isinstance(variable, cgh.c_arr):
-            def _get(s):
-                if not variable.address.loaded:
-                    variable.address.load()
-                return variable
-
-            return _get
 
-        else:
-            def _get(s):
-                if not variable.address.loaded:
-                    variable.address.load()
-                return variable.read()
+# endregion
 
-            return _get
+# region _StructAccessors
 
-    @staticmethod
-    def create_variable_setter(variable):
-        # Closure that loads the variable's address if it has not been loaded
-        def _set(s, v):
-            if not variable.address.loaded:
-                variable.address.load()
+class _StructAccessors(object):
+    """
+    Generates the getter and setter of every field of a struct with exec, once per struct definition.
+    Offsets, read/write methods and fields are bound as constants, so a field of a buffer struct is a single
+    buffer read, and a field that has already been materialised is a list lookup and a variable read.
+    """
 
-            variable.write(v)
+    GETTER = """
+def get_{name}(self):
+    buffer = self._buffer
+    if buffer is not None:
+        {buffer_get}{snapshot_read}
+    variable = self._fields[{index}]
+    if variable is None:
+        variable = {field}.materialise(self)
+    if not variable.address.loaded:
+        variable.address.load()
+    return {result}
+"""
+
+    SETTER = """
+def set_{name}(self, value):
+    buffer = self._buffer
+    if buffer is not None:
+        {buffer_set}
+        return
+    variable = self._fields[{index}]
+    if variable is None:
+        variable = {field}.materialise(self)
+    if not variable.address.loaded:
+        variable.address.load()
+    variable.write(value){flush}{snapshot_write}
+"""
+
+    SNAPSHOT_READ = """
+    buffer = self._snapshot
+    if buffer is not None:
+        return {read}({snapshot_offset})"""
+
+    SNAPSHOT_WRITE = """
+    buffer = self._snapshot
+    if buffer is not None:
+        {write}({snapshot_offset}, value)"""
 
-            if isinstance(variable, cgh.str):
-                variable.flush()
+    @staticmethod
+    def define(cls, code=None):
+        # Returns the compiled accessors, which can be passed back as 'code' to skip compilation (e.g. from a cache)
+        # Only the architectures that the struct has been defined for so far
+        definitions = [d for d in (_defined_32.defined.get(cls), _defined_64.defined.get(cls)) if d and d.fields]
+        if not definitions:
+            return None
+
+        namespace = {}
+        source = ''.join(_StructAccessors.source(name, [d.fields[name] for d in definitions], namespace)
+                         for name in definitions[-1].fields)
+        code = code or compile(source, f'<struct {cls.__name__}>', 'exec')
+        exec(code, namespace)
+
+        for name, field in definitions[-1].fields.items():
+            setattr(cls, name, _StructProperty(field, namespace[f'get_{name}'], namespace[f'set_{name}']))
+        return code
 
-        return _set
+    @staticmethod
+    def source(name, fields, namespace):
+        # Constants that differ between architectures are selected with the architecture of the instance
+        def per_arch(values):
+            if len(set(values)) == 1:
+                return values[0]
+            return f'({values[0]} if self._arch == 32 else {values[1]})'
+
+        for field in fields:
+            namespace[f'field_{name}_{field.struct.arch}'] = field
+
+        field = fields[-1]
+        suffix = field.method_suffix
+        is_buffer_child = all(f.is_buffer_child for f in fields)
+        constants = {
+            'name': name,
+            'offset': per_arch([hex(f.struct.offsets[name][0]) for f in fields]),
+            'index': per_arch([f.index for f in fields]),
+            'field': per_arch([f'field_{name}_{f.struct.arch}' for f in fields]),
+            'read': f'buffer.read_{suffix}' if suffix.isidentifier() else f"getattr(buffer, 'read_{suffix}')",
+            'write': f'buffer.write_{suffix}' if suffix.isidentifier() else f"getattr(buffer, 'write_{suffix}')",
+            'result': 'variable' if field.returns_variable else 'variable.read()',
+            'flush': '\n    variable.flush()' if field.flushes_on_write else '',
+        }
+        if is_buffer_child:
+            # Child structs of buffer structs are created once and kept in '_fields',
+            # pointers to buffers return the buffer that is read with 'read(depth=1)' like child structs
+            child = (f'variable = self._fields[{constants["index"]}]\n'
+                     f'        variable = variable if variable is not None else {constants["field"]}.buffer_child(self)\n        ')
+            is_pointer_to_buffer = all(f.is_pointer_to_buffer for f in fields)
+            constants['buffer_get'] = child + ('return variable.get()' if is_pointer_to_buffer else 'return variable')
+            constants['buffer_set'] = child + 'variable.write(value)'
+        else:
+            constants['buffer_get'] = f'return {constants["read"]}({constants["offset"]})'
+            constants['buffer_set'] = f'{constants["write"]}({constants["offset"]}, value)'
+        is_snapshot_field = all(f.is_snapshot_field for f in fields)
+        # The snapshot only holds the span of the snapshot fields, so its offsets start at the beginning of the span
+        constants['snapshot_offset'] = per_arch([hex(f.struct.offsets[name][0] - f.struct.snapshot_span[0]) for f in fields])
+        constants['snapshot_read'] = _StructAccessors.SNAPSHOT_READ.format(**constants) if is_snapshot_field else ''
+        constants['snapshot_write'] = _StructAccessors.SNAPSHOT_WRITE.format(**constants) if is_snapshot_field else ''
+        return _StructAccessors.GETTER.format(**constants) + _StructAccessors.SETTER.format(**constants)
 
 
 # endregion
@@ -870,64 +1413,140 @@ class _StructProperty(property):
 # region StructDependencies
 
 class StructDependencies:
+    """
+    Dependency graph of structs that refer to each other by name (forward declarations).
+    Structs are added as they are declared, so checking for unresolved names is constant time
+    and resolving every forward declaration of a module is linear in the number of structs and references.
+    """
+
+    def __init__(self, get_key=lambda v: v.__name__, get_types=lambda v: v.__annotations__):
+        self.get_key = get_key
+        self.get_types = get_types
+        self.declared = set()
+        self.unresolved = {}  # key -> names that it refers to that have not been declared
+        self.waiting = {}     # name that has not been declared -> keys that refer to it
+
+    def add(self, definition):
+        key = self.get_key(definition)
+        self.declared.add(key)
+
+        missing = {t for t in self.get_types(definition).values()
+                   if StructDependencies.is_forward_declaration(t) and t not in self.declared}
+        if missing:
+            self.unresolved[key] = missing
+            for name in missing:
+                self.waiting.setdefault(name, set()).add(key)
+
+        # Every definition that was waiting for this one has one less unresolved name
+        for waiting_key in self.waiting.pop(key, ()):
+            names = self.unresolved.get(waiting_key)
+            if names is not None:
+                names.discard(key)
+                if not names:
+                    del self.unresolved[waiting_key]
+
+    def clear_unresolved(self):
+        self.unresolved.clear()
+        self.waiting.clear()
+
+    def describe_unresolved(self) -> str:
+        return ', '.join(f'{key} -> {", ".join(repr(n) for n in sorted(names))}'
+                         for key, names in sorted(self.unresolved.items()))
+
+    @staticmethod
+    def is_forward_declaration(t) -> bool:
+        return isinstance(t, str) and not hasattr(cgh, t)
+
     @staticmethod
     def has_unresolved(
             definitions,
             get_key=lambda v: v.__name__,
             get_types=lambda v: v.__annotations__
     ):
-        ready = set()
-        did_make_progress = True
-        remaining = [c for c in definitions]
+        graph = StructDependencies(get_key, get_types)
+        for definition in definitions:
+            graph.add(definition)
+        return bool(graph.unresolved)
 
-        while did_make_progress:
-            did_make_progress = False
+    @staticmethod
+    def sort(definitions, dependencies, get_key=lambda v: v.__name__):
+        # Definitions are sorted so that they come after the definitions they depend on.
+        # Definitions in dependency cycles cannot be ordered among themselves, so each cycle is condensed into one component
+        # (in its original order) and the components are sorted with Kahn's algorithm, which keeps the original order where it can
+        keys = [get_key(v) for v in definitions]
+        indexes = {k: i for i, k in enumerate(keys)}
+        edges = [sorted({indexes[d] for d in dependencies.get(k, ()) if d in indexes and indexes[d] != i})
+                 for i, k in enumerate(keys)]
+
+        components = sorted(StructDependencies.components(edges), key=lambda c: c[0])
+        component_of = [0] * len(keys)
+        for c, members in enumerate(components):
+            for i in members:
+                component_of[i] = c
+
+        indegree = [0] * len(components)
+        dependents = [[] for _ in components]
+        for c, members in enumerate(components):
+            for d in {component_of[j] for i in members for j in edges[i]} - {c}:
+                indegree[c] += 1
+                dependents[d].append(c)
+
+        order = []
+        ready = deque(c for c, n in enumerate(indegree) if n == 0)
+        while ready:
+            c = ready.popleft()
+            order.extend(components[c])
+            for dependent in dependents[c]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
+
+        definitions[:] = [definitions[i] for i in order]
 
-            for i, cls in enumerate(remaining):
-                has_dependencies = False
+    @staticmethod
+    def components(edges):
+        # Tarjan's algorithm without recursion, returns the strongly connected components of the graph with their nodes in order
+        index, low = [None] * len(edges), [0] * len(edges)
+        on_stack, stack, components, counter = [False] * len(edges), [], [], 0
 
-                for t in get_types(cls).values():
-                    if isinstance(t, str) and not hasattr(cgh, t) and t not in ready:
-                        has_dependencies = True
+        for root in range(len(edges)):
+            if index[root] is not None:
+                continue
+            work = [(root, 0)]
+            while work:
+                v, next_edge = work.pop()
+                if next_edge == 0:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+
+                # Visit the next unvisited node that this one has an edge to, and continue with this node after it
+                for e in range(next_edge, len(edges[v])):
+                    w = edges[v][e]
+                    if index[w] is None:
+                        work.append((v, e + 1))
+                        work.append((w, 0))
                         break
-
-                if has_dependencies:
-                    continue
+                    elif on_stack[w]:
+                        low[v] = min(low[v], index[w])
                 else:
-                    did_make_progress = True
-                    remaining.pop(i)
-                    ready.add(get_key(cls))
-                    break
-
-        # If any definitions contain unknown types, there are still unresolved dependencies
-        remaining_names = set(get_key(v) for v in remaining)
-        for cls in remaining:
-            for t in get_types(cls).values():
-                if isinstance(t, str) and not hasattr(cgh, t) and t not in ready and t not in remaining_names:
-                    return True
-
-        return False
-
-    @staticmethod
-    def sort(definitions, dependencies, get_key=lambda v: v.__name__):
-        def get_score_single(dep, level=0, seen=None):
-            seen = seen or set()
-            score = level * 10000
-            for d in dependencies.get(dep, set()):
-                if d not in seen:
-                    seen.add(d)
-                    score += get_score_single(d, level + 1, seen)
-            return score
-
-        def get_score(k, i):
-            if not dependencies.get(k, set()):
-                return i
-            return get_score_single(k) + i
-
-        scores = {
-            get_key(v): get_score(get_key(v), i) for i, v in enumerate(definitions)
-        }
-
-        definitions.sort(key=lambda v: scores[get_key(v)])
+                    if low[v] == index[v]:
+                        component = []
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = False
+                            component.append(w)
+                            if w == v:
+                                break
+                        components.append(sorted(component))
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[v])
+
+        return components
+
+
+_StructDefinitions.graph = StructDependencies()
 
 # endregion
@@ -0,0 +1,402 @@
+from collections import OrderedDict, namedtuple
+
+import pygamehack.c as cgh
+from .msvc import _align, _ptr_size, _unwrap, _SequenceContainer, _MapContainer
+from .struct_meta import StructType
+from .variable import IListVariable, IDictVariable
+
+__all__ = [
+    'TArray', 'TSet', 'TMap', 'FName', 'FNamePool', 'FUObjectArray', 'UObjectInfo'
+]
+
+
+# region Layout
+
+def _read_ints(address, offset, sizes):
+    # Unsigned integers of the given sizes that are laid out one after the other at 'offset' from the address
+    data = address.hack.read_bytes(address.value + offset, sum(sizes))
+    values, i = [], 0
+    for size in sizes:
+        values.append(int.from_bytes(data[i:i + size], 'little'))
+        i += size
+    return values
+
+
+def _i32(value):
+    return value - (1 << 32) if value >= (1 << 31) else value
+
+
+# endregion
+
+# region Names
+
+class FNamePool(object):
+    """
+    Decodes the names of FNames from the FNamePool (GNames) of an Unreal Engine 4.23+ process.
+
+    Names are read in batches with 'Hack.read_fnames' and the decoded names are cached by entry id,
+    where the least recently used names are evicted once the cache holds 'cache_size' names.
+    The last pool created for a process is used to decode the FName variables of the process.
+
+    Usage:
+        names = gh.unreal.FNamePool(gh.Address(hack, 'Game.exe', 0x4A0B2C0))
+        names.name(index, number), names.names(indices)
+    """
+    pools = {}
+
+    def __init__(self, address: cgh.Address, cache_size: int = 1 << 18, stride: int = 2):
+        self.address = address
+        self.cache_size = cache_size
+        self.stride = stride
+        self._cache = OrderedDict()
+        self._scratch = None
+        FNamePool.pools[address.hack.process.pid] = self
+
+    def __getitem__(self, index: int) -> str:
+        return self.entries([index])[0]
+
+    def __len__(self):
+        return len(self._cache)
+
+    @staticmethod
+    def of(hack: cgh.Hack) -> 'FNamePool':
+        pool = FNamePool.pools.get(hack.process.pid, None)
+        if pool is None:
+            raise RuntimeError('No FNamePool has been created for the process, create one with gh.unreal.FNamePool(address)')
+        return pool
+
+    @property
+    def blocks(self) -> int:
+        # FNameEntryAllocator: FRWLock Lock, u32 CurrentBlock, u32 CurrentByteCursor, u8* Blocks[]
+        if not self.address.loaded:
+            self.address.load()
+        return self.address.value + _ptr_size(self.address) + 8
+
+    def clear(self):
+        self._cache.clear()
+
+    def scratch(self, size: int) -> cgh.Buffer:
+        """
+        Buffer of at least 'size' bytes that is reused by the batch reads of the names of the process,
+        its contents are only valid until the next call
+        """
+        if self._scratch is None or self._scratch.size < size:
+            self._scratch = cgh.Buffer(self.address.hack, max(64, size))
+        return self._scratch
+
+    def entries(self, indices) -> list:
+        """
+        Names of the entries with the given ids, without the number suffix
+        """
+        cache = self._cache
+        found = dict.fromkeys(indices)
+        missing = []
+        for index in found:
+            name = cache.get(index, None)
+            if name is None:
+                missing.append(index)
+            else:
+                cache.move_to_end(index)
+                found[index] = name
+
+        if missing:
+            for index, name in zip(missing, self.address.hack.read_fnames(self.blocks, missing, self.stride)):
+                found[index] = name
+                # Unreadable entries are not cached, so they are read again once they are written by the process
+                if name:
+                    cache[index] = name
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+        return [found[index] for index in indices]
+
+    def names(self, indices, numbers=None) -> list:
+        """
+        Names of the FNames with the given comparison indices and numbers ('Name_{number - 1}' when the number is not 0)
+        """
+        entries = self.entries(indices)
+        if numbers is None:
+            return entries
+        return [f'{name}_{number - 1}' if number else name for name, number in zip(entries, numbers)]
+
+    def name(self, index: int, number: int = 0) -> str:
+        return self.names([index], [number])[0]
+
+
+class FName(object):
+    """
+    FName - i32 ComparisonIndex, i32 Number, read as a python string with the FNamePool of the process
+    """
+    __slots__ = ('address', 'value')
+
+    def __init__(self, address, **kwargs):
+        self.address = address
+        self.value = ''
+
+    def __str__(self):
+        return self.value
+
+    @staticmethod
+    def field_size(ptr_size):
+        return 8
+
+    @staticmethod
+    def field_align(ptr_size):
+        return 4
+
+    @classmethod
+    def decode(cls, hack, addresses):
+        pool = FNamePool.of(hack)
+        buffer = pool.scratch(8 * len(addresses))
+        hack.read_many(addresses, buffer, 8)
+        indices = buffer.view('u32', 0, [len(addresses)], [8]).tolist()
+        numbers = buffer.view('u32', 4, [len(addresses)], [8]).tolist()
+        return pool.names(indices, numbers)
+
+    def get(self):
+        return self.value
+
+    def read(self):
+        if not self.address.loaded:
+            self.address.load()
+        self.value = self.decode(self.address.hack, [self.address.value])[0]
+        return self.value
+
+    def write(self, value):
+        raise RuntimeError('Writing to FNames is not supported')
+
+    def reset(self):
+        self.value = ''
+
+
+# endregion
+
+# region Containers
+
+class TArray(_SequenceContainer, IListVariable):
+    """
+    TArray<T> - T* Data, i32 ArrayNum, i32 ArrayMax, read with a single read
+
+    Usage:
+        class AActor(gh.Struct):
+            children: gh.unreal.TArray[gh.ptr[AActor]] = 0x140
+
+        children = actor.children.read()
+        children[0], children.array()
+    """
+    __slots__ = ()
+
+    @staticmethod
+    def field_size(ptr_size):
+        return ptr_size + 8
+
+    def read(self, max_size=0):
+        if not self.address.loaded:
+            self.address.load()
+        p = _ptr_size(self.address)
+        data, count = _read_ints(self.address, 0, [p, 4])
+        count = max(0, _i32(count))
+        count = min(count, max_size) if max_size else count
+
+        size, _ = self.value_layout
+        self._addresses = self.address.hack.read_sparse_array(data, count, size, 0, self._local_storage(size), size)
+        self._elements = None
+        return self
+
+    def write(self, values: list):
+        IListVariable.write(self, values)
+
+    def flush(self):
+        # Elements are written to memory when they are set
+        pass
+
+    def __setitem__(self, i, value):
+        size, _ = self.value_layout
+        _write_element(self, self._addresses[i], i * size, self.value_type, value)
+        if self._elements is not None:
+            self._elements[i] = value
+
+
+class _SparseContainer(object):
+    """
+    Reads the elements of TSet and TMap, which are stored in a TSparseArray of TSetElement (value, i32 HashNextId, i32 HashIndex)
+    """
+    __slots__ = ()
+
+    @staticmethod
+    def field_size(ptr_size):
+        # TSparseArray: TArray Data, TBitArray AllocationFlags (u32 InlineData[4], u32* SecondaryData, i32 NumBits, i32 MaxBits),
+        #               i32 FirstFreeIndex, i32 NumFreeIndices
+        # TSet:         TSparseArray Elements, TInlineAllocator<1> Hash, i32 HashSize
+        return 0x50 if ptr_size == 8 else 0x3C
+
+    def read(self, max_size=0):
+        if not self.address.loaded:
+            self.address.load()
+        p = _ptr_size(self.address)
+        data, count = _read_ints(self.address, 0, [p, 4])
+        secondary_flags, = _read_ints(self.address, p + 24, [p])
+        count = max(0, _i32(count))
+        count = min(count, max_size) if max_size else count
+
+        # Allocation flags are stored inline when there are at most 128 elements
+        flags = secondary_flags or self.address.value + p + 8
+        size, align = self.value_layout
+        stride = _align(_align(size, 4) + 8, max(align, 4))
+        self._addresses = self.address.hack.read_sparse_array(data, count, stride, flags, self._local_storage(size), size)
+        self._elements = None
+        return self
+
+    def flush(self):
+        # Elements are written to memory when they are set
+        pass
+
+
+class TSet(_SparseContainer, _SequenceContainer, IListVariable):
+    """
+    TSet<T> - elements are in the order of the sparse array
+    """
+    __slots__ = ()
+
+    def write(self, values):
+        raise RuntimeError('Writing to TSets is not supported')
+
+    def __setitem__(self, key, value):
+        raise RuntimeError('Writing to TSets is not supported')
+
+
+class TMap(_SparseContainer, _MapContainer, IDictVariable):
+    """
+    TMap<K, V> - a TSet of TPair<K, V>, the values of existing keys can be written
+
+    Usage:
+        class UDataTable(gh.Struct):
+            rows: gh.unreal.TMap[gh.unreal.FName, gh.ptr[Row]] = 0x30
+
+        rows = table.rows.read()
+        rows['Sword'], dict(rows.items())
+    """
+    __slots__ = ()
+
+    def write(self, values: dict):
+        IDictVariable.write(self, values)
+
+    def __setitem__(self, key, value):
+        elements = self.elements
+        if key not in elements:
+            raise KeyError(key)
+        size, _ = self.value_layout
+        i = next(i for i, k in enumerate(elements) if k == key)
+        _write_element(self, self._addresses[i] + self.value_offset, i * size + self.value_offset, self.value_type.value, value)
+        elements[key] = value
+
+
+def _write_element(container, address, offset, t, value):
+    # Basic values are written to memory and to the local storage of the container
+    t = _unwrap(t)
+    if not StructType.is_basic_type(t) or StructType.is_buffer_subclass(t):
+        raise RuntimeError(f'Only elements of basic types can be written, not {getattr(t, "__name__", t)}')
+    name = t.__name__
+    getattr(container.address.hack, f'write_{name}')(address, value)
+    getattr(container.storage, f'write_{name}')(offset, value)
+    container.storage.clear_dirty()
+
+
+# endregion
+
+# region Objects
+
+UObjectInfo = namedtuple('UObjectInfo', ['index', 'address', 'name', 'class_name', 'outer'])
+
+
+class FUObjectArray(IListVariable):
+    """
+    FUObjectArray (GObjects) - the pointers to every UObject in an Unreal Engine 4.23+ process, indexed by their InternalIndex.
+
+    The chunks of the object array are read with 'Hack.read_chunked_array', so reading the array takes one read per chunk
+    (64K objects), and 'dump' reads the header of every object and decodes their names in batches.
+
+    Usage:
+        gh.unreal.FNamePool(gh.Address(hack, 'Game.exe', 0x4A0B2C0))
+        objects = gh.unreal.FUObjectArray(gh.Address(hack, 'Game.exe', 0x4A2D4F8)).read()
+        actors = [o for o in objects.dump() if o.class_name == 'Actor']
+    """
+    # FUObjectArray: i32 ObjFirstGCIndex, i32 ObjLastNonGCIndex, i32 MaxObjectsNotConsideredByGC, bool OpenForDisregardForGC,
+    #                FChunkedFixedUObjectArray ObjObjects
+    objects_offset = 0x10
+    chunk_size = 64 * 1024
+
+    def __init__(self, address, **kwargs):
+        self.address = address
+        self._objects = []
+
+    def __getitem__(self, i) -> int:
+        return self._objects[i]
+
+    def __setitem__(self, key, value):
+        raise RuntimeError('Writing to the object array is not supported')
+
+    def __iter__(self):
+        return iter(self._objects)
+
+    def __len__(self):
+        return len(self._objects)
+
+    @staticmethod
+    def item_size(ptr_size):
+        # FUObjectItem: UObject* Object, i32 Flags, i32 ClusterRootIndex, i32 SerialNumber
+        return _align(ptr_size + 12, ptr_size)
+
+    @staticmethod
+    def uobject_offsets(ptr_size):
+        # UObject: vtable, i32 ObjectFlags, i32 InternalIndex, UClass* ClassPrivate, FName NamePrivate, UObject* OuterPrivate
+        return {'class': ptr_size + 8, 'name': 2 * ptr_size + 8, 'outer': 2 * ptr_size + 16, 'size': 3 * ptr_size + 16}
+
+    def read(self):
+        if not self.address.loaded:
+            self.address.load()
+        p = _ptr_size(self.address)
+        # FChunkedFixedUObjectArray: FUObjectItem** Objects, FUObjectItem* PreAllocatedObjects, i32 MaxElements, i32 NumElements
+        chunks, _, _, count = _read_ints(self.address, self.objects_offset, [p, p, 4, 4])
+        self._objects = self.address.hack.read_chunked_array(chunks, max(0, _i32(count)), self.chunk_size, self.item_size(p))
+        return self
+
+    def write(self, value):
+        raise RuntimeError('Writing to the object array is not supported')
+
+    def flush(self):
+        pass
+
+    def reset(self):
+        self._objects = []
+
+    def dump(self) -> list:
+        """
+        Index, address, name, class name and outer address of every object in the array (call 'read' first).
+        The object headers are read in a single batch into the scratch buffer of the FNamePool of the process,
+        which decodes their names.
+        """
+        hack = self.address.hack
+        p = _ptr_size(self.address)
+        offsets = self.uobject_offsets(p)
+        objects = [(i, a) for i, a in enumerate(self._objects) if a]
+        addresses = [a for _, a in objects]
+        n, size = len(addresses), offsets['size']
+
+        pool = FNamePool.of(hack)
+        buffer = pool.scratch(n * size)
+        hack.read_many(addresses, buffer, size)
+        ptr_type = 'u32' if p == 4 else 'u64'
+        classes = buffer.view(ptr_type, offsets['class'], [n], [size]).tolist()
+        indices = buffer.view('u32', offsets['name'], [n], [size]).tolist()
+        numbers = buffer.view('u32', offsets['name'] + 4, [n], [size]).tolist()
+        outers = buffer.view(ptr_type, offsets['outer'], [n], [size]).tolist()
+
+        names = pool.names(indices, numbers)
+        # Classes are objects in the array, so their names are found without any extra reads
+        names_by_address = dict(zip(addresses, names))
+        return [UObjectInfo(i, a, name, names_by_address.get(c, ''), outer)
+                for (i, a), name, c, outer in zip(objects, names, classes, outers)]
+
+
+# endregion
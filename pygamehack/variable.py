@@ -134,8 +134,8 @@ class IBufferVariable(object):
     def write(self, value):
         buf.write(self, value)
 
-    def flush(self):
-        buf.flush(self)
+    def flush(self, all: bool = False):
+        buf.flush(self, all=all)
 
     def reset(self):
         buf.get(self).clear()
@@ -132,7 +132,8 @@ class VariableNode(TreeViewNode):
             self.set('value', '')
 
         else:
-            variable_value = self.variable.read()
+            hack = self.variable.address.hack
+            variable_value = self.variable.get() if hack.background_update_running else self.variable.read()
             value = str(variable_value)
 
             if self.is_integer and self.config.show_value_as_hex:
@@ -169,16 +170,13 @@ class VariableTreeView(TreeView):
 
         self.setup_columns()
         
-        self._thread = None
+        self._synced_frame = 0
         def _set():
             self.struct.flag = 1
-            if self._thread is None:
-                import threading
-                def run():
-                    while True:
-                        self.update()
-                self._thread = threading.Thread(target=run, daemon=True)
-                self._thread.start()
+            hack = self.struct.address.hack
+            if not hack.background_update_running:
+                hack.start_background_update()
+                self._poll_published_values(hack)
 
         self.bind('<Key-Delete>', self._remove_selected_variables)
         self.bind('<Key-Insert>', lambda e: self.add_variable(self.struct))
@@ -204,6 +202,8 @@ class VariableTreeView(TreeView):
             child_node.is_root = parent_node is None
             child_node.set_variable(child)
             self.variable_to_node[child] = child_node
+            if not child_node.is_struct:
+                child.address.hack.register_variable(child)
 
     def remove_variable(self, variable):
         node = self.variable_to_node.get(variable, None)
@@ -212,6 +212,8 @@ class VariableTreeView(TreeView):
 
         for name, child, parent in gh.Struct.walk(variable):
             if child in self.variable_to_node:
+                if not self.variable_to_node[child].is_struct:
+                    child.address.hack.unregister_variable(child)
                 del self.variable_to_node[child]
 
         self.remove_node(node.name)
@@ -297,6 +299,15 @@ class VariableTreeView(TreeView):
 
     #region Private
 
+    def _poll_published_values(self, hack, interval_ms=16):
+        # Values are read on the background update thread, the UI thread only copies the latest frame
+        if hack.background_update_running:
+            frame = hack.sync_variables()
+            if frame != self._synced_frame:
+                self._synced_frame = frame
+                self.update()
+            self.after(interval_ms, self._poll_published_values, hack, interval_ms)
+
     def _is_right_clicked_node_uniquely_selected(self):
         if self.right_clicked_node is None:
             return True
@@ -121,7 +121,7 @@ setup(
     ],
     python_requires='>=3.7',
     install_requires=['pybind11>=2.6.2'],
-    extras_require={"test": "pytest"},
+    extras_require={"test": "pytest", "numpy": "numpy"},
     zip_safe=False,
     cmdclass={"build_ext": CMakeBuild},
 )
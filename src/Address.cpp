@@ -7,11 +7,9 @@ namespace pygamehack {
 
 Address::Address(Hack& hack):
     _hack{&hack},
-    _type{u64(Type::MANUAL)},
-    _is_loaded{false},
+    _type{u8(Type::MANUAL)},
     _auto_updates{false},
-    _name_handle{0},
-    _update_mask{UPDATE_ALL}
+    _name_handle{0}
 {}
 
 Address::~Address()
@@ -24,11 +22,12 @@ Address::~Address()
 Address::Address(const Address& v):
     _hack{v._hack},
     _address{v._address},
+    _is_loaded{v._is_loaded.load()},
+    _update_mask{v._update_mask.load()},
+    _update_interval{v._update_interval},
     _type{v._type},
-    _is_loaded{v._is_loaded},
     _auto_updates{false},
-    _name_handle{v.name().empty() ? 0u : _hack->address_names().add(v.name())},
-    _update_mask{v._update_mask}
+    _name_handle{v.name().empty() ? 0u : _hack->address_names().add(v.name(), this)}
 {
     if (type() == Address::Type::STATIC) { _static = v._static; }
     else if (type() == Address::Type::DYNAMIC) { _dynamic = v._dynamic; }
@@ -38,13 +37,15 @@ Address::Address(const Address& v):
 Address& Address::operator=(const Address& v)
 {
 	if (&v != this) {
+        if (_name_handle != 0) { _hack->address_names().remove(_name_handle); }
         _hack = v._hack;
         _address = v._address;
         _type = v._type;
-        _is_loaded = v._is_loaded;
+        _is_loaded = v._is_loaded.load();
         _auto_updates = false;
-        _name_handle = v.name().empty() ? 0u : _hack->address_names().add(v.name());
-        _update_mask = v._update_mask;
+        _name_handle = v.name().empty() ? 0u : _hack->address_names().add(v.name(), this);
+        _update_mask = v._update_mask.load();
+        _update_interval = v._update_interval;
         if (type() == Address::Type::STATIC) { _static = v._static; }
         else if (type() == Address::Type::DYNAMIC) { _dynamic = v._dynamic; }
         if (v._auto_updates) { auto_update(); }
@@ -55,14 +56,16 @@ Address& Address::operator=(const Address& v)
 Address::Address(Address&& v) noexcept :
     _hack{v._hack},
     _address{v._address},
+    _is_loaded{v._is_loaded.load()},
+    _update_mask{v._update_mask.load()},
+    _update_interval{v._update_interval},
     _type{v._type},
-    _is_loaded{v._is_loaded},
     _auto_updates{false},
-    _name_handle{v._name_handle},
-    _update_mask{v._update_mask}
+    _name_handle{v._name_handle}
 {
     if (type() == Address::Type::STATIC) { _static = v._static; }
     else if (type() == Address::Type::DYNAMIC) { _dynamic = v._dynamic; }
+    if (_name_handle != 0) { _hack->address_names().rebind(_name_handle, this); }
     v._name_handle = 0;
     if (v._auto_updates) { auto_update(); }
 }
@@ -70,15 +73,18 @@ Address::Address(Address&& v) noexcept :
 Address& Address::operator=(Address&& v) noexcept
 {
 	if (&v != this) {
+        if (_name_handle != 0) { _hack->address_names().remove(_name_handle); }
         _hack = v._hack;
         _address = v._address;
         _type = v._type;
-        _is_loaded = v._is_loaded;
+        _is_loaded = v._is_loaded.load();
         _auto_updates = false;
         _name_handle = v._name_handle;
-        _update_mask = v._update_mask;
+        _update_mask = v._update_mask.load();
+        _update_interval = v._update_interval;
         if (type() == Address::Type::STATIC) { _static = v._static; }
         else if (type() == Address::Type::DYNAMIC) { _dynamic = v._dynamic; }
+        if (_name_handle != 0) { _hack->address_names().rebind(_name_handle, this); }
         v._name_handle = 0;
         if (v._auto_updates) { auto_update(); }
     }
@@ -97,7 +103,7 @@ Address Address::Manual(Hack& hack, uptr address)
 Address Address::Static(Hack& hack, const string& module_name, uptr offset)
 {
     Address a{hack};
-    a._type = u64(Type::STATIC);
+    a._type = u8(Type::STATIC);
     new (a._storage) StaticAddressData;
     a._static.offset = offset;
     a._static.module_name = module_name;
@@ -107,7 +113,7 @@ Address Address::Static(Hack& hack, const string& module_name, uptr offset)
 Address Address::Dynamic(Address& parent, const uptr_path& offsets, bool add_first_offset_to_parent_address)
 {
     Address a{*parent._hack};
-    a._type = u64(Type::DYNAMIC);
+    a._type = u8(Type::DYNAMIC);
     new (a._storage) DynamicAddressData;
     a._dynamic.parent = &parent;
     a._dynamic.offsets = offsets;
@@ -117,7 +123,7 @@ Address Address::Dynamic(Address& parent, const uptr_path& offsets, bool add_fir
 Address Address::CreateDynamic(Address& parent, const u32* offsets, usize n_offsets, bool add_first_offset_to_parent_address)
 {
     Address a{*parent._hack};
-    a._type = u64(Type::DYNAMIC);
+    a._type = u8(Type::DYNAMIC);
     new (a._storage) DynamicAddressData;
     a._dynamic.parent = &parent;
     a._dynamic.offsets.insert(a._dynamic.offsets.end(), offsets, offsets + n_offsets);
@@ -200,10 +206,10 @@ const string& Address::name() const
 void Address::set_name(const string& v)
 {
     if (!v.empty() && _name_handle == 0) {
-        _name_handle = _hack->address_names().add(v);
+        _name_handle = _hack->address_names().add(v, this);
     }
     else if (!v.empty() && _name_handle != 0) {
-        _hack->address_names().set(_name_handle, v);
+        _hack->address_names().set(_name_handle, v, this);
     }
     else if (v.empty()) {
         if (_name_handle != 0) {
@@ -235,6 +241,22 @@ void Address::set_update_mask(u32 mask)
     _update_mask = mask;
 }
 
+double Address::update_interval() const
+{
+    return double(_update_interval) / 1e6;
+}
+
+void Address::set_update_interval(double seconds)
+{
+    PGH_ASSERT(seconds >= 0.0 && seconds * 1e6 <= double(UINT32_MAX), "Update interval must be between 0 and ~4294 seconds");
+    _update_interval = u32(seconds * 1e6);
+}
+
+u32 Address::update_interval_us() const
+{
+    return _update_interval;
+}
+
 const string& Address::module_name() const
 {
     PGH_ASSERT(type() == Address::Type::STATIC, "Can only access module_name on STATIC addresses");
@@ -277,33 +299,87 @@ void Address::update(u32 mask)
 
 const string& AddressNames::get(u32 handle) const
 {
-    return strings[handle];
+    return slots[handle].name->first;
 }
 
-void AddressNames::set(u32 handle, const string& v)
+void AddressNames::set(u32 handle, const string& v, Address* address)
 {
-    strings[handle] = v;
+    unlink(handle);
+    slots[handle].address = address;
+    link(handle, v);
 }
 
-u32 AddressNames::add(const string& v)
+u32 AddressNames::add(const string& v, Address* address)
 {
+    u32 handle{};
     if (free_slots.empty()) {
-        const u32 handle = strings.size();
-        strings.emplace_back(v);
-        return handle;
+        handle = u32(slots.size());
+        slots.emplace_back();
     }
     else {
-        const u32 handle = free_slots.back();
+        handle = free_slots.back();
         free_slots.pop_back();
-        strings[handle] = v;
-        return handle;
     }
+    slots[handle].address = address;
+    link(handle, v);
+    return handle;
 }
 
 void AddressNames::remove(u32 handle)
 {
+    unlink(handle);
+    slots[handle] = Slot{};
     free_slots.push_back(handle);
-    strings[handle].clear();
+}
+
+void AddressNames::rebind(u32 handle, Address* address)
+{
+    slots[handle].address = address;
+}
+
+Address* AddressNames::find(const string& name) const
+{
+    if (name.empty()) return nullptr;
+    auto it = names.find(name);
+    return it == names.end() ? nullptr : slots[it->second.handles.front()].address;
+}
+
+std::vector<Address*> AddressNames::find_prefix(const string& prefix) const
+{
+    std::vector<const NameMap::value_type*> matches;
+    for (const auto& entry: names) {
+        if (!entry.first.empty() && entry.first.compare(0, prefix.size(), prefix) == 0) {
+            matches.push_back(&entry);
+        }
+    }
+    std::sort(matches.begin(), matches.end(), [](const auto* a, const auto* b) { return a->first < b->first; });
+
+    std::vector<Address*> addresses;
+    addresses.reserve(matches.size());
+    for (const auto* entry: matches) {
+        addresses.push_back(slots[entry->second.handles.front()].address);
+    }
+    return addresses;
+}
+
+void AddressNames::link(u32 handle, const string& v)
+{
+    // Node pointers of an unordered_map are stable across rehashing
+    auto& entry = *names.try_emplace(v).first;
+    entry.second.handles.push_back(handle);
+    slots[handle].name = &entry;
+}
+
+void AddressNames::unlink(u32 handle)
+{
+    auto* entry = slots[handle].name;
+    if (!entry) return;
+
+    auto& handles = entry->second.handles;
+    handles.erase(std::find(handles.begin(), handles.end(), handle));
+    // Erase by iterator, the key is owned by the node that is being erased
+    if (handles.empty()) names.erase(names.find(entry->first));
+    slots[handle].name = nullptr;
 }
 
 }
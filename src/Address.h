@@ -4,6 +4,8 @@
 
 #include "config.h"
 #include <algorithm>
+#include <atomic>
+#include <unordered_map>
 #include <vector>
 
 namespace pygamehack {
@@ -55,6 +57,8 @@ public:
     Address&            auto_update();
     void                stop_auto_update();
     void                set_update_mask(u32 mask = UPDATE_ALL);
+    double              update_interval() const;
+    void                set_update_interval(double seconds = 0.0);
 
     // Name
     const string&       name() const;
@@ -81,15 +85,18 @@ public:
     const Process& process() const;
     void unload();
     void update(u32 mask);
+    u32  update_interval_us() const;
 
 private:
     Hack*           _hack{};
     uptr            _address{ 0 };
-    u64             _type: 2;
-    u64             _is_loaded: 1;
-    u64             _auto_updates: 1;
-    u64             _name_handle: 28;
-    u64             _update_mask: 32;
+    // Loaded state and update mask are accessed by the background update thread, so they do not share a word with the bitfields
+    std::atomic<bool> _is_loaded{ false };
+    std::atomic<u32>  _update_mask{ UPDATE_ALL };
+    u32             _update_interval{ 0 }; // microseconds, 0 = every update
+    u8              _type{ 0 };
+    u32             _auto_updates: 1;
+    u32             _name_handle: 28;
 
     union {
         u8 _storage[std::max<usize>(sizeof(StaticAddressData), sizeof(DynamicAddressData))]{};
@@ -104,13 +111,34 @@ public:
     AddressNames() = default;
     
     const string&   get(u32 handle) const;
-    void            set(u32 handle, const string& v);
-    u32             add(const string& v);
+    void            set(u32 handle, const string& v, Address* address);
+    u32             add(const string& v, Address* address);
     void            remove(u32 handle);
+    void            rebind(u32 handle, Address* address);
+
+    Address*        find(const string& name) const;
+    std::vector<Address*> find_prefix(const string& prefix) const;
 
 private:
+    // Names are interned, every handle with the same name points to the same entry.
+    // The first handle that was given a name is the one returned by 'find'.
+    struct Name {
+        std::vector<u32> handles;
+    };
+
+    using NameMap = std::unordered_map<string, Name>;
+
+    struct Slot {
+        NameMap::value_type* name{};
+        Address* address{};
+    };
+
+    void            link(u32 handle, const string& v);
+    void            unlink(u32 handle);
+
     std::vector<u32> free_slots;
-    std::vector<string> strings;
+    std::vector<Slot> slots;
+    NameMap names;
 };
 
 }
@@ -0,0 +1,171 @@
+#include "AddressTable.h"
+#include "Hack.h"
+
+#include <thread>
+
+namespace pygamehack {
+
+AddressTable::AddressTable(Hack& hack):
+    _hack{&hack}
+{}
+
+Hack& AddressTable::hack()
+{
+    return *_hack;
+}
+
+usize AddressTable::size() const
+{
+    return _module_index.size();
+}
+
+const std::vector<string>& AddressTable::modules() const
+{
+    return _modules;
+}
+
+const std::vector<uptr>& AddressTable::values() const
+{
+    return _values;
+}
+
+void AddressTable::add(const string& module_name, uptr module_offset, const uptr_path& offsets)
+{
+    add(add_module(module_name), module_offset, offsets.data(), offsets.size());
+}
+
+void AddressTable::add(u32 module_index, uptr module_offset, const u32* offsets, usize n_offsets)
+{
+    PGH_ASSERT(module_index < _modules.size(), "Module index out of range");
+    PGH_ASSERT(_offsets.size() + n_offsets <= UINT32_MAX, "Too many offsets in AddressTable");
+    _module_index.push_back(module_index);
+    _module_offset.push_back(module_offset);
+    _offsets.insert(_offsets.end(), offsets, offsets + n_offsets);
+    _offsets_begin.push_back(u32(_offsets.size()));
+}
+
+u32 AddressTable::add_module(const string& module_name)
+{
+    auto it = std::find(_modules.begin(), _modules.end(), module_name);
+    if (it != _modules.end()) return u32(it - _modules.begin());
+    _modules.push_back(module_name);
+    return u32(_modules.size() - 1);
+}
+
+void AddressTable::reserve(usize n_entries, usize n_offsets)
+{
+    _module_index.reserve(n_entries);
+    _module_offset.reserve(n_entries);
+    _offsets_begin.reserve(n_entries + 1);
+    _offsets.reserve(n_offsets);
+}
+
+const string& AddressTable::module_name(usize i) const
+{
+    check_index(i);
+    return _modules[_module_index[i]];
+}
+
+uptr AddressTable::module_offset(usize i) const
+{
+    check_index(i);
+    return _module_offset[i];
+}
+
+uptr_path AddressTable::offsets(usize i) const
+{
+    check_index(i);
+    return uptr_path{_offsets.begin() + _offsets_begin[i], _offsets.begin() + _offsets_begin[i + 1]};
+}
+
+const std::vector<uptr>& AddressTable::load_all(bool threaded)
+{
+    static constexpr usize MIN_ENTRIES_PER_THREAD = 16 * 1024;
+
+    // Module base addresses are resolved once for the whole table, missing modules load as 0
+    const Process& process = _hack->process();
+    std::vector<uptr> module_bases(_modules.size(), 0);
+    for (usize m = 0; m < _modules.size(); ++m) {
+        if (auto it = process.modules().find(_modules[m]); it != process.modules().end()) {
+            module_bases[m] = std::get<0>(it->second);
+        }
+    }
+
+    _values.resize(size());
+
+    const usize n_threads = threaded ? std::min<usize>(std::thread::hardware_concurrency(), size() / MIN_ENTRIES_PER_THREAD) : 0;
+    if (n_threads <= 1) {
+        load_range(0, size(), module_bases);
+        return _values;
+    }
+
+    std::vector<std::thread> threads;
+    const usize chunk = (size() + n_threads - 1) / n_threads;
+    for (usize begin = 0; begin < size(); begin += chunk) {
+        threads.emplace_back([this, begin, end=std::min(begin + chunk, size()), &module_bases]() {
+            load_range(begin, end, module_bases);
+        });
+    }
+    for (auto& thread: threads) { thread.join(); }
+
+    return _values;
+}
+
+AddressTable AddressTable::filter(const std::vector<bool>& mask) const
+{
+    PGH_ASSERT(mask.size() == size(), "Filter mask must have one entry per address in the table");
+
+    AddressTable table{*_hack};
+    table._modules = _modules;
+    for (usize i = 0; i < size(); ++i) {
+        if (!mask[i]) continue;
+        const u32 begin = _offsets_begin[i];
+        table.add(_module_index[i], _module_offset[i], _offsets.data() + begin, _offsets_begin[i + 1] - begin);
+        if (!_values.empty()) { table._values.push_back(_values[i]); }
+    }
+    return table;
+}
+
+AddressTable AddressTable::filter_value(uptr value) const
+{
+    PGH_ASSERT(_values.size() == size(), "The table must be loaded with 'load_all' before filtering by value");
+
+    std::vector<bool> mask(size());
+    for (usize i = 0; i < size(); ++i) { mask[i] = _values[i] == value; }
+    return filter(mask);
+}
+
+Address AddressTable::to_address(usize i)
+{
+    check_index(i);
+
+    // Static parent addresses are shared by all of the entries with the same module and offset
+    const ParentKey key{_module_index[i], _module_offset[i]};
+    auto it = _parent_index.find(key);
+    if (it == _parent_index.end()) {
+        _parents.emplace_back(Address::Static(*_hack, _modules[key.first], key.second));
+        it = _parent_index.emplace(key, &_parents.back()).first;
+    }
+
+    const u32 begin = _offsets_begin[i];
+    return Address::CreateDynamic(*it->second, _offsets.data() + begin, _offsets_begin[i + 1] - begin, true);
+}
+
+void AddressTable::check_index(usize i) const
+{
+    PGH_ASSERT(i < size(), "AddressTable index out of range");
+}
+
+void AddressTable::load_range(usize begin, usize end, const std::vector<uptr>& module_bases)
+{
+    const Process& process = _hack->process();
+    for (usize i = begin; i < end; ++i) {
+        const uptr base = module_bases[_module_index[i]];
+        const u32 offsets_begin = _offsets_begin[i];
+        _values[i] = base
+            ? process.follow(base + _module_offset[i], _offsets.data() + offsets_begin, _offsets_begin[i + 1] - offsets_begin)
+            : 0;
+    }
+}
+
+}
@@ -0,0 +1,66 @@
+#ifndef PYGAMEHACK_ADDRESS_TABLE_H
+#define PYGAMEHACK_ADDRESS_TABLE_H
+
+#include "Address.h"
+#include <deque>
+#include <map>
+
+namespace pygamehack {
+
+// Compact storage for a large number of (module + offset, offset path) pointer paths.
+// Entries are stored as a structure of arrays and all of the offset paths share a single arena,
+// the offsets of entry 'i' are '_offsets[_offsets_begin[i]:_offsets_begin[i + 1]]'.
+class AddressTable {
+public:
+    explicit AddressTable(Hack& hack);
+
+    AddressTable(const AddressTable&) = delete;
+    AddressTable& operator=(const AddressTable&) = delete;
+    AddressTable(AddressTable&&) = default;
+    AddressTable& operator=(AddressTable&&) = default;
+
+    // Properties
+    Hack&                       hack();
+    usize                       size() const;
+    const std::vector<string>&  modules() const;
+    const std::vector<uptr>&    values() const;
+
+    // Entries
+    void                add(const string& module_name, uptr module_offset, const uptr_path& offsets);
+    u32                 add_module(const string& module_name);
+    void                reserve(usize n_entries, usize n_offsets = 0);
+    const string&       module_name(usize i) const;
+    uptr                module_offset(usize i) const;
+    uptr_path           offsets(usize i) const;
+
+    // Load/Filter
+    const std::vector<uptr>& load_all(bool threaded = true);
+    AddressTable        filter(const std::vector<bool>& mask) const;
+    AddressTable        filter_value(uptr value) const;
+
+    // Convert
+    Address             to_address(usize i);
+
+    // C++ only
+    void                add(u32 module_index, uptr module_offset, const u32* offsets, usize n_offsets);
+
+private:
+    using ParentKey = std::pair<u32, uptr>;
+
+    void                check_index(usize i) const;
+    void                load_range(usize begin, usize end, const std::vector<uptr>& module_bases);
+
+    Hack*                   _hack{};
+    std::vector<string>     _modules{};
+    std::vector<u32>        _module_index{};
+    std::vector<uptr>       _module_offset{};
+    std::vector<u32>        _offsets_begin{0};
+    std::vector<u32>        _offsets{};
+    std::vector<uptr>       _values{};
+    std::deque<Address>     _parents{};
+    std::map<ParentKey, Address*> _parent_index{};
+};
+
+}
+
+#endif
@@ -2,10 +2,117 @@
 #include "Process.h"
 #include "Hack.h"
 
+#include <algorithm>
 #include <cassert>
 
 namespace pygamehack {
 
+//region BufferPool
+
+BufferPool::~BufferPool()
+{
+    trim_locked(0);
+}
+
+u8* BufferPool::allocate(usize size)
+{
+    if (size > MAX_BLOCK_SIZE) return (u8*)malloc(size);
+
+    std::unique_lock<std::mutex> lock{_mutex};
+    ++_stats.allocations;
+
+    auto& blocks = _blocks[size_class(size)];
+    if (_enabled && !blocks.empty()) {
+        u8* data = blocks.back();
+        blocks.pop_back();
+        ++_stats.reuses;
+        --_stats.cached_blocks;
+        _stats.cached_bytes -= block_size(size);
+        return data;
+    }
+    return (u8*)malloc(block_size(size));
+}
+
+void BufferPool::deallocate(u8* data, usize size)
+{
+    if (size > MAX_BLOCK_SIZE) { free(data); return; }
+
+    std::unique_lock<std::mutex> lock{_mutex};
+    const usize n = block_size(size);
+    if (!_enabled || _stats.cached_bytes + n > _max_cached_bytes) { free(data); return; }
+
+    _blocks[size_class(size)].push_back(data);
+    ++_stats.releases;
+    ++_stats.cached_blocks;
+    _stats.cached_bytes += n;
+}
+
+bool BufferPool::enabled() const
+{
+    return _enabled;
+}
+
+void BufferPool::set_enabled(bool enabled)
+{
+    std::unique_lock<std::mutex> lock{_mutex};
+    _enabled = enabled;
+    if (!_enabled) trim_locked(0);
+}
+
+usize BufferPool::max_cached_bytes() const
+{
+    return _max_cached_bytes;
+}
+
+void BufferPool::set_max_cached_bytes(usize size)
+{
+    std::unique_lock<std::mutex> lock{_mutex};
+    _max_cached_bytes = size;
+    trim_locked(size);
+}
+
+BufferPoolStats BufferPool::stats() const
+{
+    std::unique_lock<std::mutex> lock{_mutex};
+    return _stats;
+}
+
+void BufferPool::trim(usize max_cached_bytes)
+{
+    std::unique_lock<std::mutex> lock{_mutex};
+    trim_locked(max_cached_bytes);
+}
+
+usize BufferPool::block_size(usize size)
+{
+    return size > MAX_BLOCK_SIZE ? size : (MIN_BLOCK_SIZE << size_class(size));
+}
+
+usize BufferPool::size_class(usize size)
+{
+    usize c = 0;
+    while ((MIN_BLOCK_SIZE << c) < size) ++c;
+    return c;
+}
+
+void BufferPool::trim_locked(usize max_cached_bytes)
+{
+    // The largest blocks are released first
+    for (usize c = N_SIZE_CLASSES; c-- > 0 && _stats.cached_bytes > max_cached_bytes; ) {
+        auto& blocks = _blocks[c];
+        while (!blocks.empty() && _stats.cached_bytes > max_cached_bytes) {
+            free(blocks.back());
+            blocks.pop_back();
+            --_stats.cached_blocks;
+            _stats.cached_bytes -= MIN_BLOCK_SIZE << c;
+        }
+    }
+}
+
+//endregion
+
+//region Buffer
+
 
 Buffer::Buffer(Hack& hack, usize size):
     Buffer{hack.process(), size}
@@ -13,12 +120,13 @@ Buffer::Buffer(Hack& hack, usize size):
     
 Buffer::Buffer(const Process& process, usize size):
     process{&process},
+    _pool{process.buffer_pool_owner()},
     _is_small{size <= SMALL_SIZE},
     _owns_memory{true},
     _size{size}
 {
     PGH_ASSERT(size, "Cannot create buffer with size=0");
-    if (!_is_small) { _data = (u8*)malloc(size); }
+    if (!_is_small) { _data = pool().allocate(size); }
     memset(data(), 0, size);
 }
 
@@ -34,6 +142,8 @@ Buffer::Buffer(const Process& process, u8* data, usize size):
 
 Buffer::Buffer(Buffer& src, uptr offset, usize size):
     process{src.process},
+    _root{&src.root()},
+    _root_offset{src._root_offset + offset},
     _is_small{false},
     _owns_memory{false},
     _size{size},
@@ -45,12 +155,14 @@ Buffer::Buffer(Buffer& src, uptr offset, usize size):
 
 Buffer::Buffer(const Buffer& v):	
     process{v.process},
+    _pool{v.root()._pool},
     _is_small{v._is_small},
     _owns_memory{ true },
     _size{ v._size }
 {
-    if (!_is_small) { _data = (u8*)malloc(v._size); }
+    if (!_is_small) { _data = pool().allocate(v._size); }
 	memcpy(data(), v.data(), v._size);
+    for (auto [offset, size]: v.dirty_ranges()) { _dirty.emplace_back(offset, offset + size); }
 }
 
 Buffer& Buffer::operator=(const Buffer& v)
@@ -58,9 +170,13 @@ Buffer& Buffer::operator=(const Buffer& v)
     if (&v != this) {
         PGH_ASSERT(v._owns_memory, "Cannot copy from a buffer view");
         process = v.process;
+        if (!_pool) { _pool = v._pool; }
         _owns_memory = true;
         resize(v._size);
 	    memcpy(data(), v.data(), _size);
+        _root = nullptr;
+        _root_offset = 0;
+        _dirty = v._dirty;
     }
 	return *this;
 }
@@ -68,6 +184,10 @@ Buffer& Buffer::operator=(const Buffer& v)
 Buffer::Buffer(Buffer&& v) noexcept
 {
     process = v.process;
+    _pool = v._pool;
+    _root = v._root;
+    _root_offset = v._root_offset;
+    _dirty = std::move(v._dirty);
     _is_small = v._is_small;
     _owns_memory = v._owns_memory;
     _size = v._size;
@@ -83,15 +203,19 @@ Buffer::Buffer(Buffer&& v) noexcept
 Buffer& Buffer::operator=(Buffer&& v) noexcept
 {
 	if (&v != this) {
-        process = v.process;
+        if (_owns_memory && !_is_small && _data) pool().deallocate(_data, _size);
         if (v._is_small) {
             memcpy(storage, v.storage, v._size);
         }
         else {
-            if (_owns_memory && !_is_small && _data) free(_data);
             _data = v._data;
             v._owns_memory = false;
         }
+        process = v.process;
+        _pool = v._pool;
+        _root = v._root;
+        _root_offset = v._root_offset;
+        _dirty = std::move(v._dirty);
         _is_small = v._is_small;
         _owns_memory = v._owns_memory;
         _size = v._size;
@@ -101,7 +225,7 @@ Buffer& Buffer::operator=(Buffer&& v) noexcept
 
 Buffer::~Buffer()
 {
-    if (_owns_memory && !_is_small && _data) free(data());
+    if (_owns_memory && !_is_small && _data) pool().deallocate(_data, _size);
 }
 
 u8* Buffer::data()
@@ -122,11 +246,13 @@ usize Buffer::size() const
 void Buffer::clear()
 {
     memset(data(), 0, _size);
+    mark_dirty();
 }
 
 void Buffer::resize(usize size)
 {
     if (size == _size) return;
+    if (size < _size) clear_dirty(size, _size - size);
 
     if (_is_small && size > SMALL_SIZE) {
         grow(size);
@@ -135,7 +261,13 @@ void Buffer::resize(usize size)
         shrink();
     }
     else if (!_is_small && size > SMALL_SIZE) {
-        _data = (u8*)realloc(_data, size);
+        // Blocks are rounded up to their size class, so only a change of size class needs a new block
+        if (BufferPool::block_size(size) != BufferPool::block_size(_size)) {
+            auto* ptr = pool().allocate(size);
+            memcpy(ptr, _data, std::min<usize>(size, _size));
+            pool().deallocate(_data, _size);
+            _data = ptr;
+        }
     }
     _size = size;
 }
@@ -145,6 +277,7 @@ void Buffer::read_from(uptr src, usize size, uptr offset)
     const usize real_size = size ? size : _size;
     PGH_ASSERT(real_size <= (_size - offset), "Read will overflow buffer");
     process->read_memory(data() + offset, src, real_size);
+    clear_dirty(offset, real_size);
 }
 
 void Buffer::write_to(uptr dst, usize size, uptr offset) const
@@ -164,6 +297,7 @@ void Buffer::write_buffer(uptr offset, const Buffer& src)
 {
     PGH_ASSERT((size() - offset) >= src.size(), "Write will overflow buffer");
     memcpy(data() + offset, src.data(), src._size);
+    mark_dirty(offset, src._size);
 }
 
 uptr Buffer::read_ptr(uptr offset) const
@@ -178,6 +312,7 @@ void Buffer::write_ptr(uptr offset, uptr v)
 {
     PGH_ASSERT((offset + process->get_ptr_size()) <= _size, "Write will overflow buffer");
     memcpy(data() + offset, &v, process->get_ptr_size());
+    mark_dirty(offset, process->get_ptr_size());
 }
 
 string Buffer::read_string(uptr offset, usize size) const
@@ -191,6 +326,7 @@ void Buffer::write_string(uptr offset, const string& v)
 {
 	PGH_ASSERT((_size - offset) >= v.size(), "Write will overflow buffer");
     memcpy(data() + offset, v.c_str(), v.size());
+    mark_dirty(offset, v.size());
 }
 
 usize Buffer::strlen(uptr offset) const
@@ -199,10 +335,90 @@ usize Buffer::strlen(uptr offset) const
     return strnlen_s((const char*)(data() + offset), _size - offset + 1);
 }
 
+bool Buffer::is_dirty() const
+{
+    return !dirty_ranges().empty();
+}
+
+std::vector<Buffer::Range> Buffer::dirty_ranges(uptr offset, usize size) const
+{
+    const auto [begin, end] = root_range(offset, size);
+    std::vector<Range> ranges{};
+    for (auto [b, e]: root()._dirty) {
+        if (e <= begin || b >= end) continue;
+        b = std::max(b, begin);
+        e = std::min(e, end);
+        ranges.emplace_back(b - _root_offset, e - b);
+    }
+    return ranges;
+}
+
+void Buffer::mark_dirty(uptr offset, usize size)
+{
+    auto [begin, end] = root_range(offset, size);
+    if (begin == end) return;
+
+    // Ranges are kept sorted and merged, so any range that overlaps or touches [begin, end) is absorbed into it
+    auto& dirty = root()._dirty;
+    auto first = std::lower_bound(dirty.begin(), dirty.end(), begin, [](const std::pair<uptr, uptr>& r, uptr v) { return r.second < v; });
+    auto last = first;
+    for (; last != dirty.end() && last->first <= end; ++last) {
+        begin = std::min(begin, last->first);
+        end = std::max(end, last->second);
+    }
+
+    if (first == last) {
+        dirty.emplace(first, begin, end);
+    }
+    else {
+        *first = {begin, end};
+        dirty.erase(first + 1, last);
+    }
+}
+
+void Buffer::clear_dirty(uptr offset, usize size)
+{
+    const auto [begin, end] = root_range(offset, size);
+    auto& dirty = root()._dirty;
+    if (dirty.empty() || begin == end) return;
+
+    std::vector<std::pair<uptr, uptr>> remaining{};
+    remaining.reserve(dirty.size() + 1);
+    for (auto [b, e]: dirty) {
+        if (e <= begin || b >= end) { remaining.emplace_back(b, e); continue; }
+        if (b < begin) remaining.emplace_back(b, begin);
+        if (e > end) remaining.emplace_back(end, e);
+    }
+    dirty.swap(remaining);
+}
+
+BufferPool& Buffer::pool() const
+{
+    PGH_ASSERT(_pool, "Buffer view does not own its memory");
+    return *_pool;
+}
+
+Buffer& Buffer::root()
+{
+    return _root ? *_root : *this;
+}
+
+const Buffer& Buffer::root() const
+{
+    return _root ? *_root : *this;
+}
+
+std::pair<uptr, uptr> Buffer::root_range(uptr offset, usize size) const
+{
+    PGH_ASSERT(offset <= _size, "Offset out of range of Buffer");
+    const usize real_size = size ? std::min<usize>(size, _size - offset) : (_size - offset);
+    return {_root_offset + offset, _root_offset + offset + real_size};
+}
+
 void Buffer::grow(usize size)
 {
     PGH_ASSERT(_owns_memory, "Cannot grow buffer view");
-    auto* ptr = (u8*)malloc(size);
+    auto* ptr = pool().allocate(size);
     memcpy(ptr, storage, _size);
     _data = ptr;
     _is_small = false;
@@ -213,7 +429,7 @@ void Buffer::shrink()
     PGH_ASSERT(_owns_memory, "Cannot shrink buffer view");
     auto* ptr = _data;
     memcpy(storage, ptr, _size);
-    free(ptr);
+    pool().deallocate(ptr, _size);
     _is_small = true;
 }
 
@@ -227,4 +443,6 @@ bool Buffer::operator!=(const Buffer& other) const
     return !(*this == other);
 }
 
-}
\ No newline at end of file
+//endregion
+
+}
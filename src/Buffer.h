@@ -2,10 +2,62 @@
 #define PYGAMEHACK_BUFFER_H
 
 #include "config.h"
+#include <memory>
+#include <mutex>
+#include <vector>
 
 namespace pygamehack {
 
 
+struct BufferPoolStats {
+    u64 allocations{};
+    u64 reuses{};
+    u64 releases{};
+    usize cached_blocks{};
+    usize cached_bytes{};
+};
+
+
+// Pool for the memory of buffers that do not fit into the small buffer storage.
+// Blocks are rounded up to a power-of-two size class and cached when their buffer is destroyed,
+// so buffers that are created and destroyed repeatedly do not call malloc/free.
+class BufferPool {
+public:
+    static constexpr usize MIN_BLOCK_SIZE = 64;
+    static constexpr usize MAX_BLOCK_SIZE = 1u << 20;
+
+    BufferPool() = default;
+    ~BufferPool();
+
+    BufferPool(const BufferPool&) = delete;
+    BufferPool& operator=(const BufferPool&) = delete;
+
+    u8*             allocate(usize size);
+    void            deallocate(u8* data, usize size);
+
+    bool            enabled() const;
+    void            set_enabled(bool enabled);
+    usize           max_cached_bytes() const;
+    void            set_max_cached_bytes(usize size);
+    BufferPoolStats stats() const;
+    void            trim(usize max_cached_bytes = 0);
+
+    static usize    block_size(usize size);
+
+private:
+    static constexpr usize N_SIZE_CLASSES = 15;
+
+    static usize    size_class(usize size);
+    void            trim_locked(usize max_cached_bytes);
+
+    mutable std::mutex  _mutex{};
+    std::vector<u8*>    _blocks[N_SIZE_CLASSES]{};
+    BufferPoolStats     _stats{};
+    usize               _max_cached_bytes{64u << 20};
+    bool                _enabled{true};
+};
+
+
 class Buffer {
 public:
 	// Owns memory
@@ -54,6 +106,15 @@ public:
 
     usize       strlen(uptr offset = 0u) const;
 
+    // Dirty ranges - (offset, size) pairs of the bytes modified by the write methods since the last flush.
+    // Views share the dirty ranges of the buffer that owns their memory.
+    using Range = std::pair<uptr, usize>;
+
+    bool        is_dirty() const;
+    std::vector<Range> dirty_ranges(uptr offset = 0u, usize size = 0u) const;
+    void        mark_dirty(uptr offset = 0u, usize size = 0u);
+    void        clear_dirty(uptr offset = 0u, usize size = 0u);
+
 	// Copy/Move constructors and operators
 public:
 	Buffer(const Buffer& v);
@@ -72,8 +133,18 @@ private:
 
     void grow(usize size);
     void shrink();
+    Buffer& root();
+    const Buffer& root() const;
+    std::pair<uptr, uptr> root_range(uptr offset, usize size) const;
+
+    BufferPool& pool() const;
 
     const Process*  process{ nullptr };
+    // Only set for buffers that own their memory, the pool outlives every buffer that allocated from it
+    std::shared_ptr<BufferPool> _pool{};
+    Buffer*         _root{ nullptr };
+    uptr            _root_offset{ 0 };
+    std::vector<std::pair<uptr, uptr>> _dirty{};
     u64             _is_small: 1;
     u64             _owns_memory: 1;
 	u64             _size: 62;
@@ -96,6 +167,7 @@ template<typename T>
 void Buffer::write(uptr offset, const T& v)
 {
     memcpy(data() + offset, &v, sizeof(T));
+    mark_dirty(offset, sizeof(T));
 }
 
 template<typename T>
@@ -11,6 +11,7 @@
 
 #include <thread>
 #include <mutex>
+#include <unordered_set>
 #include <atomic>
 
 
@@ -195,16 +196,40 @@ static void do_fast_memory_scan_reduce(usize n_threads, std::vector<uptr>& resul
 
 //region Hack
 
+namespace {
+
+// Upper bound of the bytes read by a single walk or container read, so a corrupt size or structure cannot exhaust memory
+constexpr usize READ_MAX_BYTES = usize(1) << 30;
+
+// Pointer of the process stored at the given location of a local copy of its memory
+uptr ptr_at(const u8* data, usize ptr_size)
+{
+    uptr v{};
+    memcpy(&v, data, ptr_size);
+    return v;
+}
+
+// Minimum number of elements gathered by each thread, so small gathers do not pay for starting threads
+constexpr usize GATHER_MIN_PER_THREAD = 4096;
+
+// Batched reads read nearby addresses with one read of the span that covers them, when the gap between them is at most
+// READ_BATCH_GAP_BYTES and the span is at most READ_BATCH_SPAN_BYTES (nodes of a container are usually allocated close together)
+constexpr usize READ_BATCH_GAP_BYTES = 4096;
+constexpr usize READ_BATCH_SPAN_BYTES = usize(1) << 20;
+
+}
+
 Hack::Hack():
     _process{},
     _update_mask{UINT32_MAX}
 {
     // Add empty string that default-constructed addresses can return as their name
-    _address_names.add("");
+    _address_names.add("", nullptr);
 }
 
 Hack::~Hack()
 {
+    stop_background_update();
     detach();
 }
 
@@ -240,6 +265,11 @@ uptr Hack::find(i8 value, uptr begin, usize size) const
     return _process.find_char(value, begin, size);
 }
 
+usize Hack::strlen(uptr begin, usize max_len, bool wide) const
+{
+    return wide ? _process.find_wchar(0, begin, max_len * 2) / 2 : _process.find_char(0, begin, max_len);
+}
+
 std::vector<uptr> Hack::scan(Scan& scan) const
 {
     std::vector<uptr> results;
@@ -271,41 +301,53 @@ std::vector<uptr> Hack::scan_modify(Hack::Scan& scan, ScanModifyLoopFunc&& modif
     return reduced_results;
 }
 
+Address* Hack::address(const string& name) const
+{
+    return _address_names.find(name);
+}
+
+std::vector<Address*> Hack::addresses(const string& prefix) const
+{
+    return _address_names.find_prefix(prefix);
+}
+
 void Hack::start_auto_update(Address& address)
 {
     if (address.type() == Address::Type::MANUAL) return;
 
-    // Acquire lock
+    std::unique_lock<std::mutex> lock{_update_mutex};
 
     if (auto it = _address_ptr_to_handle.find(&address);
         it == _address_ptr_to_handle.end())
     {
         const u32 handle = u32(_addresses_to_update.size());
         _addresses_to_update.push_back(&address);
+        _update_due.push_back(0);
         _address_ptr_to_handle[&address] = handle; 
+        _update_order_dirty = true;
+        _update_cv.notify_all();
     }
-    
-    // Release lock
 }
 
 void Hack::stop_auto_update(Address& address)
 {
     if (address.type() == Address::Type::MANUAL) return;
     
-    // Acquire lock
+    std::unique_lock<std::mutex> lock{_update_mutex};
 
     if (auto it = _address_ptr_to_handle.find(&address);
         it != _address_ptr_to_handle.end())
     {
         const u32 handle = it->second;
         Address* last = _addresses_to_update.back();
-        _addresses_to_update.pop_back();
         _addresses_to_update[handle] = last;
+        _addresses_to_update.pop_back();
+        _update_due[handle] = _update_due.back();
+        _update_due.pop_back();
         _address_ptr_to_handle[last] = handle;
-        _address_ptr_to_handle.erase(it->first);
+        _address_ptr_to_handle.erase(&address);
+        _update_order_dirty = true;
     }
-
-    // Release lock
 }
 
 void Hack::set_update_mask(u32 mask)
@@ -315,19 +357,563 @@ void Hack::set_update_mask(u32 mask)
 
 void Hack::update()
 {
-    // Acquire lock
-    
-    for (auto* address: _addresses_to_update) { address->unload(); }
+    std::unique_lock<std::mutex> lock{_update_mutex};
+    update_due(steady_time_us(), 0);
+    release_published(lock);
+}
+
+double Hack::next_update_in() const
+{
+    std::unique_lock<std::mutex> lock{_update_mutex};
+    const u64 now = steady_time_us();
+    u64 next = UINT64_MAX;
+    for (usize h = 0; h < _addresses_to_update.size(); ++h) {
+        next = std::min(next, _addresses_to_update[h]->update_interval_us() ? _update_due[h] : now);
+    }
+    return next == UINT64_MAX ? -1.0 : double(next > now ? next - now : 0) / 1e6;
+}
 
+void Hack::start_background_update(double interval)
+{
+    PGH_ASSERT(interval > 0.0, "Background update interval must be greater than 0");
+
+    stop_background_update();
+
+    const u64 tick = std::max<u64>(1u, u64(interval * 1e6));
+    _update_thread_running = true;
+    _update_thread = std::thread([this, tick]() {
+        std::unique_lock<std::mutex> lock{_update_mutex};
+        while (_update_thread_running) {
+            const u64 next = update_due(steady_time_us(), tick);
+            release_published(lock);
+            _update_cv.wait_until(lock, std::chrono::steady_clock::time_point{std::chrono::microseconds{next}},
+                [this]() { return !_update_thread_running || _update_order_dirty; });
+        }
+    });
+}
+
+void Hack::stop_background_update()
+{
+    if (!_update_thread.joinable()) return;
+    {
+        std::unique_lock<std::mutex> lock{_update_mutex};
+        _update_thread_running = false;
+        _update_cv.notify_all();
+    }
+    _update_thread.join();
+}
+
+bool Hack::background_update_running() const
+{
+    return _update_thread_running;
+}
+
+u64 Hack::steady_time_us()
+{
+    return u64(std::chrono::duration_cast<std::chrono::microseconds>(std::chrono::steady_clock::now().time_since_epoch()).count());
+}
+
+u64 Hack::update_due(u64 now, u64 tick)
+{
+    static constexpr u64 IDLE_WAIT_US = 1000000u;
+
+    if (_update_order_dirty) { rebuild_update_order(); }
+
+    // Pointers read during the previous tick are stale
+    _process.invalidate();
+
+    // Addresses that fall due within 1/8th of their interval are loaded early, which coalesces them with the current batch
+    u64 next = UINT64_MAX;
+    _update_is_due.assign(_addresses_to_update.size(), false);
+    for (usize h = 0; h < _addresses_to_update.size(); ++h) {
+        const u64 interval = _addresses_to_update[h]->update_interval_us();
+        if (interval == 0 || _update_due[h] <= now + interval / 8) {
+            _update_is_due[h] = true;
+            _update_due[h] = now + interval;
+        }
+        next = std::min(next, interval ? _update_due[h] : now + tick);
+    }
+
+    // Levels are loaded in dependency order, so every parent is resolved (at most once) before its children
     const u32 mask = _update_mask;
-    for (auto* address: _addresses_to_update) { address->update(mask); }
-    
-    // Release lock
+    for (auto& level: _update_levels) {
+        for (u32 h: level) {
+            if (!_update_is_due[h]) continue;
+            Address* address = _addresses_to_update[h];
+            address->unload();
+            address->update(mask);
+        }
+    }
+
+    publish_variables(now, tick, next);
+
+    // Nothing to update, wait until an address is added
+    return next == UINT64_MAX ? now + IDLE_WAIT_US : next;
+}
+
+void Hack::register_variable(const PublishedVariable& variable, double interval, std::shared_ptr<void> owner)
+{
+    PGH_ASSERT(interval >= 0.0 && interval * 1e6 <= double(UINT32_MAX), "Update interval must be between 0 and ~4294 seconds");
+
+    PublishedVariableState state{variable, u32(interval * 1e6), 0};
+    state.owner = std::move(owner);
+    {
+        std::unique_lock<std::mutex> lock{_update_mutex};
+        auto it = std::find_if(_published_variables.begin(), _published_variables.end(), 
+            [&variable](const PublishedVariableState& s) { return s.variable.variable == variable.variable; });
+
+        if (it == _published_variables.end()) {
+            _published_variables.push_back(std::move(state));
+        }
+        else {
+            PGH_ASSERT(!it->watch, "Cannot register a watched variable, unwatch it first");
+            std::swap(*it, state);
+        }
+        ++_published_layout;
+        _update_cv.notify_all();
+    }
+    // The owner of a replaced registration is released outside of the lock, like in 'unwatch'
+    state.owner.reset();
+}
+
+void Hack::unregister_variable(const void* variable)
+{
+    std::shared_ptr<void> owner{};
+    {
+        std::unique_lock<std::mutex> lock{_update_mutex};
+        auto it = std::find_if(_published_variables.begin(), _published_variables.end(), 
+            [variable](const PublishedVariableState& s) { return s.variable.variable == variable; });
+
+        if (it != _published_variables.end()) {
+            owner = std::move(it->owner);
+            _published_variables.erase(it);
+            ++_published_layout;
+        }
+    }
+    owner.reset();
+}
+
+u64 Hack::sync_variables() const
+{
+    // Lock-free: the update thread never writes into a frame that is still referenced by a reader
+    std::shared_ptr<const Frame> frame = std::atomic_load(&_published_frame);
+    if (!frame) return 0;
+
+    for (const auto& v: frame->variables) {
+        if (u8* dst = v.storage(v.variable, v.size)) {
+            memcpy(dst, frame->data.data() + v.frame_offset, v.size);
+        }
+    }
+    return frame->number;
+}
+
+u64 Hack::frame() const
+{
+    std::shared_ptr<const Frame> frame = std::atomic_load(&_published_frame);
+    return frame ? frame->number : 0;
+}
+
+u32 Hack::watch(const std::vector<PublishedVariable>& variables, double interval, std::shared_ptr<void> owner)
+{
+    PGH_ASSERT(interval >= 0.0 && interval * 1e6 <= double(UINT32_MAX), "Update interval must be between 0 and ~4294 seconds");
+    PGH_ASSERT(variables.size() <= UINT32_MAX, "Too many variables to watch");
+
+    std::unique_lock<std::mutex> lock{_update_mutex};
+
+    // A variable has a single previous value, so it can only belong to one watch (or registration) at a time
+    for (u32 i = 0; i < u32(variables.size()); ++i) {
+        const void* variable = variables[i].variable;
+        auto registered = [variable](const PublishedVariableState& s) { return s.variable.variable == variable; };
+        auto duplicate = [variable](const PublishedVariable& v) { return v.variable == variable; };
+        PGH_ASSERT(std::none_of(_published_variables.begin(), _published_variables.end(), registered), 
+            "Cannot watch a variable that is already watched or registered");
+        PGH_ASSERT(std::none_of(variables.begin(), variables.begin() + i, duplicate), 
+            "Cannot watch the same variable more than once");
+    }
+
+    const u32 watch = _next_watch++;
+    _watches[watch] = owner;
+
+    // Every state shares the owner of the watch, so the frames that refer to the variables keep them alive
+    for (u32 i = 0; i < u32(variables.size()); ++i) {
+        _published_variables.push_back(PublishedVariableState{variables[i], u32(interval * 1e6), 0, watch, i});
+        _published_variables.back().owner = owner;
+    }
+    ++_published_layout;
+    _update_cv.notify_all();
+    return watch;
+}
+
+void Hack::unwatch(u32 watch)
+{
+    std::shared_ptr<void> owner{};
+    {
+        std::unique_lock<std::mutex> lock{_update_mutex};
+        auto it = _watches.find(watch);
+        if (it == _watches.end()) return;
+        owner = std::move(it->second);
+        _watches.erase(it);
+
+        _published_variables.erase(std::remove_if(_published_variables.begin(), _published_variables.end(),
+            [watch](const PublishedVariableState& s) { return s.watch == watch; }), _published_variables.end());
+        _changes.erase(std::remove_if(_changes.begin(), _changes.end(),
+            [watch](const VariableChange& c) { return c.watch == watch; }), _changes.end());
+        ++_published_layout;
+    }
+    // The owner is released outside of the lock, its destructor may need to wait for other locks (e.g. the GIL)
+    owner.reset();
+}
+
+std::vector<Hack::VariableChange> Hack::take_changes(usize max_changes)
+{
+    std::unique_lock<std::mutex> lock{_update_mutex};
+    const usize n = max_changes ? std::min<usize>(max_changes, _changes.size()) : _changes.size();
+    std::vector<VariableChange> changes{std::make_move_iterator(_changes.begin()), std::make_move_iterator(_changes.begin() + n)};
+    _changes.erase(_changes.begin(), _changes.begin() + n);
+    return changes;
+}
+
+std::shared_ptr<void> Hack::watch_owner(u32 watch) const
+{
+    std::unique_lock<std::mutex> lock{_update_mutex};
+    auto it = _watches.find(watch);
+    return it == _watches.end() ? nullptr : it->second;
+}
+
+void Hack::publish_variables(u64 now, u64 tick, u64& next)
+{
+    // Changes that have not been taken are dropped (oldest first) once the queue is full
+    static constexpr usize MAX_QUEUED_CHANGES = 1u << 16;
+
+    const Frame* front = _frames[_frame_index].get();
+    const Frame* previous_back = _frames[_frame_index ^ 1].get();
+    if (_published_variables.empty() && (!front || front->variables.empty()) && (!previous_back || previous_back->variables.empty())) return;
+
+    // Double-buffering: the back frame is reused unless a reader still holds it from a previous sync.
+    // Replaced frames and owners are released by the caller outside of the lock, their owners may need other locks (e.g. the GIL)
+    auto& back = _frames[_frame_index ^ 1];
+    if (!back || back.use_count() > 1) {
+        if (back) { _published_released.push_back(std::move(back)); }
+        back = std::make_shared<Frame>();
+    }
+
+    if (back->layout != _published_layout || back->variables.size() != _published_variables.size()) {
+        usize frame_size = 0;
+        back->variables.clear();
+        for (auto& owner: back->owners) { _published_released.push_back(std::move(owner)); }
+        back->owners.clear();
+        for (auto& state: _published_variables) {
+            state.variable.frame_offset = frame_size;
+            back->variables.push_back(state.variable);
+            back->owners.push_back(state.owner);
+            frame_size += state.variable.size;
+        }
+        back->data.resize(frame_size);
+        back->layout = _published_layout;
+    }
+
+    // Variables that are not due keep the value of the previous frame, which may have had a different layout
+    const u64 number = front ? front->number + 1 : 1;
+    for (auto& state: _published_variables) {
+        const PublishedVariable& v = state.variable;
+        u8* dst = back->data.data() + v.frame_offset;
+        const u8* previous = state.in_front ? front->data.data() + state.front_offset : nullptr;
+        const bool is_due = !previous || state.interval == 0 || state.due <= now + state.interval / 8;
+
+        if (is_due) { state.due = now + state.interval; }
+        next = std::min(next, state.interval ? state.due : now + tick);
+
+        state.in_front = true;
+        state.front_offset = v.frame_offset;
+
+        if (!(is_due && v.address->loaded() && _process.read_memory(dst, v.address->value() + v.offset, v.size))) {
+            if (previous) { memcpy(dst, previous, v.size); }
+            else { memset(dst, 0, v.size); }
+        }
+        else if (state.watch && previous && memcmp(dst, previous, v.size) != 0) {
+            if (_changes.size() == MAX_QUEUED_CHANGES) { _changes.pop_front(); }
+            _changes.push_back(VariableChange{state.watch, state.watch_index, number, 
+                string{(const char*)previous, v.size}, string{(const char*)dst, v.size}});
+        }
+    }
+
+    back->number = number;
+    std::atomic_store(&_published_frame, std::shared_ptr<const Frame>(back));
+    _frame_index ^= 1;
+}
+
+void Hack::release_published(std::unique_lock<std::mutex>& lock)
+{
+    if (_published_released.empty()) return;
+    std::vector<std::shared_ptr<void>> released{};
+    released.swap(_published_released);
+    lock.unlock();
+    released.clear();
+    lock.lock();
+}
+
+static usize address_depth(const Address& address)
+{
+    usize depth = 0;
+    for (const Address* a = &address; a->type() == Address::Type::DYNAMIC; a = &a->parent()) { ++depth; }
+    return depth;
+}
+
+void Hack::rebuild_update_order()
+{
+    // Group auto-update addresses by the length of their parent chain (topological order of the dependency DAG)
+    _update_levels.clear();
+    for (u32 h = 0; h < u32(_addresses_to_update.size()); ++h) {
+        const usize depth = address_depth(*_addresses_to_update[h]);
+        if (depth >= _update_levels.size()) { _update_levels.resize(depth + 1); }
+        _update_levels[depth].push_back(h);
+    }
+
+    // Siblings are loaded back-to-back so that their shared parent stays hot
+    for (usize depth = 1; depth < _update_levels.size(); ++depth) {
+        auto& level = _update_levels[depth];
+        std::stable_sort(level.begin(), level.end(), [this](u32 a, u32 b) { 
+            return &_addresses_to_update[a]->parent() < &_addresses_to_update[b]->parent(); 
+        });
+    }
+
+    _update_order_dirty = false;
 }
 
 void Hack::read_buffer(uptr ptr, Buffer& dst) const
 {
     _process.read_memory(dst.data(), ptr, dst.size());
+    dst.clear_dirty();
+}
+
+usize Hack::read_many(const std::vector<uptr>& ptrs, Buffer& dst, usize size, usize stride) const
+{
+    stride = stride ? stride : size;
+    PGH_ASSERT(size <= stride, "Stride of read_many must be at least as large as the size of each read");
+    PGH_ASSERT(ptrs.empty() || (ptrs.size() - 1) * stride + size <= dst.size(), "Buffer is too small for read_many");
+
+    const usize n_read = read_batch(ptrs, size, dst.data(), stride);
+    dst.clear_dirty();
+    return n_read;
+}
+
+usize Hack::read_batch(const std::vector<uptr>& ptrs, usize size, u8* dst, usize stride, bool* read) const
+{
+    // Addresses are read in address order, so that nearby addresses can be read together with one read of their span.
+    // Null and unreadable addresses are read as zeros, and spans that cannot be read are read one address at a time.
+    std::vector<usize> order{};
+    order.reserve(ptrs.size());
+    for (usize i = 0; i < ptrs.size(); ++i) {
+        if (ptrs[i]) { order.push_back(i); }
+        else {
+            memset(dst + i * stride, 0, size);
+            if (read) { read[i] = false; }
+        }
+    }
+    std::sort(order.begin(), order.end(), [&ptrs](usize a, usize b) { return ptrs[a] < ptrs[b]; });
+
+    usize n_read = 0;
+    std::vector<u8> span{};
+    for (usize begin = 0; begin < order.size();) {
+        const uptr lo = ptrs[order[begin]];
+        uptr hi = lo + size;
+        usize end = begin + 1;
+        while (end < order.size() && ptrs[order[end]] <= hi + READ_BATCH_GAP_BYTES && ptrs[order[end]] + size - lo <= READ_BATCH_SPAN_BYTES) {
+            hi = std::max<uptr>(hi, ptrs[order[end]] + size);
+            ++end;
+        }
+
+        bool span_read = false;
+        if (end - begin > 1) {
+            span.resize(hi - lo);
+            span_read = _process.read_memory(span.data(), lo, span.size());
+        }
+
+        for (usize k = begin; k < end; ++k) {
+            const usize i = order[k];
+            u8* out = dst + i * stride;
+            bool ok = true;
+            if (span_read) { memcpy(out, span.data() + (ptrs[i] - lo), size); }
+            else { ok = _process.read_memory(out, ptrs[i], size); }
+            if (!ok) { memset(out, 0, size); }
+            if (read) { read[i] = ok; }
+            n_read += ok;
+        }
+        begin = end;
+    }
+    return n_read;
+}
+
+usize Hack::read_buffers(const std::vector<uptr>& ptrs, const std::vector<Buffer*>& dsts) const
+{
+    PGH_ASSERT(ptrs.size() == dsts.size(), "read_buffers requires one buffer per address");
+
+    // Null and unreadable addresses are read as zeros
+    usize n_read = 0;
+    for (usize i = 0; i < ptrs.size(); ++i) {
+        Buffer& dst = *dsts[i];
+        if (ptrs[i] && _process.read_memory(dst.data(), ptrs[i], dst.size())) { ++n_read; }
+        else { memset(dst.data(), 0, dst.size()); }
+        dst.clear_dirty();
+    }
+    return n_read;
+}
+
+std::vector<uptr> Hack::walk_list(uptr head, usize next_offset, usize node_size, Buffer& dst, usize max_nodes, uptr sentinel) const
+{
+    const usize p = _process.get_ptr_size();
+    PGH_ASSERT(next_offset + p <= node_size, "Next pointer of walk_list must be inside of each node");
+
+    // The walk stops at a null or sentinel pointer, an unreadable node, or the first node that has already been visited
+    const usize limit = max_nodes ? max_nodes : READ_MAX_BYTES / node_size;
+    std::vector<uptr> addresses{};
+    std::vector<u8> nodes{};
+    std::unordered_set<uptr> visited{};
+
+    uptr next = head;
+    while (addresses.size() < limit && next && next != sentinel && visited.insert(next).second) {
+        const usize offset = nodes.size();
+        nodes.resize(offset + node_size);
+        if (!_process.read_memory(nodes.data() + offset, next, node_size)) {
+            nodes.resize(offset);
+            break;
+        }
+        addresses.push_back(next);
+        next = ptr_at(nodes.data() + offset + next_offset, p);
+    }
+
+    dst.resize(nodes.size());
+    if (!nodes.empty()) { memcpy(dst.data(), nodes.data(), nodes.size()); }
+    dst.clear_dirty();
+    return addresses;
+}
+
+std::vector<uptr> Hack::walk_tree(uptr root, usize left_offset, usize right_offset, usize node_size, Buffer& dst, usize max_nodes, uptr sentinel) const
+{
+    const usize p = _process.get_ptr_size();
+    PGH_ASSERT(left_offset + p <= node_size && right_offset + p <= node_size, "Child pointers of walk_tree must be inside of each node");
+
+    // The tree is walked breadth-first, and each node is only visited once, so shared subtrees and cycles are walked once
+    const usize limit = max_nodes ? max_nodes : READ_MAX_BYTES / node_size;
+    std::vector<uptr> addresses{};
+    std::vector<u8> nodes{};
+    std::unordered_set<uptr> visited{};
+    std::vector<uptr> level{}, next_level{};
+
+    if (root && root != sentinel) {
+        visited.insert(root);
+        level.push_back(root);
+    }
+
+    // Each level is read with one batched read
+    std::vector<u8> level_nodes{};
+    std::unique_ptr<bool[]> level_read{};
+    while (!level.empty() && addresses.size() < limit) {
+        if (level.size() > limit - addresses.size()) { level.resize(limit - addresses.size()); }
+        level_nodes.resize(level.size() * node_size);
+        level_read.reset(new bool[level.size()]);
+        read_batch(level, node_size, level_nodes.data(), node_size, level_read.get());
+
+        next_level.clear();
+        for (usize i = 0; i < level.size(); ++i) {
+            if (!level_read[i]) continue;
+            const u8* node = level_nodes.data() + i * node_size;
+            nodes.insert(nodes.end(), node, node + node_size);
+            addresses.push_back(level[i]);
+
+            for (usize child_offset: {left_offset, right_offset}) {
+                const uptr child = ptr_at(node + child_offset, p);
+                if (child && child != sentinel && visited.insert(child).second) { next_level.push_back(child); }
+            }
+        }
+        std::swap(level, next_level);
+    }
+
+    dst.resize(nodes.size());
+    if (!nodes.empty()) { memcpy(dst.data(), nodes.data(), nodes.size()); }
+    dst.clear_dirty();
+    return addresses;
+}
+
+usize Hack::gather(const std::vector<uptr>& ptrs, const uptr_path& offsets, Buffer& dst, Buffer& valid, usize size, bool threaded) const
+{
+    PGH_ASSERT(ptrs.size() * size <= dst.size(), "Buffer is too small for gather");
+    PGH_ASSERT(ptrs.size() <= valid.size(), "Validity buffer is too small for gather");
+
+    const usize p = _process.get_ptr_size();
+
+    // Each pointer is followed through the offsets like a dynamic address (add the offset, then read the next pointer).
+    // Null pointers and unreadable memory along the path make the element invalid, and invalid elements are read as zeros.
+    const auto gather_range = [&](usize begin, usize end) {
+        usize n_valid = 0;
+        for (usize i = begin; i < end; ++i) {
+            u8* out = dst.data() + i * size;
+            uptr address = ptrs[i];
+            bool ok = address != 0;
+            for (usize o = 0; ok && o < offsets.size(); ++o) {
+                if (o > 0) {
+                    uptr next = 0;
+                    ok = _process.read_memory(&next, address, p) && next;
+                    address = next;
+                }
+                address += offsets[o];
+            }
+            ok = ok && _process.read_memory(out, address, size);
+            if (!ok) { memset(out, 0, size); }
+            valid.data()[i] = u8(ok);
+            n_valid += usize(ok);
+        }
+        return n_valid;
+    };
+
+    // Elements are split into contiguous ranges, one per thread, only when there are enough elements to be worth it
+    const usize n_threads = threaded ? std::min<usize>(std::thread::hardware_concurrency(), ptrs.size() / GATHER_MIN_PER_THREAD) : 0;
+    usize n_valid = 0;
+
+    if (n_threads <= 1) {
+        n_valid = gather_range(0, ptrs.size());
+    }
+    else {
+        const usize per_thread = (ptrs.size() + n_threads - 1) / n_threads;
+        std::vector<std::thread> threads(n_threads);
+        std::vector<usize> counts(n_threads);
+
+        for (usize i = 0; i < n_threads; ++i) {
+            threads[i] = std::thread([&gather_range, &counts, &ptrs, per_thread](usize i) {
+                const usize begin = std::min(i * per_thread, ptrs.size());
+                counts[i] = gather_range(begin, std::min(begin + per_thread, ptrs.size()));
+            }, i);
+        }
+
+        for (usize i = 0; i < n_threads; ++i) {
+            threads[i].join();
+            n_valid += counts[i];
+        }
+    }
+
+    dst.clear_dirty();
+    valid.clear_dirty();
+    return n_valid;
+}
+
+void Hack::write_buffers(const std::vector<uptr>& ptrs, const std::vector<Buffer*>& srcs, bool all) const
+{
+    PGH_ASSERT(ptrs.size() == srcs.size(), "write_buffers requires one buffer per address");
+
+    // Only the modified bytes of each buffer are written, unless 'all' is true
+    for (usize i = 0; i < ptrs.size(); ++i) {
+        Buffer& src = *srcs[i];
+        if (!ptrs[i]) continue;
+        if (all) {
+            _process.write_memory(ptrs[i], src.data(), src.size());
+        }
+        else {
+            for (auto [offset, size]: src.dirty_ranges()) {
+                _process.write_memory(ptrs[i] + offset, src.data() + offset, size);
+            }
+        }
+        src.clear_dirty();
+    }
 }
 
 void Hack::write_buffer(uptr ptr, const Buffer& src) const
@@ -362,6 +948,397 @@ void Hack::write_string(uptr ptr, const string& v) const
 
 //endregion
 
+//region MSVC STL containers
+
+namespace {
+
+// Layouts of the containers of the MSVC standard library in release builds, where 'p' is the pointer size of the process:
+//   vector          _Myfirst, _Mylast, _Myend
+//   list            _Myhead, _Mysize                               node: _Next, _Prev, _Myval
+//   map/set         _Myhead, _Mysize                               node: _Left, _Parent, _Right, char _Color, char _Isnil, _Myval
+//   unordered_map   float _Max_bucket_size (padded to p), list, _Vec (first and last node of each bucket), _Mask, _Maxidx
+//   basic_string    union { _Buf[16 bytes], _Ptr }, _Mysize, _Myres
+constexpr usize STL_STRING_BUFFER_BYTES = 16;
+
+usize stl_align(usize offset, usize align)
+{
+    return align > 1 ? (offset + align - 1) / align * align : offset;
+}
+
+}
+
+std::vector<uptr> Hack::read_stl(StlContainer container, uptr ptr, Buffer& dst, usize value_size, usize value_align, usize max_size) const
+{
+    PGH_ASSERT(value_size, "STL container value size must be greater than 0");
+
+    const usize p = _process.get_ptr_size();
+    const usize max_count = std::min(max_size ? max_size : READ_MAX_BYTES, READ_MAX_BYTES / value_size);
+    std::vector<uptr> addresses{};
+
+    // Vector elements are contiguous, so they are read with a single read
+    if (container == StlContainer::VECTOR) {
+        u8 header[3 * sizeof(uptr)]{};
+        const bool loaded = ptr && _process.read_memory(header, ptr, 3 * p);
+        const uptr first = ptr_at(header, p), last = ptr_at(header + p, p), end = ptr_at(header + 2 * p, p);
+
+        usize count = loaded && first && first <= last && last <= end ? std::min((last - first) / value_size, max_count) : 0;
+        dst.resize(count * value_size);
+        if (count && !_process.read_memory(dst.data(), first, count * value_size)) {
+            count = 0;
+            dst.resize(0);
+        }
+
+        addresses.reserve(count);
+        for (usize i = 0; i < count; ++i) { addresses.push_back(first + i * value_size); }
+        dst.clear_dirty();
+        return addresses;
+    }
+
+    // The list of an unordered_map follows its max load factor
+    u8 header[5 * sizeof(uptr)]{};
+    const bool is_hash = container == StlContainer::UNORDERED_MAP;
+    const bool loaded = ptr && _process.read_memory(header, ptr, is_hash ? 5 * p : 2 * p);
+    const usize list_offset = is_hash ? p : 0;
+    const uptr head = loaded ? ptr_at(header + list_offset, p) : 0;
+    const usize size = loaded ? std::min<usize>(ptr_at(header + list_offset + p, p), max_count) : 0;
+
+    const usize value_offset = stl_align(container == StlContainer::MAP ? 3 * p + 2 : 2 * p, value_align);
+    const usize node_size = value_offset + value_size;
+
+    // Traversals stop after 'size' elements or at the first node that has already been visited
+    std::unordered_set<uptr> visited{head};
+    std::vector<u8> values{};
+    std::vector<u8> node(node_size);
+
+    const auto add = [&](uptr address, const u8* data) {
+        addresses.push_back(address + value_offset);
+        values.insert(values.end(), data + value_offset, data + node_size);
+    };
+
+    const auto walk_list = [&](uptr next) {
+        while (addresses.size() < size && next && visited.insert(next).second) {
+            if (!_process.read_memory(node.data(), next, node_size)) break;
+            add(next, node.data());
+            next = ptr_at(node.data(), p);
+        }
+    };
+
+    if (!head || !size) {}
+
+    else if (container == StlContainer::LIST) {
+        walk_list(read_ptr(head));
+    }
+
+    // The tree is read one level at a time by 'walk_tree', then the elements are added in key order from the local copy
+    // of the tree. Leaves point to the head node, so the head is the sentinel of the walk.
+    else if (container == StlContainer::MAP) {
+        Buffer nodes{_process, node_size};
+        const std::vector<uptr> tree = walk_tree(read_ptr(head + p), 0, 2 * p, node_size, nodes, size, head);
+
+        std::unordered_map<uptr, usize> index{};
+        for (usize i = 0; i < tree.size(); ++i) { index.emplace(tree[i], i); }
+
+        // Each node only keeps the child pointers that first reached a node in breadth-first order, like the walk,
+        // so the local copy is a tree (even if the memory has cycles) and the in-order traversal terminates
+        std::vector<usize> left(tree.size(), SIZE_MAX), right(tree.size(), SIZE_MAX);
+        std::vector<bool> reached(tree.size(), false);
+        if (!tree.empty()) { reached[0] = true; }
+        for (usize i = 0; i < tree.size(); ++i) {
+            for (auto [child_offset, child]: {std::make_pair(usize(0), &left), std::make_pair(2 * p, &right)}) {
+                auto it = index.find(ptr_at(nodes.data() + i * node_size + child_offset, p));
+                if (it != index.end() && !reached[it->second]) {
+                    reached[it->second] = true;
+                    (*child)[i] = it->second;
+                }
+            }
+        }
+
+        std::vector<usize> stack{};
+        usize current = tree.empty() ? SIZE_MAX : 0;
+        while (current != SIZE_MAX || !stack.empty()) {
+            while (current != SIZE_MAX) {
+                stack.push_back(current);
+                current = left[current];
+            }
+            current = stack.back();
+            stack.pop_back();
+            add(tree[current], nodes.data() + current * node_size);
+            current = right[current];
+        }
+    }
+
+    // Each bucket holds its first and last node in the list of all elements, so instead of following the list one node
+    // at a time, the next node of every bucket is read in each pass. Elements are in bucket order, not in list order.
+    else {
+        const uptr first = ptr_at(header + 3 * p, p), last = ptr_at(header + 4 * p, p);
+        const usize n_buckets = first && first <= last ? std::min<usize>((last - first) / (2 * p), READ_MAX_BYTES / (2 * p)) : 0;
+        std::vector<u8> buckets(n_buckets * 2 * p);
+
+        if (n_buckets && _process.read_memory(buckets.data(), first, buckets.size())) {
+            std::vector<std::pair<uptr, uptr>> chains{};
+            for (usize i = 0; i < n_buckets; ++i) {
+                const uptr lo = ptr_at(buckets.data() + 2 * i * p, p), hi = ptr_at(buckets.data() + (2 * i + 1) * p, p);
+                if (lo && lo != head) { chains.emplace_back(lo, hi); }
+            }
+
+            // The current node of every chain is read with one batched read per pass
+            std::vector<uptr> pass{};
+            std::vector<u8> pass_nodes{};
+            std::unique_ptr<bool[]> pass_read{};
+            while (!chains.empty() && addresses.size() < size) {
+                usize n_pending = 0;
+                pass.clear();
+                for (usize i = 0; i < chains.size() && pass.size() < size - addresses.size(); ++i) {
+                    if (visited.insert(chains[i].first).second) {
+                        chains[n_pending++] = chains[i];
+                        pass.push_back(chains[i].first);
+                    }
+                }
+                pass_nodes.resize(pass.size() * node_size);
+                pass_read.reset(new bool[pass.size()]);
+                read_batch(pass, node_size, pass_nodes.data(), node_size, pass_read.get());
+
+                usize n_chains = 0;
+                for (usize i = 0; i < pass.size(); ++i) {
+                    if (!pass_read[i]) continue;
+                    const u8* data = pass_nodes.data() + i * node_size;
+                    add(pass[i], data);
+                    if (pass[i] != chains[i].second) { chains[n_chains++] = {ptr_at(data, p), chains[i].second}; }
+                }
+                chains.resize(n_chains);
+            }
+        }
+        else {
+            walk_list(read_ptr(head));
+        }
+    }
+
+    dst.resize(values.size());
+    if (!values.empty()) { memcpy(dst.data(), values.data(), values.size()); }
+    dst.clear_dirty();
+    return addresses;
+}
+
+std::vector<string> Hack::read_stl_strings(const std::vector<uptr>& ptrs, usize char_size, usize max_size) const
+{
+    PGH_ASSERT(char_size == 1 || char_size == 2 || char_size == 4, "STL string character size must be 1, 2 or 4");
+
+    const usize p = _process.get_ptr_size();
+    std::vector<string> strings(ptrs.size());
+    u8 header[STL_STRING_BUFFER_BYTES + 2 * sizeof(uptr)]{};
+
+    // Short strings are stored inside of the string (small string optimization), long strings are read from their pointer
+    for (usize i = 0; i < ptrs.size(); ++i) {
+        if (!ptrs[i] || !_process.read_memory(header, ptrs[i], STL_STRING_BUFFER_BYTES + 2 * p)) continue;
+
+        const usize capacity = ptr_at(header + STL_STRING_BUFFER_BYTES + p, p);
+        usize size = ptr_at(header + STL_STRING_BUFFER_BYTES, p);
+        if (size > capacity || size > READ_MAX_BYTES / char_size) continue;
+        size = max_size ? std::min(size, max_size) : size;
+
+        strings[i].resize(size * char_size);
+        if (capacity < STL_STRING_BUFFER_BYTES / char_size) {
+            memcpy(strings[i].data(), header, size * char_size);
+        }
+        else if (!_process.read_memory(strings[i].data(), ptr_at(header, p), size * char_size)) {
+            strings[i].clear();
+        }
+    }
+    return strings;
+}
+
+//endregion
+
+//region Unreal Engine containers
+
+namespace {
+
+// Layouts of the Unreal Engine (4.23+) containers read below, where 'p' is the pointer size of the process:
+//   TArray               Data, i32 ArrayNum, i32 ArrayMax
+//   TSparseArray         TArray of elements, TBitArray of allocation flags (1 bit per element, 32 bits per word)
+//   FChunkedFixedUObjectArray  Objects (pointer to array of chunk pointers), ..., i32 NumElements
+//   FNamePool blocks     Entries are 'stride' aligned, an entry id is (block << 16) | (offset / stride)
+//   FNameEntry           u16 header (bit 0: wide, bits 6-15: length), then the characters
+constexpr usize UE_FNAME_BLOCK_BITS = 16;
+constexpr usize UE_FNAME_MAX_LENGTH = 1024;
+constexpr usize UE_FNAME_HEADER_BYTES = 2;
+
+// Entries that are further apart than this in a block are read one at a time instead of reading the memory between them
+constexpr usize UE_FNAME_MAX_SPAN_BYTES = usize(1) << 20;
+
+void ue_append_utf8(string& out, u32 c)
+{
+    // Surrogates cannot be encoded on their own, so they are replaced with U+FFFD
+    if (c >= 0xD800 && c < 0xE000) { c = 0xFFFD; }
+
+    if (c < 0x80) {
+        out.push_back(char(c));
+    }
+    else if (c < 0x800) {
+        out.push_back(char(0xC0 | (c >> 6)));
+        out.push_back(char(0x80 | (c & 0x3F)));
+    }
+    else {
+        out.push_back(char(0xE0 | (c >> 12)));
+        out.push_back(char(0x80 | ((c >> 6) & 0x3F)));
+        out.push_back(char(0x80 | (c & 0x3F)));
+    }
+}
+
+// Decode the entry at the start of 'data' into 'out', returns false if the entry does not fit in 'size' bytes
+bool ue_decode_fname(const u8* data, usize size, string& out)
+{
+    if (size < UE_FNAME_HEADER_BYTES) return false;
+
+    u16 header{};
+    memcpy(&header, data, sizeof(header));
+    const bool wide = header & 1;
+    const usize length = header >> 6;
+    if (UE_FNAME_HEADER_BYTES + length * (wide ? 2 : 1) > size) return false;
+
+    // Names are returned as UTF-8, ANSI names are Latin-1 and wide names are UCS-2
+    const u8* chars = data + UE_FNAME_HEADER_BYTES;
+    out.clear();
+    if (!wide && std::all_of(chars, chars + length, [](u8 c) { return c < 0x80; })) {
+        out.assign(reinterpret_cast<const char*>(chars), length);
+        return true;
+    }
+    for (usize i = 0; i < length; ++i) {
+        u16 c = chars[i];
+        if (wide) { memcpy(&c, chars + 2 * i, sizeof(c)); }
+        ue_append_utf8(out, c);
+    }
+    return true;
+}
+
+}
+
+std::vector<uptr> Hack::read_sparse_array(uptr ptr, usize count, usize stride, uptr flags, Buffer& dst, usize value_size) const
+{
+    PGH_ASSERT(value_size && value_size <= stride, "Sparse array value size must be greater than 0 and at most the stride");
+
+    count = ptr ? std::min(count, READ_MAX_BYTES / stride) : 0;
+    std::vector<uptr> addresses{};
+
+    // Dense arrays are read directly into the buffer with a single read
+    if (!flags && stride == value_size) {
+        dst.resize(count * value_size);
+        if (count && !_process.read_memory(dst.data(), ptr, count * value_size)) {
+            count = 0;
+            dst.resize(0);
+        }
+        addresses.reserve(count);
+        for (usize i = 0; i < count; ++i) { addresses.push_back(ptr + i * stride); }
+        dst.clear_dirty();
+        return addresses;
+    }
+
+    // Sparse arrays are read with one read for the elements and one read for the allocation flags,
+    // then the allocated elements are packed into the buffer
+    std::vector<u8> elements(count * stride);
+    std::vector<u32> words(flags ? (count + 31) / 32 : 0);
+    if (count && (!_process.read_memory(elements.data(), ptr, elements.size())
+        || (flags && !_process.read_memory(words.data(), flags, words.size() * sizeof(u32))))) {
+        count = 0;
+    }
+
+    std::vector<u8> values{};
+    values.reserve(count * value_size);
+    for (usize i = 0; i < count; ++i) {
+        if (flags && !(words[i / 32] & (u32(1) << (i % 32)))) continue;
+        addresses.push_back(ptr + i * stride);
+        values.insert(values.end(), elements.data() + i * stride, elements.data() + i * stride + value_size);
+    }
+
+    dst.resize(values.size());
+    if (!values.empty()) { memcpy(dst.data(), values.data(), values.size()); }
+    dst.clear_dirty();
+    return addresses;
+}
+
+std::vector<uptr> Hack::read_chunked_array(uptr chunks, usize count, usize chunk_size, usize stride, usize offset) const
+{
+    PGH_ASSERT(chunk_size, "Chunked array chunk size must be greater than 0");
+    PGH_ASSERT(offset + _process.get_ptr_size() <= stride, "Chunked array pointer offset must be inside of each element");
+
+    const usize p = _process.get_ptr_size();
+    count = chunks ? std::min(count, READ_MAX_BYTES / stride) : 0;
+    const usize n_chunks = (count + chunk_size - 1) / chunk_size;
+
+    // The chunk table is read with a single read, then each chunk is read with a single read
+    std::vector<u8> table(n_chunks * p);
+    std::vector<uptr> pointers(count);
+    if (!n_chunks || !_process.read_memory(table.data(), chunks, table.size())) return pointers;
+
+    std::vector<u8> chunk(std::min(count, chunk_size) * stride);
+    for (usize c = 0; c < n_chunks; ++c) {
+        const uptr chunk_ptr = ptr_at(table.data() + c * p, p);
+        const usize first = c * chunk_size, n = std::min(chunk_size, count - first);
+        if (!chunk_ptr || !_process.read_memory(chunk.data(), chunk_ptr, n * stride)) continue;
+
+        for (usize i = 0; i < n; ++i) { pointers[first + i] = ptr_at(chunk.data() + i * stride + offset, p); }
+    }
+    return pointers;
+}
+
+std::vector<string> Hack::read_fnames(uptr blocks, const std::vector<u32>& ids, usize stride) const
+{
+    PGH_ASSERT(stride, "FName entry stride must be greater than 0");
+
+    const usize p = _process.get_ptr_size();
+    const usize block_bytes = stride << UE_FNAME_BLOCK_BITS;
+    const usize max_entry_bytes = UE_FNAME_HEADER_BYTES + 2 * UE_FNAME_MAX_LENGTH;
+    std::vector<string> names(ids.size());
+    if (!blocks || ids.empty()) return names;
+
+    // Ids are grouped by block, and the span of each block that holds the requested entries is read with a single read
+    std::unordered_map<u32, std::vector<usize>> by_block{};
+    u32 max_block = 0;
+    for (usize i = 0; i < ids.size(); ++i) {
+        const u32 block = ids[i] >> UE_FNAME_BLOCK_BITS;
+        by_block[block].push_back(i);
+        max_block = std::max(max_block, block);
+    }
+
+    std::vector<u8> table((usize(max_block) + 1) * p);
+    if (!_process.read_memory(table.data(), blocks, table.size())) return names;
+
+    std::vector<u8> data{};
+    for (const auto& [block, indices]: by_block) {
+        const uptr block_ptr = ptr_at(table.data() + block * p, p);
+        if (!block_ptr) continue;
+
+        usize lo = block_bytes, hi = 0;
+        for (usize i: indices) {
+            const usize offset = (ids[i] & ((1u << UE_FNAME_BLOCK_BITS) - 1)) * stride;
+            lo = std::min(lo, offset);
+            hi = std::max(hi, std::min(offset + max_entry_bytes, block_bytes));
+        }
+
+        const bool is_span = hi - lo <= UE_FNAME_MAX_SPAN_BYTES;
+        data.resize(is_span ? hi - lo : 0);
+        const bool loaded = is_span && _process.read_memory(data.data(), block_ptr + lo, data.size());
+
+        for (usize i: indices) {
+            const usize offset = (ids[i] & ((1u << UE_FNAME_BLOCK_BITS) - 1)) * stride;
+            if (loaded) {
+                ue_decode_fname(data.data() + offset - lo, hi - offset, names[i]);
+                continue;
+            }
+
+            // The span is too large or crosses unreadable memory, so the entries are read one at a time
+            u8 entry[UE_FNAME_HEADER_BYTES + 2 * UE_FNAME_MAX_LENGTH]{};
+            u16 header{};
+            if (!_process.read_memory(reinterpret_cast<u8*>(&header), block_ptr + offset, sizeof(header))) continue;
+            const usize size = UE_FNAME_HEADER_BYTES + (header >> 6) * ((header & 1) ? 2 : 1);
+            if (_process.read_memory(entry, block_ptr + offset, size)) { ue_decode_fname(entry, size, names[i]); }
+        }
+    }
+    return names;
+}
+
+//endregion
+
 //region Hack::Scan
 
 Hack::Scan::Scan(u64 type_hash, const u8* data, usize value_size, uptr begin, usize size, usize max_results, bool read, bool write, bool execute, bool regex, bool threaded):
@@ -918,6 +1895,19 @@ struct CheatEnginePointerScan
         }
     }
 
+    void save_table(AddressTable& table) const
+    {
+        std::vector<u32> module_index(module_names.size());
+        for (usize i = 0; i < module_names.size(); ++i) {
+            module_index[i] = table.add_module(module_names[i]);
+        }
+
+        table.reserve(results.size(), results.size() * max_level);
+        for (const auto& result: results) {
+            table.add(module_index[result.module_index0], result.module_offset, result.offsets, result.offset_count);
+        }
+    }
+
     // Settings
     void load_settings(const Settings& settings)
     {
@@ -975,6 +1965,20 @@ Hack::CE::PointerScanLoad Hack::cheat_engine_load_pointer_scan_file(const string
     return CE::PointerScanLoad{std::move(addresses), settings};
 }
 
+Hack::CE::PointerScanTableLoad Hack::cheat_engine_load_pointer_scan_table(const string& path, bool threaded)
+{
+    AddressTable table{*this};
+
+    CheatEnginePointerScan scan{};
+    scan.load(path, threaded);
+    scan.save_table(table);
+
+    CE::Settings settings{};
+    scan.save_settings(settings);
+
+    return CE::PointerScanTableLoad{std::move(table), settings};
+}
+
 void Hack::cheat_engine_save_pointer_scan_file(const string& path, const CE::AddressPtrs& addresses, const CE::Settings& settings, bool single_file)
 {
     CheatEnginePointerScan scan{};
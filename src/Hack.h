@@ -4,6 +4,15 @@
 
 #include "Process.h"
 #include "Address.h"
+#include "AddressTable.h"
+#include "Variable.h"
+
+#include <atomic>
+#include <condition_variable>
+#include <deque>
+#include <memory>
+#include <mutex>
+#include <thread>
 
 namespace pygamehack {
 
@@ -25,20 +34,68 @@ public:
 
 	// Memory scan
 	uptr                find(i8 value, uptr begin, usize size) const;
+    usize               strlen(uptr begin, usize max_len, bool wide = false) const;
     
     std::vector<uptr>   scan(Scan& scan) const;
 
     std::vector<uptr>   scan_modify(Scan& scan, ScanModifyLoopFunc&& modify) const;
 
+    // Address names
+    Address*            address(const string& name) const;
+    std::vector<Address*> addresses(const string& prefix = "") const;
+
     // Address auto-update
     void                start_auto_update(Address& address);
     void                stop_auto_update(Address& address);
     void                set_update_mask(u32 mask = UINT32_MAX);
     void                update();
+    double              next_update_in() const;
+
+    // Background update
+    void                start_background_update(double interval = 0.001);
+    void                stop_background_update();
+    bool                background_update_running() const;
+
+    // Published variables
+    struct PublishedVariable;
+
+    template<typename V>
+    static PublishedVariable published(V& variable);
+
+    void                register_variable(const PublishedVariable& variable, double interval = 0.0, std::shared_ptr<void> owner = {});
+    void                unregister_variable(const void* variable);
+    u64                 sync_variables() const;
+    u64                 frame() const;
+
+    // Watched variables
+    struct VariableChange;
+
+    u32                 watch(const std::vector<PublishedVariable>& variables, double interval = 0.0, std::shared_ptr<void> owner = {});
+    void                unwatch(u32 watch);
+    std::vector<VariableChange> take_changes(usize max_changes = 0);
 
     // Memory read/write
     void                read_buffer(uptr ptr, Buffer& dst) const;
+    usize               read_many(const std::vector<uptr>& ptrs, Buffer& dst, usize size, usize stride = 0) const;
+    usize               read_buffers(const std::vector<uptr>& ptrs, const std::vector<Buffer*>& dsts) const;
+    void                write_buffers(const std::vector<uptr>& ptrs, const std::vector<Buffer*>& srcs, bool all = false) const;
     void                write_buffer(uptr ptr, const Buffer& src) const;
+    usize               gather(const std::vector<uptr>& ptrs, const uptr_path& offsets, Buffer& dst, Buffer& valid, usize size, bool threaded = false) const;
+
+    // Linked structures
+    std::vector<uptr>   walk_list(uptr head, usize next_offset, usize node_size, Buffer& dst, usize max_nodes = 0, uptr sentinel = 0) const;
+    std::vector<uptr>   walk_tree(uptr root, usize left_offset, usize right_offset, usize node_size, Buffer& dst, usize max_nodes = 0, uptr sentinel = 0) const;
+
+    // MSVC standard library containers
+    enum class StlContainer { VECTOR, LIST, MAP, UNORDERED_MAP };
+
+    std::vector<uptr>   read_stl(StlContainer container, uptr ptr, Buffer& dst, usize value_size, usize value_align, usize max_size = 0) const;
+    std::vector<string> read_stl_strings(const std::vector<uptr>& ptrs, usize char_size = 1, usize max_size = 0) const;
+
+    // Unreal Engine containers
+    std::vector<uptr>   read_sparse_array(uptr ptr, usize count, usize stride, uptr flags, Buffer& dst, usize value_size) const;
+    std::vector<uptr>   read_chunked_array(uptr chunks, usize count, usize chunk_size, usize stride, usize offset = 0) const;
+    std::vector<string> read_fnames(uptr blocks, const std::vector<u32>& ids, usize stride = 2) const;
 
 	uptr                read_ptr(uptr ptr) const;
     void                write_ptr(uptr ptr, uptr v) const;
@@ -97,6 +154,30 @@ public:
         u64 type_hash{};
     };
 
+    // Published variables
+public:
+    // A variable is copied out of the target process into the back frame by the update thread,
+    // and copied from the most recently published frame into 'storage(variable)' by 'sync_variables'.
+    // The variable must outlive its registration.
+    struct PublishedVariable {
+        void*           variable{};
+        const Address*  address{};
+        uptr            offset{};
+        usize           size{};
+        u8*             (*storage)(void* variable, usize size){};
+        usize           frame_offset{};
+    };
+
+    // A watched variable is compared against the previous frame every time it is published,
+    // and a change is queued (until 'take_changes') when its bytes differ.
+    struct VariableChange {
+        u32             watch{};
+        u32             index{};
+        u64             frame{};
+        string          old_value{};
+        string          new_value{};
+    };
+
     // Cheat Engine
 public:
     struct CE {
@@ -112,25 +193,74 @@ public:
         };        
 
         using PointerScanLoad = std::tuple<Addresses, Settings>;
+        using PointerScanTableLoad = std::tuple<AddressTable, Settings>;
     };
     
     CE::PointerScanLoad cheat_engine_load_pointer_scan_file(const string& path, bool threaded = true);
+    CE::PointerScanTableLoad cheat_engine_load_pointer_scan_table(const string& path, bool threaded = true);
     void                cheat_engine_save_pointer_scan_file(const string& path, const CE::AddressPtrs& addresses, const CE::Settings& settings = {}, bool single_file = true);
 
     // C++ only
 public:
     AddressNames&       address_names() { return _address_names; }
     const AddressNames& address_names() const { return _address_names; }
+    std::shared_ptr<void> watch_owner(u32 watch) const;
     std::vector<uptr>   scan_reduce(const std::vector<uptr>& results, const Scan& scan) const;
 
 private:    
     using AddressHandleMap = std::unordered_map<Address*, u32>;
+    using UpdateLevels = std::vector<std::vector<u32>>;
+
+    struct PublishedVariableState {
+        PublishedVariable   variable{};
+        u32                 interval{};
+        u64                 due{};
+        u32                 watch{};
+        u32                 watch_index{};
+        bool                in_front{};
+        usize               front_offset{};
+        std::shared_ptr<void> owner{};
+    };
+
+    // Frames keep the owners of their variables alive, since readers can still sync a frame after its variables are unregistered
+    struct Frame {
+        std::vector<PublishedVariable>  variables{};
+        std::vector<std::shared_ptr<void>> owners{};
+        std::vector<u8>                 data{};
+        u64                             number{};
+        u64                             layout{};
+    };
+
+    usize               read_batch(const std::vector<uptr>& ptrs, usize size, u8* dst, usize stride, bool* read = nullptr) const;
+
+    static u64          steady_time_us();
+    u64                 update_due(u64 now, u64 tick);
+    void                rebuild_update_order();
+    void                publish_variables(u64 now, u64 tick, u64& next);
+    void                release_published(std::unique_lock<std::mutex>& lock);
 
 	Process                 _process{};
     u32                     _update_mask{UINT32_MAX};
     std::vector<Address*>   _addresses_to_update{};
     AddressHandleMap        _address_ptr_to_handle{};
     AddressNames            _address_names{};
+    UpdateLevels            _update_levels{};
+    std::vector<u64>        _update_due{};
+    std::vector<bool>       _update_is_due{};
+    bool                    _update_order_dirty{false};
+    mutable std::mutex      _update_mutex{};
+    std::condition_variable _update_cv{};
+    std::thread             _update_thread{};
+    std::atomic_bool        _update_thread_running{false};
+    std::vector<PublishedVariableState> _published_variables{};
+    u64                     _published_layout{};
+    std::shared_ptr<Frame>  _frames[2]{};
+    u32                     _frame_index{};
+    std::shared_ptr<const Frame> _published_frame{};
+    std::vector<std::shared_ptr<void>> _published_released{};
+    std::unordered_map<u32, std::shared_ptr<void>> _watches{};
+    u32                     _next_watch{1};
+    std::deque<VariableChange> _changes{};
 };
 
 
@@ -164,6 +294,30 @@ void Hack::write_value(uptr ptr, T src) const
 }
 
 
+template<typename V>
+Hack::PublishedVariable Hack::published(V& variable)
+{
+    PublishedVariable v{};
+    v.variable = &variable;
+    v.address = &variable.address();
+
+    if constexpr(std::is_base_of_v<VariableBufferBase, V>) {
+        VariableBufferBase& base = variable;
+        v.offset = base.offset_in_parent();
+        v.size = base.get().size();
+        v.storage = [](void* p, usize size) -> u8* {
+            Buffer& buffer = static_cast<VariableBufferBase*>((V*)p)->get();
+            return size <= buffer.size() ? buffer.data() : nullptr;
+        };
+    }
+    else {
+        v.size = std::is_same_v<V, Variable<Ptr>> ? variable.address().process().get_ptr_size() : sizeof(typename V::T);
+        v.storage = [](void* p, usize size) -> u8* { return (u8*)((V*)p)->data(); };
+    }
+
+    return v;
+}
+
 template<typename T>
 Hack::Scan::Scan(T data, uptr begin, usize size, usize max_results, bool read, bool write, bool execute, bool threaded):
     Scan{typeid(T).hash_code(), (const u8*)&data, sizeof(T), begin, size, max_results, read, write, execute, false, threaded}
@@ -1,5 +1,8 @@
 #include "Process.h"
 
+#include <algorithm>
+#include <cstring>
+
 //region Platform APIs
 
 #ifdef _MSC_VER
@@ -150,10 +153,9 @@ public:
         return get_pygamehack_protect(old_protect);
     }
 
-	uptr follow_ptr_path(uptr ptr, const uptr_path& offsets, usize ptr_size) const
+	uptr follow_ptr_path(uptr ptr, const u32* offsets, usize size, usize ptr_size) const
     {
         uptr addr = ptr;
-        usize size = offsets.size();
         for (usize i = 0; i < size; ++i) {
             if (i > 0) read_memory(&addr, (LPCVOID)addr, ptr_size);
             addr += offsets[i];
@@ -459,6 +461,7 @@ bool Process::is_read_only() const
 
 bool Process::attach(u32 process_id, bool read_only)
 {
+	invalidate();
 	_modules.clear();
 	API.attach(process_id, read_only);
 	_arch = API.is_64_bit() ? Arch::X64 : Arch::X86;
@@ -468,6 +471,7 @@ bool Process::attach(u32 process_id, bool read_only)
 
 bool Process::attach(const string& process_name, bool read_only)
 {
+	invalidate();
 	_modules.clear();
 	API.attach(process_name.c_str(), read_only);
 	_arch = API.is_64_bit() ? Arch::X64 : Arch::X86;
@@ -477,6 +481,7 @@ bool Process::attach(const string& process_name, bool read_only)
 
 void Process::detach()
 {
+    invalidate();
     API.detach();
 }
 
@@ -507,22 +512,118 @@ bool Process::read_memory(void* dst, uptr src, usize size) const
 
 bool Process::write_memory(uptr dst, const void* src, usize size) const
 {
+	if (_follow_cache_enabled) invalidate_range(dst, size);
 	return API.write_memory((void*)normalize_ptr(dst), src, size);
 }
 
 uptr Process::find_char(i8 value, uptr begin, usize size) const
 {
-    i8 v;
-    for (uptr p = begin; p < begin + size; ++p) {
-		if (read_memory(&v, p, 1u) && v == value) 
-            return p - begin;
-	}
-	return 0;
+    return find_value((const u8*)&value, sizeof(value), begin, size);
+}
+
+uptr Process::find_wchar(u16 value, uptr begin, usize size) const
+{
+    return find_value((const u8*)&value, sizeof(value), begin, size);
 }
 
 uptr Process::follow(uptr start, const uptr_path& offsets) const
 {
-	return API.follow_ptr_path(start, offsets, _arch == Arch::X86 ? 4u : 8u);
+	return follow(start, offsets.data(), offsets.size());
+}
+
+uptr Process::follow(uptr start, const u32* offsets, usize size) const
+{
+	if (!_follow_cache_enabled) 
+		return API.follow_ptr_path(start, offsets, size, _arch == Arch::X86 ? 4u : 8u);
+
+	std::unique_lock<std::mutex> lock{_follow_cache_mutex};
+	uptr addr = start;
+	for (usize i = 0; i < size; ++i) {
+		if (i > 0) addr = read_ptr_cached(addr);
+		addr += offsets[i];
+	}
+	return addr;
+}
+
+bool Process::follow_cache_enabled() const
+{
+	return _follow_cache_enabled;
+}
+
+void Process::set_follow_cache_enabled(bool enabled)
+{
+	std::unique_lock<std::mutex> lock{_follow_cache_mutex};
+	_follow_cache_enabled = enabled;
+	_follow_cache.clear();
+	// Enabling the cache starts a new measurement, the generation keeps increasing so old entries are never reused
+	if (enabled) {
+		_follow_cache_stats.hits = 0;
+		_follow_cache_stats.misses = 0;
+	}
+	++_follow_cache_stats.generation;
+}
+
+FollowCacheStats Process::follow_cache_stats() const
+{
+	std::unique_lock<std::mutex> lock{_follow_cache_mutex};
+	FollowCacheStats stats = _follow_cache_stats;
+	stats.size = _follow_cache.size();
+	return stats;
+}
+
+void Process::invalidate()
+{
+	// Stale entries are overwritten lazily, the cache is only cleared when it has grown large
+	static constexpr usize MAX_STALE_ENTRIES = 1u << 16;
+
+	std::unique_lock<std::mutex> lock{_follow_cache_mutex};
+	++_follow_cache_stats.generation;
+	if (_follow_cache.size() > MAX_STALE_ENTRIES) _follow_cache.clear();
+}
+
+BufferPool& Process::buffer_pool() const
+{
+	return *_buffer_pool;
+}
+
+const std::shared_ptr<BufferPool>& Process::buffer_pool_owner() const
+{
+	return _buffer_pool;
+}
+
+uptr Process::read_ptr_cached(uptr ptr) const
+{
+	const u64 generation = _follow_cache_stats.generation;
+	if (auto it = _follow_cache.find(ptr); it != _follow_cache.end() && it->second.generation == generation) {
+		++_follow_cache_stats.hits;
+		return it->second.value;
+	}
+
+	++_follow_cache_stats.misses;
+	// A failed read leaves the pointer unchanged (same as an uncached follow) and is not cached
+	uptr value = ptr;
+	if (read_memory(&value, ptr, get_ptr_size())) {
+		_follow_cache[ptr] = FollowCacheEntry{value, generation};
+	}
+	return value;
+}
+
+void Process::invalidate_range(uptr ptr, usize size) const
+{
+	// Drop every cached pointer that overlaps the written range
+	static constexpr usize MAX_ERASE_RANGE = 64;
+
+	std::unique_lock<std::mutex> lock{_follow_cache_mutex};
+	if (_follow_cache.empty()) return;
+	
+	if (size > MAX_ERASE_RANGE) {
+		++_follow_cache_stats.generation;
+		return;
+	}
+
+	const usize ptr_size = get_ptr_size();
+	const uptr begin = ptr >= ptr_size ? ptr - ptr_size + 1 : 0;
+	for (uptr p = begin; p < ptr + size; ++p) _follow_cache.erase(p);
 }
 
 void Process::iter_regions(uptr begin, usize size, iter_region_callback&& callback, Memory::Protect prot, bool read, usize block_size) const
@@ -560,6 +661,46 @@ uptr Process::normalize_ptr(uptr ptr) const
 	return (_arch == Arch::X86 ? (ptr & UINT32_MAX) : ptr); 
 }
 
+uptr Process::find_value(const u8* value, usize value_size, uptr begin, usize size) const
+{
+    // Memory is read in growing chunks (64 -> 256 -> 1024 -> 4096) that never cross a page boundary,
+    // so short strings cost a single read and the search stops at the first unreadable page
+    static constexpr usize PAGE_SIZE = 4096;
+    static constexpr usize FIRST_CHUNK_SIZE = 64;
+    static constexpr usize CHUNK_GROWTH = 4;
+
+    u8 chunk[PAGE_SIZE];
+    usize chunk_size = FIRST_CHUNK_SIZE;
+    const uptr end = begin + size;
+    
+    for (uptr p = begin; p < end; ) {
+        const uptr page_end = (p & ~uptr(PAGE_SIZE - 1)) + PAGE_SIZE;
+        usize n = std::min<usize>(chunk_size, std::min<usize>(page_end - p, end - p));
+        
+        // Values are aligned to 'begin', a value that straddles a page boundary is read on its own
+        n -= n % value_size;
+        if (n == 0) n = value_size;
+
+        if (!read_memory(chunk, p, n)) 
+            return 0;
+
+        if (value_size == 1) {
+            if (const void* found = memchr(chunk, *value, n))
+                return (p - begin) + usize((const u8*)found - chunk);
+        }
+        else {
+            for (usize i = 0; i + value_size <= n; i += value_size) {
+                if (memcmp(chunk + i, value, value_size) == 0)
+                    return (p - begin) + i;
+            }
+        }
+
+        p += n;
+        chunk_size = std::min<usize>(chunk_size * CHUNK_GROWTH, PAGE_SIZE);
+    }
+	return 0;
+}
+
 //endregion
 
 }
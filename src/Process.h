@@ -3,7 +3,10 @@
 #define PYGAMEHACK_PROCESS_H
 
 #include "config.h"
+#include "Buffer.h"
 #include <functional>
+#include <memory>
+#include <mutex>
 #include <tuple>
 #include <vector>
 #include <unordered_map>
@@ -56,6 +59,14 @@ struct ProcessInfo {
 };
 
 
+struct FollowCacheStats {
+    u64 hits{};
+    u64 misses{};
+    u64 generation{};
+    usize size{};
+};
+
+
 class Process {
 public:
     enum class Arch { X86, X64, NONE };
@@ -93,8 +104,28 @@ public:
 	
     uptr find_char(i8 value, uptr begin, usize size) const;
 
+    uptr find_wchar(u16 value, uptr begin, usize size) const;
+
 	uptr follow(uptr start, const uptr_path& offsets) const;
 
+    // Follow cache
+    bool follow_cache_enabled() const;
+
+    void set_follow_cache_enabled(bool enabled);
+
+    FollowCacheStats follow_cache_stats() const;
+
+    void invalidate();
+
+    // Buffer pool
+    BufferPool& buffer_pool() const;
+
+    // Buffers share ownership of the pool, so buffers that outlive the process can still return their memory
+    const std::shared_ptr<BufferPool>& buffer_pool_owner() const;
+
+    // C++ only
+	uptr follow(uptr start, const u32* offsets, usize size) const;
+
 	void iter_regions(uptr begin, usize size, iter_region_callback&& callback, Memory::Protect prot = Memory::Protect::NONE, bool read=true, usize block_size = 4096) const;
     
     Memory protect(uptr ptr, usize size, Memory::Protect prot = Memory::Protect::READ_WRITE) const;
@@ -111,10 +142,25 @@ private:
     friend class Memory; // protect/reset
 
     uptr normalize_ptr(uptr ptr) const;
+    uptr find_value(const u8* value, usize value_size, uptr begin, usize size) const;
+    uptr read_ptr_cached(uptr ptr) const;
+    void invalidate_range(uptr ptr, usize size) const;
+
+    struct FollowCacheEntry {
+        uptr value{};
+        u64 generation{};
+    };
+
+    using FollowCache = std::unordered_map<uptr, FollowCacheEntry>;
 
     u64 os_api_storage[4]{};
 	module_map _modules{};
     Arch _arch{Arch::NONE};
+    bool _follow_cache_enabled{false};
+    mutable FollowCache _follow_cache{};
+    mutable FollowCacheStats _follow_cache_stats{};
+    mutable std::mutex _follow_cache_mutex{};
+    std::shared_ptr<BufferPool> _buffer_pool{std::make_shared<BufferPool>()};
 };
 
 }
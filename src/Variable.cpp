@@ -30,7 +30,9 @@ Buffer& VariableBufferBase::get()
 Buffer& VariableBufferBase::read(uptr size, uptr offset)
 {
     uptr real_offset = offset + offset_in_parent();
-    variable_read(address(), real_offset, value.data() + offset, clamped_size(offset, size, value.size()));
+    usize real_size = clamped_size(offset, size, value.size());
+    variable_read(address(), real_offset, value.data() + offset, real_size);
+    value.clear_dirty(offset, real_size);
     return value;
 }
 
@@ -38,13 +40,21 @@ void VariableBufferBase::write(const u8* data, usize size, uptr offset)
 {
     PGH_ASSERT(size <= (value.size() - offset), "Data too large to fit into buffer");
     memcpy(value.data() + offset, data, size);
+    value.mark_dirty(offset, size);
 }
 
-void VariableBufferBase::flush(uptr size, uptr offset) const
+void VariableBufferBase::flush(uptr size, uptr offset, bool all)
 {
-    uptr real_offset = offset + offset_in_parent();
     usize real_size = clamped_size(offset, size, value.size());
-    variable_write(address(), real_offset, value.data() + offset, real_size);
+    if (all) {
+        variable_write(address(), offset + offset_in_parent(), value.data() + offset, real_size);
+    }
+    else {
+        for (auto [dirty_offset, dirty_size]: value.dirty_ranges(offset, real_size)) {
+            variable_write(address(), dirty_offset + offset_in_parent(), value.data() + dirty_offset, dirty_size);
+        }
+    }
+    value.clear_dirty(offset, real_size);
 }
 
 const Address& VariableBufferBase::address() const
@@ -158,31 +168,66 @@ string VariableString::slice(i64 begin, i64 end, i64 step)
 
 //region VariablePtrToBuffer
 
-//Buffer& VariablePtrToBuffer::read(uptr size, uptr offset)
-//{
-//    PGH_ASSERT(_address->loaded(), "Attempting to read a variable from an address that is not loaded");
-//    uptr real_address{};
-//    uptr real_offset = offset + offset_in_parent();
-//    const auto& addr = address();
-//    addr.process().read_memory(&real_address, addr.value() + real_offset, addr.process().get_ptr_size());
-//    addr.process().read_memory(value.data() + offset, real_address, VariableBufferBase::clamped_size(offset, size, value.size()));
-//    return value;
-//}
-//
-//void VariablePtrToBuffer::write(const Buffer& v, uptr offset)
-//{
-//    value.write_buffer(offset, v);
-//}
-//
-//void VariablePtrToBuffer::flush(uptr size, uptr offset) const
-//{
-//    PGH_ASSERT(_address->loaded(), "Attempting to write a variable to an address that is not loaded");
-//    uptr real_address{};
-//    uptr real_offset = offset + offset_in_parent();
-//    const auto& addr = address();
-//    addr.process().read_memory(&real_address, addr.value() + real_offset, addr.process().get_ptr_size());
-//    addr.process().write_memory(real_address, value.data() + offset, VariableBufferBase::clamped_size(offset, size, value.size()));
-//}
+VariablePtrToBuffer::Variable(Address& address, usize size):
+    VariableBufferBase{address, size}
+{}
+
+VariablePtrToBuffer::Variable(VariableBufferBase& parent, uptr offset, usize size):
+    VariableBufferBase{*parent._address, size}
+{
+    _parent = &parent;
+    _offset_in_parent = offset;
+}
+
+uptr VariablePtrToBuffer::pointer() const
+{
+    return _pointer;
+}
+
+Buffer& VariablePtrToBuffer::read(uptr size, uptr offset)
+{
+    // The pointer and the memory that it points to are both read in a single call, a null pointer reads as zeros
+    const usize real_size = clamped_size(offset, size, value.size());
+    _pointer = read_pointer();
+    if (_pointer) {
+        address().process().read_memory(value.data() + offset, _pointer + offset, real_size);
+    }
+    else {
+        memset(value.data() + offset, 0, real_size);
+    }
+    value.clear_dirty(offset, real_size);
+    return value;
+}
+
+void VariablePtrToBuffer::write(const Buffer& v, uptr offset)
+{
+    value.write_buffer(offset, v);
+}
+
+void VariablePtrToBuffer::flush(uptr size, uptr offset, bool all)
+{
+    const usize real_size = clamped_size(offset, size, value.size());
+    _pointer = read_pointer();
+    PGH_ASSERT(_pointer, "Attempting to flush a pointer to buffer variable through a null pointer");
+
+    const Process& process = address().process();
+    if (all) {
+        process.write_memory(_pointer + offset, value.data() + offset, real_size);
+    }
+    else {
+        for (auto [dirty_offset, dirty_size]: value.dirty_ranges(offset, real_size)) {
+            process.write_memory(_pointer + dirty_offset, value.data() + dirty_offset, dirty_size);
+        }
+    }
+    value.clear_dirty(offset, real_size);
+}
+
+uptr VariablePtrToBuffer::read_pointer() const
+{
+    uptr ptr{};
+    variable_read(address(), offset_in_parent(), (u8*)&ptr, 0);
+    return ptr;
+}
 
 //endregion
 
@@ -8,10 +8,10 @@ namespace pygamehack {
 
 
 struct Ptr{ static constexpr u32 TAG = UINT32_MAX; };
-//struct PtrToBuffer{};
+struct PtrToBuffer{};
 
 using VariableBuffer = Variable<Buffer>;
-//using VariablePtrToBuffer = Variable<PtrToBuffer>;
+using VariablePtrToBuffer = Variable<PtrToBuffer>;
 using VariableString = Variable<string>;
 
 
@@ -29,6 +29,9 @@ public:
     void            write(const T& v);
     void            reset();
 
+    // C++ only
+    T*              data();
+
 private:
     T value;
     Address* _address{};
@@ -45,7 +48,7 @@ public:
 
     void            write(const u8* data, usize size, uptr offset = 0);
     Buffer&         read(uptr size = 0, uptr offset = 0);
-    void            flush(uptr size = 0, uptr offset = 0) const;
+    void            flush(uptr size = 0, uptr offset = 0, bool all = false);
     void            reset();
 
     bool            is_view() const;
@@ -105,20 +108,30 @@ private:
 };
 
 
-//template<>
-//class Variable<PtrToBuffer>: public VariableBufferBase {
-//public:
-//    using VariableBufferBase::VariableBufferBase;
-//
-//    Buffer&         read(uptr size = 0, uptr offset = 0);
-//    void            write(const Buffer& v, uptr offset = 0);
-//    void            flush(uptr size = 0, uptr offset = 0) const;
-//
-//private:
-//    using VariableBufferBase::value;
-//    using VariableBufferBase::_address;
-//    using VariableBufferBase::_parent;
-//};
+// The address of the variable holds a pointer, and the buffer holds the memory that it points to.
+// Views of a parent buffer own their memory, only the pointer is stored in the parent at 'offset_in_parent'.
+template<>
+class Variable<PtrToBuffer>: public VariableBufferBase {
+public:
+    using T = PtrToBuffer;
+
+    Variable(Address& address, usize size);
+    Variable(VariableBufferBase& parent, uptr offset, usize size);
+
+    uptr            pointer() const;
+    Buffer&         read(uptr size = 0, uptr offset = 0);
+    void            write(const Buffer& v, uptr offset = 0);
+    void            flush(uptr size = 0, uptr offset = 0, bool all = false);
+
+private:
+    uptr            read_pointer() const;
+
+    using VariableBufferBase::value;
+    using VariableBufferBase::_address;
+    using VariableBufferBase::_parent;
+
+    uptr _pointer{};
+};
 
 
 //region Template Implementation
@@ -171,6 +184,12 @@ void Variable<RT>::reset()
     value = {};
 }
 
+template<typename RT>
+typename Variable<RT>::T* Variable<RT>::data()
+{
+    return &value;
+}
+
 //endregion
 
 }
@@ -18,7 +18,9 @@ using string = std::string;
 
 
 class Address;
+class AddressTable;
 class Buffer;
+class BufferPool;
 class Hack;
 class Process;
 
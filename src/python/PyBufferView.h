@@ -0,0 +1,105 @@
+#ifndef PYBUFFERVIEW_H
+#define PYBUFFERVIEW_H
+
+#include <pybind11/pybind11.h>
+
+#include "../Buffer.h"
+
+namespace py = pybind11;
+
+namespace pygamehack {
+
+// Typed, strided view of the memory of a Buffer that is exposed through the buffer protocol without copying.
+// The view holds a reference to the Python buffer object, so the memory stays alive as long as the view.
+class PyBufferView {
+public:
+    PyBufferView(py::object buffer, const string& dtype, uptr offset, std::vector<py::ssize_t> shape, std::vector<py::ssize_t> strides):
+        owner{std::move(buffer)},
+        buffer{&owner.cast<Buffer&>()},
+        offset{offset},
+        shape{std::move(shape)},
+        strides{std::move(strides)}
+    {
+        std::tie(format, itemsize) = parse_dtype(dtype);
+
+        PGH_ASSERT(offset <= this->buffer->size(), "View offset out of range of buffer");
+        if (this->shape.empty()) { this->shape.push_back(py::ssize_t((this->buffer->size() - offset) / itemsize)); }
+
+        // Strides default to a C-contiguous layout
+        if (this->strides.empty()) {
+            this->strides.resize(this->shape.size());
+            py::ssize_t stride = py::ssize_t(itemsize);
+            for (usize i = this->shape.size(); i-- > 0; ) {
+                this->strides[i] = stride;
+                stride *= this->shape[i];
+            }
+        }
+        PGH_ASSERT(this->strides.size() == this->shape.size(), "View strides must have one entry per dimension");
+
+        // Every element must lie inside of the buffer
+        py::ssize_t lowest = py::ssize_t(offset), highest = py::ssize_t(offset);
+        for (usize i = 0; i < this->shape.size(); ++i) {
+            PGH_ASSERT(this->shape[i] >= 0, "View shape cannot be negative");
+            if (this->shape[i] == 0) { highest = lowest - py::ssize_t(itemsize); break; }
+            const py::ssize_t extent = (this->shape[i] - 1) * this->strides[i];
+            (extent < 0 ? lowest : highest) += extent;
+        }
+        PGH_ASSERT(lowest >= 0 && highest + py::ssize_t(itemsize) <= py::ssize_t(this->buffer->size()), "View will overflow buffer");
+    }
+
+    py::buffer_info info()
+    {
+        return py::buffer_info(
+            buffer->data() + offset,                 // Pointer to buffer
+            py::ssize_t(itemsize),                   // Size of one element
+            format,                                  // Python struct-style format descriptor
+            py::ssize_t(shape.size()),               // Number of dimensions
+            shape,                                   // Buffer dimensions
+            strides                                  // Stride (in bytes) for each dimension
+        );
+    }
+
+    const string& get_format() const { return format; }
+    usize get_itemsize() const { return itemsize; }
+    uptr get_offset() const { return offset; }
+    const std::vector<py::ssize_t>& get_shape() const { return shape; }
+    const std::vector<py::ssize_t>& get_strides() const { return strides; }
+
+    // Accepts pygamehack type names ('u32', 'float', ...), NumPy-style names ('uint32', 'float32', ...) and struct format characters
+    static std::tuple<string, usize> parse_dtype(const string& dtype)
+    {
+        #define F(type, ...) \
+        for (const char* name: {__VA_ARGS__}) { \
+            if (dtype == name || dtype == py::format_descriptor<type>::format()) return {py::format_descriptor<type>::format(), sizeof(type)}; \
+        }
+
+        F(bool, "bool", "?")
+        F(float, "float", "f32", "float32")
+        F(double, "double", "f64", "float64")
+        F(int8_t, "i8", "int8")
+        F(int16_t, "i16", "int16")
+        F(int32_t, "i32", "int32")
+        F(int64_t, "i64", "int64")
+        F(uint8_t, "u8", "uint8")
+        F(uint16_t, "u16", "uint16")
+        F(uint32_t, "u32", "uint32")
+        F(uint64_t, "u64", "uint64")
+        #undef F
+
+        PGH_ASSERT(false, "Unrecognized view dtype");
+        return {};
+    }
+
+private:
+    py::object owner;
+    Buffer* buffer{};
+    uptr offset{};
+    string format{};
+    usize itemsize{};
+    std::vector<py::ssize_t> shape{};
+    std::vector<py::ssize_t> strides{};
+};
+
+}
+
+#endif
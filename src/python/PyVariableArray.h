@@ -38,10 +38,18 @@ public:
             return false;
         }
 
+        py::dict modules = py::module_::import("sys").attr("modules");
+        py::module m = modules["pygamehack.c"];
+        py::function issubclass = modules["builtins"].attr("issubclass");
+        py::object type_type = modules["builtins"].attr("type");
+
         auto set_non_basic_value_type = [&](){
+            // Elements that point to a buffer are read through their pointer when accessed
+            py::object t = py::hasattr(value_type, "type") ? value_type.attr("type") : value_type;
+            is_value_type_pointer_to_buffer = py::isinstance(t, type_type) && py::cast<bool>(issubclass(t, m.attr("p_buf")));
             is_value_type_basic = false;
             values = py::list(size);
-            value_type_size = py::cast<usize>(value_type.attr("size"));
+            value_type_size = is_value_type_pointer_to_buffer ? address().process().get_ptr_size() : py::cast<usize>(value_type.attr("size"));
             for (usize i = 0; i < size; ++i) { values[i] = py::none(); }
             value.unsafe_force_resize(size * value_type_size);
         };
@@ -52,11 +60,7 @@ public:
             return true;
         }
 
-        py::dict modules = py::module_::import("sys").attr("modules");
-        py::module m = modules["pygamehack.c"];
-        py::function issubclass = modules["builtins"].attr("issubclass");
-        py::object type_type = modules["builtins"].attr("type");
-        const char* names[5]{"buf", "str", "c_str", "arr", "c_arr"};
+        const char* names[6]{"buf", "p_buf", "str", "c_str", "arr", "c_arr"};
         for (const auto* name: names) {
             py::object c = m.attr(name);
             if (check_attr(value_type, "is_container") || (py::isinstance(value_type, type_type) && py::cast<bool>(issubclass(value_type, c)))) {
@@ -99,6 +103,8 @@ public:
         if (detect_buffer_subclass(size, kwargs)) return;
         if (detect_basic_type(size, kwargs)) return;
 
+        // Struct elements are buffer views into the array, so a single read of the array fetches every element
+        is_value_type_struct = true;
         value_type_size = py::cast<usize>(value_type.attr("size"));
         values = py::list(size);
         for (usize i = 0; i < size; ++i) { values[i] = py::none(); }
@@ -126,6 +132,11 @@ public:
         return *this;
     }
 
+    const py::object& type() const
+    {
+        return value_type;
+    }
+
     PyVariableArray& read(usize n, usize starting_at)
     {
         VariableBufferBase::read(n * value_type_size, starting_at * value_type_size);
@@ -152,9 +163,9 @@ public:
         }
     }
 
-    void flush(usize n, usize starting_at)
+    void flush(usize n, usize starting_at, bool all)
     {
-        VariableBufferBase::flush(n * value_type_size, starting_at * value_type_size);
+        VariableBufferBase::flush(n * value_type_size, starting_at * value_type_size, all);
     }
 
     void reset()
@@ -178,9 +189,15 @@ public:
         }
         else {
             ensure_element(n);
-            if (is_value_type_buffer_or_container) {
+            if (is_value_type_pointer_to_buffer) {
+                return values[n].attr("read")();
+            }
+            else if (is_value_type_buffer_or_container) {
                 return values[n].attr("get")();
             }
+            else if (is_value_type_struct) {
+                return values[n];
+            }
             else {
                 return values[n].attr("read")();
             }
@@ -235,7 +252,8 @@ public:
             return py::make_iterator(iterator{this, 0}, iterator{this, i64(length())});
         }
         else {
-            return values.attr("__iter__");
+            for (usize i = 0; i < length(); ++i) { ensure_element(i); }
+            return values.attr("__iter__")();
         }
     }
 
@@ -293,7 +311,10 @@ private:
             values.append(py::none());
         }
 
-        values[n] = std::move(create_element(n));
+        // Elements are views into the array, so they only need to be created once
+        if (values[n].is_none()) {
+            values[n] = std::move(create_element(n));
+        }
     }
 
     template<typename T>
@@ -333,6 +354,8 @@ private:
     py::list values;
     bool is_value_type_basic{};
     bool is_value_type_buffer_or_container{};
+    bool is_value_type_pointer_to_buffer{};
+    bool is_value_type_struct{};
 };
 
 }
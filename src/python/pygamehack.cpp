@@ -1,3 +1,4 @@
+#include "PyBufferView.h"
 #include "PyVariableArray.h"
 #include "pywrappers.h"
 #include "pytostring.h"
@@ -24,6 +25,51 @@ void define_process(py::module& m)
         .def_readwrite("size", &ProcessInfo::size)
         .def_readwrite("thread_count", &ProcessInfo::thread_count);
 
+    py::class_<FollowCacheStats>(m, "FollowCacheStats")
+        .def_readonly("hits", &FollowCacheStats::hits,
+            "Number of pointer reads served from the follow cache")
+        .def_readonly("misses", &FollowCacheStats::misses,
+            "Number of pointer reads that had to read process memory")
+        .def_readonly("generation", &FollowCacheStats::generation,
+            "Current cache generation (incremented on every invalidation)")
+        .def_readonly("size", &FollowCacheStats::size,
+            "Number of entries stored in the cache (including stale entries)");
+
+    py::class_<BufferPoolStats>(m, "BufferPoolStats")
+        .def_readonly("allocations", &BufferPoolStats::allocations,
+            "Number of blocks requested from the pool")
+        .def_readonly("reuses", &BufferPoolStats::reuses,
+            "Number of requests served from a cached block instead of malloc")
+        .def_readonly("releases", &BufferPoolStats::releases,
+            "Number of blocks returned to the pool to be reused")
+        .def_readonly("cached_blocks", &BufferPoolStats::cached_blocks,
+            "Number of blocks currently cached in the pool")
+        .def_readonly("cached_bytes", &BufferPoolStats::cached_bytes,
+            "Number of bytes currently cached in the pool");
+
+    py::class_<BufferPool>(m, "BufferPool")
+        .def_property(
+            "enabled", &BufferPool::enabled, &BufferPool::set_enabled,
+                "When disabled, blocks are freed as soon as their buffer is destroyed and the cached blocks are released")
+
+        .def_property(
+            "max_cached_bytes", &BufferPool::max_cached_bytes, &BufferPool::set_max_cached_bytes,
+                "Maximum number of bytes kept in the pool, blocks returned to a full pool are freed")
+
+        .def_property_readonly(
+            "stats", &BufferPool::stats,
+                "Allocation statistics of the pool")
+
+        .def(
+            "trim", &BufferPool::trim,
+                "Free cached blocks until at most 'max_cached_bytes' bytes remain in the pool",
+                "max_cached_bytes"_a=0u)
+
+        .def_static(
+            "block_size", &BufferPool::block_size,
+                "Size of the block allocated for a buffer of the given size",
+                "size"_a);
+
     py::class_<Process> proc_class(m, "Process");
 
     py::enum_<Process::Arch>(proc_class, "Arch")
@@ -88,6 +134,24 @@ void define_process(py::module& m)
                 "NOTE: the first offset in the path will be added to 'begin' before reading.",
                 "begin"_a, "offsets"_a)
 
+        .def_property(
+            "follow_cache_enabled", &Process::follow_cache_enabled, &Process::set_follow_cache_enabled,
+                "When enabled, the pointers read by 'follow' are cached until the next invalidation.\n" \
+                "The cache is invalidated by 'invalidate', 'Hack.update' and by writes to the cached pointers.\n" \
+                "Enabling the cache resets the hit/miss counters of 'follow_cache_stats'.")
+
+        .def_property_readonly(
+            "follow_cache_stats", &Process::follow_cache_stats,
+                "Hit/miss statistics of the follow cache")
+
+        .def(
+            "invalidate", &Process::invalidate,
+                "Invalidate all of the pointers stored in the follow cache")
+
+        .def_property_readonly(
+            "buffer_pool", &Process::buffer_pool, py::return_value_policy::reference_internal,
+                "Pool that the memory of the buffers created for this process is allocated from")
+
         .def(
             "iter_regions", process_iter_regions,
                 "Iterate over the memory regions in the process", 
@@ -206,6 +270,11 @@ void define_address(py::module& m)
             "stop_auto_update", &Address::stop_auto_update,
                 "Turn off automatic loading for this address.")
 
+        .def_property(
+            "update_interval", &Address::update_interval, &Address::set_update_interval,
+                "Minimum number of seconds between two reloads of this address by Hack.update() or the background update thread.\n" \
+                "If 'update_interval=0' then the address is reloaded every update.")
+
         .def(
             "set_update_mask", &Address::set_update_mask,
                 "Set the mask used to determine whether this address will be loaded or not." \
@@ -230,8 +299,116 @@ void define_address(py::module& m)
 }
 
 
+void define_address_table(py::module& m)
+{
+    py::class_<AddressTable> table_class(m, "AddressTable", py::buffer_protocol());
+
+    table_class.def_buffer([](AddressTable& v) -> py::buffer_info {
+        return py::buffer_info(
+            (uptr*)v.values().data(),                // Pointer to buffer
+            py::ssize_t(sizeof(uptr)),               // Size of one scalar
+            py::format_descriptor<uptr>::format(),   // Python struct-style format descriptor
+            1,                                       // Number of dimensions
+            { py::ssize_t(v.values().size()) },      // Buffer dimensions
+            { py::ssize_t(sizeof(uptr)) },           // Stride (in bytes) for each dimension
+            true                                     // Read-only
+        );
+     });
+
+    table_class
+        .def("__str__", address_table_tostring)
+        .def("__len__", &AddressTable::size)
+
+        .def(
+            py::init<Hack&>(), py::keep_alive<1, 2>(),
+                "Create an empty address table. Each entry is a pointer path '[module + module_offset] + offsets' stored without creating an Address.",
+                "hack"_a)
+
+        .def_property_readonly(
+            "hack", &AddressTable::hack, py::return_value_policy::reference,
+                "The hack instance that this table belongs to")
+
+        .def_property_readonly(
+            "modules", &AddressTable::modules,
+                "The names of the modules referenced by the entries of this table")
+
+        .def_property_readonly(
+            "values", [](py::object self){ return py::memoryview(self); },
+                "A read-only view of the values loaded by 'load_all' (one pointer-sized integer per entry)")
+
+        .def(
+            "add", (void(AddressTable::*)(const string&, uptr, const uptr_path&))&AddressTable::add,
+                "Add an entry with the given module name, offset into the module and offset path",
+                "module_name"_a, "module_offset"_a, "offsets"_a)
+
+        .def(
+            "reserve", &AddressTable::reserve,
+                "Reserve space for the given number of entries and total number of offsets",
+                "n_entries"_a, "n_offsets"_a=0u)
+
+        .def(
+            "module_name", &AddressTable::module_name,
+                "The name of the module of the entry at the given index",
+                "index"_a)
+
+        .def(
+            "module_offset", &AddressTable::module_offset,
+                "The offset into the module of the entry at the given index",
+                "index"_a)
+
+        .def(
+            "offsets", &AddressTable::offsets,
+                "The offset path of the entry at the given index",
+                "index"_a)
+
+        .def(
+            "load_all", address_table_load_all,
+                "Load the values of all of the entries in the table into 'values'. Entries whose module is not loaded have a value of 0.\n" \
+                "If 'threaded' is true then large tables are loaded with multiple threads.",
+                "threaded"_a=true)
+
+        .def(
+            "filter", &AddressTable::filter, py::keep_alive<0, 1>(),
+                "Return a new table with only the entries for which 'mask' is True (one bool per entry)",
+                "mask"_a)
+
+        .def(
+            "filter_value", &AddressTable::filter_value, py::keep_alive<0, 1>(),
+                "Return a new table with only the entries whose loaded value is equal to 'value'",
+                "value"_a)
+
+        .def(
+            "to_address", &AddressTable::to_address, py::keep_alive<0, 1>(),
+                "Create a dynamic Address from the entry at the given index",
+                "index"_a);
+}
+
+
 void define_buffer(py::module& m)
 {    
+    py::class_<PyBufferView>(m, "BufferView", py::buffer_protocol())
+        .def_buffer(&PyBufferView::info)
+
+        .def_property_readonly(
+            "format", &PyBufferView::get_format,
+                "Python struct-style format descriptor of the elements of the view")
+
+        .def_property_readonly(
+            "itemsize", &PyBufferView::get_itemsize,
+                "Size of one element of the view in bytes")
+
+        .def_property_readonly(
+            "offset", &PyBufferView::get_offset,
+                "Offset of the first element of the view in the buffer")
+
+        .def_property_readonly(
+            "shape", &PyBufferView::get_shape,
+                "Number of elements of the view in each dimension")
+
+        .def_property_readonly(
+            "strides", &PyBufferView::get_strides,
+                "Stride in bytes of the view in each dimension");
+
     py::class_<Buffer> buffer_class(m, "Buffer", py::buffer_protocol());
     
     define_python_copy<Buffer>(buffer_class);
@@ -248,12 +425,12 @@ void define_buffer(py::module& m)
         .def("__str__", buffer_tostring)
         
         .def(
-            py::init<Hack&, usize>(), py::keep_alive<2, 1>(),
+            py::init<Hack&, usize>(), py::keep_alive<1, 2>(),
                 "Create a buffer of a given size", 
                 "Hack"_a, "size"_a)
 
         .def(
-            py::init<Buffer&, uptr, usize>(), py::keep_alive<2, 1>(),
+            py::init<Buffer&, uptr, usize>(), py::keep_alive<1, 2>(),
                 "Create a view into another buffer of the given size starting at the given offset",
                 "src"_a, "offset"_a, "size"_a)
 
@@ -329,7 +506,35 @@ void define_buffer(py::module& m)
         .def(
             "strlen", &Buffer::strlen,
                 "Count the number of non-null bytes starting at the given offset. Works the same as 'strnlen_s' in C.",
-                "offset"_a=0u);
+                "offset"_a=0u)
+
+        .def_property_readonly(
+            "dirty", &Buffer::is_dirty,
+                "True if any bytes have been modified by the write methods since the last read/flush")
+
+        .def(
+            "dirty_ranges", &Buffer::dirty_ranges,
+                "List of (offset, size) ranges modified by the write methods since the last read/flush, within the given range. If size=0, the range extends to the end of the buffer.",
+                "offset"_a=0u, "size"_a=0u)
+
+        .def(
+            "mark_dirty", &Buffer::mark_dirty,
+                "Mark the given range as modified so that it is written on the next flush. If size=0, the range extends to the end of the buffer.",
+                "offset"_a=0u, "size"_a=0u)
+
+        .def(
+            "view", [](py::object self, const string& dtype, uptr offset, std::vector<py::ssize_t> shape, std::vector<py::ssize_t> strides) { 
+                return PyBufferView(self, dtype, offset, std::move(shape), std::move(strides)); 
+            },
+                "Create a typed view of the buffer that exposes the buffer protocol without copying (e.g. for numpy.asarray).\n"
+                "'dtype' is a type name ('u32', 'float', 'float32', ...) or struct format character. If 'shape' is empty, the view spans the rest of the buffer.\n"
+                "If 'strides' is empty, the view is C-contiguous. Writes through the view are not tracked, see 'mark_dirty'.",
+                "dtype"_a, "offset"_a=0u, "shape"_a=std::vector<py::ssize_t>{}, "strides"_a=std::vector<py::ssize_t>{})
+
+        .def(
+            "clear_dirty", &Buffer::clear_dirty,
+                "Mark the given range as unmodified. If size=0, the range extends to the end of the buffer.",
+                "offset"_a=0u, "size"_a=0u);
 
     #define F(type, name) \
     buffer_class \
@@ -340,7 +545,14 @@ void define_buffer(py::module& m)
         .def( \
             "write_" name, &Buffer::write_value<type>, \
                 "Write a " name " to this buffer at the given offset",  \
-                "offset"_a, "value"_a);
+                "offset"_a, "value"_a) \
+        .def( \
+            "read_" name "_array", [](py::object self, uptr offset, usize count, usize stride) { \
+                return py::memoryview(py::cast(PyBufferView(self, name, offset, {py::ssize_t(count)}, {py::ssize_t(stride ? stride : sizeof(type))}))); \
+            }, \
+                "Return a memoryview of 'count' " name " values in this buffer starting at the given offset, without copying.\n" \
+                "If 'stride' is not 0, then consecutive values are 'stride' bytes apart (e.g. the same field of consecutive structs)", \
+                "offset"_a, "count"_a, "stride"_a=0u);
     
     FOR_EACH_INT_TYPE(F)
     
@@ -430,6 +642,13 @@ void define_hack(py::module& m)
     // Hack
     auto& hack_class = py::class_<Hack>(m, "Hack");
 
+    py::enum_<Hack::StlContainer>(hack_class, "StlContainer")
+        .value("Vector", Hack::StlContainer::VECTOR)
+        .value("List", Hack::StlContainer::LIST)
+        .value("Map", Hack::StlContainer::MAP)
+        .value("UnorderedMap", Hack::StlContainer::UNORDERED_MAP)
+        .export_values();
+
     hack_class
         .def("__str__", hack_tostring)
 
@@ -460,10 +679,11 @@ void define_hack(py::module& m)
                 "value"_a, "begin"_a, "size"_a = 1000u)
 
         .def(
-            "strlen", [](Hack& self, uptr begin, usize size){ return hack_find(self, 0, begin, size); },
-                "Scan for a null byte in a small memory region starting at 'begin' and spanning 'size' bytes." \
-                "If the value is not found, then '0' is returned, otherwise the address of the value is returned",
-                "begin"_a, "max_len"_a = 1000u)
+            "strlen", hack_strlen,
+                "Scan for a null terminator in a small memory region starting at 'begin' and spanning 'max_len' characters." \
+                "If 'wide=True', then the string is treated as UTF-16 and the terminator is a null 2-byte character.\n" \
+                "If the terminator is not found, then '0' is returned, otherwise the length of the string in characters is returned",
+                "begin"_a, "max_len"_a = 1000u, "wide"_a = false)
 
        .def(
             "scan", hack_scan,
@@ -475,11 +695,158 @@ void define_hack(py::module& m)
                 "Scan in a loop filtering results at every step by the value set in the previous step. See 'MemoryScan' for details.",
                 "scan"_a, "modify_func"_a)
 
+        .def(
+            "address", &Hack::address, py::return_value_policy::reference,
+                "Return the address with the given name, or None if no address has that name.\n" \
+                "If multiple addresses share a name, the first address that was given the name is returned.",
+                "name"_a)
+
+        .def(
+            "addresses", &Hack::addresses, py::return_value_policy::reference,
+                "Return the named addresses whose name starts with the given prefix, sorted by name",
+                "prefix"_a="")
+
+        .def(
+            "set_update_mask", &Hack::set_update_mask,
+                "Set the mask used to determine which auto-update addresses are loaded by 'update'.\n" \
+                "An address is loaded if (Hack.update_mask() & Address.update_mask()) != 0.",
+                "mask"_a = Address::UPDATE_ALL)
+
+        .def(
+            "update", hack_update,
+                "Reload all of the addresses that have auto-update turned on.\n" \
+                "Addresses are loaded in dependency order, so each parent address is resolved once before all of its children.\n" \
+                "Addresses with an 'update_interval' are only reloaded once their interval has elapsed.")
+
+        .def(
+            "next_update_in", &Hack::next_update_in,
+                "Number of seconds until the next auto-update address falls due (-1 if there are no auto-update addresses)")
+
+        .def(
+            "start_background_update", hack_start_background_update,
+                "Start updating the auto-update addresses on a background thread.\n" \
+                "Each address is reloaded when its 'update_interval' elapses, addresses that fall due together are loaded together.\n" \
+                "Addresses without an 'update_interval' are reloaded every 'interval' seconds.",
+                "interval"_a=0.001)
+
+        .def(
+            "stop_background_update", hack_stop_background_update,
+                "Stop the background update thread (no-op if it is not running)")
+
+        .def_property_readonly(
+            "background_update_running", &Hack::background_update_running,
+                "Is the background update thread running")
+
+        .def(
+            "sync_variables", &Hack::sync_variables,
+                "Copy the most recently published frame into the local storage of all registered variables without blocking.\n" \
+                "All variables are copied from the same frame. Returns the number of the frame (0 if nothing has been published yet).")
+
+        .def_property_readonly(
+            "frame", &Hack::frame,
+                "Number of the most recently published frame of registered variables")
+
+        .def(
+            "watch", hack_watch,
+                "Register the given variables to be read by 'update' and the background update thread, and compared with their previous values.\n" \
+                "Every time a variable changes, 'callback(variable, old_bytes, new_bytes)' is queued until 'dispatch_changes' is called.\n" \
+                "If 'callback=None', then 'dispatch_changes' returns the changes as a list of (variable, old_bytes, new_bytes) tuples instead.\n" \
+                "A variable can only belong to one watch, and cannot be watched while it is registered with 'register_variable'.\n" \
+                "Returns an id that can be passed to 'unwatch'.",
+                "variables"_a, "callback"_a=py::none(), "interval"_a=0.0)
+
+        .def(
+            "unwatch", hack_unwatch,
+                "Stop watching (and reading) the variables of the given watch id and discard their queued changes",
+                "watch"_a)
+
+        .def(
+            "dispatch_changes", hack_dispatch_changes,
+                "Call the callbacks of the queued changes of watched variables, in the order that they were detected.\n" \
+                "Returns the changes of variables watched without a callback. If 'max_changes' is not 0, at most 'max_changes' changes are processed.",
+                "max_changes"_a=0u)
+
         .def(
             "read_buffer", hack_read_buffer,
                 "Read the contents of memory at the given address into the given buffer",
                 "src"_a, "dst_buffer"_a)
 
+        .def(
+            "read_many", hack_read_many,
+                "Read 'size' bytes from each of the given addresses into consecutive slots of the given buffer, 'stride' bytes apart (default: 'size').\n" \
+                "Null and unreadable addresses are read as zeros. Returns the number of addresses that were read successfully.",
+                "src"_a, "dst_buffer"_a, "size"_a, "stride"_a=0u)
+
+        .def(
+            "read_buffers", hack_read_buffers,
+                "Read the memory at each of the given addresses into the corresponding buffer (scatter read).\n" \
+                "Null and unreadable addresses are read as zeros. Returns the number of addresses that were read successfully.",
+                "src"_a, "dst_buffers"_a)
+
+        .def(
+            "gather", hack_gather,
+                "Follow the pointer path 'offsets' from each of the given pointers, like a dynamic address, and read 'count' values of type 'dtype' at the end of each path.\n" \
+                "The pointers are a list of addresses, a buffer of pointers or a buffer variable of pointers (like arr[ptr, N]), and 'dtype' is a type name or a pygamehack type.\n" \
+                "Returns tuple(values, valid), typed memoryviews of the values (zeros for invalid elements) and of whether every read of the path of each element succeeded.\n" \
+                "If 'threaded' is true then large gathers are split across multiple threads.",
+                "src"_a, "offsets"_a, "dtype"_a, "count"_a=1u, "threaded"_a=false)
+
+        .def(
+            "walk_list", hack_walk_list,
+                "Follow the pointers at 'next_offset' in each node of the linked list starting at 'head', and read the 'node_size' bytes of each node\n" \
+                "into consecutive slots of the given buffer, which is resized to hold the nodes. Returns the addresses of the nodes in list order.\n" \
+                "The walk stops at a null pointer or 'sentinel', an unreadable node, the first node that has already been visited, or after 'max_nodes' nodes (if it is not 0).",
+                "head"_a, "next_offset"_a, "node_size"_a, "dst_buffer"_a, "max_nodes"_a=0u, "sentinel"_a=0u)
+
+        .def(
+            "walk_tree", hack_walk_tree,
+                "Follow the pointers at 'left_offset' and 'right_offset' in each node of the binary tree starting at 'root', and read the 'node_size' bytes\n" \
+                "of each node into consecutive slots of the given buffer, which is resized to hold the nodes. Returns the addresses of the nodes in breadth-first order.\n" \
+                "Null and 'sentinel' children, unreadable nodes and nodes that have already been visited are skipped, and at most 'max_nodes' nodes are read (if it is not 0).",
+                "root"_a, "left_offset"_a, "right_offset"_a, "node_size"_a, "dst_buffer"_a, "max_nodes"_a=0u, "sentinel"_a=0u)
+
+        .def(
+            "read_stl", hack_read_stl,
+                "Read the elements of the MSVC standard library container (release build layout) at the given address into the given buffer.\n" \
+                "The buffer is resized to hold the elements 'value_size' bytes apart, and the addresses of the elements are returned.\n" \
+                "At most the size of the container (or 'max_size' if it is not 0) elements are read, vectors with a single read and\n" \
+                "the other containers with one read per node. The traversal stops at the first node that has already been visited.\n" \
+                "Maps are read in key order, and unordered maps in bucket order.",
+                "container"_a, "src"_a, "dst_buffer"_a, "value_size"_a, "value_align"_a, "max_size"_a=0u)
+
+        .def(
+            "read_stl_strings", hack_read_stl_strings,
+                "Read the MSVC standard library strings (std::string when 'char_size=1', std::wstring when 'char_size=2') at the given addresses.\n" \
+                "Returns the contents of each string as bytes, at most 'max_size' characters if it is not 0. Unreadable strings are empty.",
+                "src"_a, "char_size"_a=1u, "max_size"_a=0u)
+
+        .def(
+            "read_sparse_array", hack_read_sparse_array,
+                "Read the first 'value_size' bytes of each of the 'count' elements 'stride' bytes apart at the given address into the given buffer.\n" \
+                "If 'flags' is not 0, it is the address of the allocation bit flags of the elements (Unreal Engine TSparseArray) and only allocated elements are read.\n" \
+                "The buffer is resized to hold the elements 'value_size' bytes apart, and the addresses of the elements are returned.",
+                "src"_a, "count"_a, "stride"_a, "flags"_a, "dst_buffer"_a, "value_size"_a)
+
+        .def(
+            "read_chunked_array", hack_read_chunked_array,
+                "Read the pointer at 'offset' in each of the 'count' elements 'stride' bytes apart of the chunked array at the given address,\n" \
+                "which is an array of pointers to chunks of 'chunk_size' elements (Unreal Engine FChunkedFixedUObjectArray).\n" \
+                "Each chunk is read with a single read. Elements in unreadable chunks are read as 0.",
+                "src"_a, "count"_a, "chunk_size"_a, "stride"_a, "offset"_a=0u)
+
+        .def(
+            "read_fnames", hack_read_fnames,
+                "Read the names of the given entry ids from the blocks of the Unreal Engine FNamePool at the given address (FNamePool::Entries::Blocks).\n" \
+                "The entries of each block are read with a single read, unless they are far apart or the memory between them is unreadable,\n" \
+                "in which case they are read one at a time. Unreadable entries are empty.",
+                "src"_a, "ids"_a, "stride"_a=2u)
+
+        .def(
+            "write_buffers", hack_write_buffers,
+                "Write each of the given buffers into the memory at the corresponding address, null addresses are skipped.\n" \
+                "Only the bytes modified since each buffer was last read or written are written, unless 'all' is true.",
+                "dst"_a, "src_buffers"_a, "all"_a=false)
+
         .def(
             "write_buffer", hack_write_buffer,
                 "Write the contents of the given buffer into memory at the given address",
@@ -528,6 +895,13 @@ void define_hack(py::module& m)
                 "Returns tuple(addresses, settings).",
                 "path"_a, "threaded"_a=true)
 
+        .def(
+            "cheat_engine_load_pointer_scan_table", hack_cheat_engine_load_pointer_scan_table,
+                "Load a CheatEngine PointerScan file from the given path into a compact AddressTable and corresponding settings for the file.\n" \
+                "This does not create an Address for each result, so it should be preferred for large pointer scans.\n" \
+                "Returns tuple(table, settings).",
+                "path"_a, "threaded"_a=true)
+
         .def(
             "cheat_engine_save_pointer_scan_file", hack_cheat_engine_save_pointer_scan_file,
                 "Save a list of addresses as a CheatEngine PointerScan file to the given path with the given settings.\n" \
@@ -551,6 +925,28 @@ void define_hack(py::module& m)
 }
 
 
+template<typename V>
+void define_hack_register_variable(py::module& m)
+{
+    auto hack_class = py::reinterpret_borrow<py::class_<Hack>>(m.attr("Hack"));
+
+    hack_class
+        .def(
+            "register_variable", hack_register_variable<V>,
+                "Register a variable to be read by 'update' and the background update thread.\n" \
+                "Reads are published as a frame, call 'sync_variables' to copy the latest frame into the local storage of the registered variables.\n" \
+                "If 'interval' is not 0, then the variable is only read once every 'interval' seconds. The variable is kept alive until it is unregistered.",
+                "variable"_a, "interval"_a=0.0)
+
+        .def(
+            "unregister_variable", hack_unregister_variable<V>,
+                "Stop reading the given variable in 'update' and the background update thread",
+                "variable"_a);
+
+    published_variable_converters().push_back(&published_variable_convert<V>);
+}
+
+
 template<typename Var>
 void define_const_variable(py::module& m, const char* type_name)
 {
@@ -608,6 +1004,8 @@ void define_variable(py::module& m, const char(&type_name)[N])
         .def(
             "reset", &Variable<T>::reset,
                 "Reset the value of the local storage to the default value when originally constructed");
+
+    define_hack_register_variable<Variable<T>>(m);
 }
 
 
@@ -638,15 +1036,24 @@ void define_variable_buffer(py::module& m, const char(&type_name)[N])
                 "address"_a, "size"_a)
 
         .def(
-            py::init<T&, uptr, usize>(), py::keep_alive<2, 1>(),
+            py::init<T&, uptr, usize>(), py::keep_alive<1, 2>(),
                 "Create a buffer view variable of the given size from the given parent buffer",
                 "parent"_a, "offset"_a, "size"_a)
 
         .def(
-            py::init([](PyVariableArray& parent, uptr offset, usize size){ return T((VariableBufferBase&)parent, offset, size); }), py::keep_alive<2, 1>(),
+            py::init([](PyVariableArray& parent, uptr offset, usize size){ return T((VariableBufferBase&)parent, offset, size); }), py::keep_alive<1, 2>(),
                 "Create a buffer view variable of the given size from the given parent buffer",
                 "parent"_a, "offset"_a, "size"_a)
 
+        .def(
+            py::init([](py::none, usize size, py::kwargs& kwargs){
+                py::object parent = kwargs["parent_buffer"];
+                VariableBufferBase& base = py::isinstance<PyVariableArray>(parent) ? (VariableBufferBase&)parent.cast<PyVariableArray&>() : (VariableBufferBase&)parent.cast<VariableBuffer&>();
+                return T(base, kwargs["offset_in_parent"].cast<uptr>(), size);
+            }),
+                "Create a buffer view variable of the given size from buffer view kwargs (parent_buffer, offset_in_parent), as done by arrays and buffer structs",
+                "address"_a, "size"_a)
+
         .def_property_readonly(
             "address", &T::address, py::return_value_policy::reference,
                 "Return the address associated to this variable")
@@ -679,13 +1086,25 @@ void define_variable_buffer(py::module& m, const char(&type_name)[N])
 
         .def(
             "flush", &T::flush,
-                "Write to the memory at the address of this variable from local storage. If size=0, the entire buffer is written.",
-                "size"_a=0, "offset"_a=0)
+                "Write the bytes modified in local storage since the last read/flush to the memory at the address of this variable. If size=0, the entire buffer is checked.\n"
+                "If 'all=True', then every byte in the range is written, which is required after modifying the buffer through the buffer protocol.",
+                "size"_a=0, "offset"_a=0, "all"_a=false)
 
         .def(
             "reset", &T::reset,
                 "Clear the memory of the local storage buffer");
 
+    // The frame of a pointer to buffer would hold the pointer rather than the memory that it points to
+    if constexpr(!std::is_same_v<T, VariablePtrToBuffer>) {
+        define_hack_register_variable<T>(m);
+    }
+
+    if constexpr(std::is_same_v<T, VariablePtrToBuffer>) {
+        variable_class
+            .def_property_readonly(
+                "pointer", &T::pointer,
+                    "Value of the pointer at the address of this variable, as of the last read/flush");
+    }
 
      if constexpr(std::is_same_v<T, VariableString>) {
          variable_class
@@ -763,7 +1182,8 @@ void define_variable_array(py::module& m, const char(&type_name)[N])
 
         .def(
             "read", &T::read, py::return_value_policy::reference,
-                "Read into local storage from the memory at the address of this variable and return the stored buffer. If n=0, the entire array is read.",
+                "Read into local storage from the memory at the address of this variable and return the stored buffer. If n=0, the entire array is read.\n"
+                "Elements of arrays of structs are views into local storage, so reading the array reads every element in a single read.",
                 "n"_a=0, "starting_at"_a=0)
 
         .def(
@@ -773,13 +1193,18 @@ void define_variable_array(py::module& m, const char(&type_name)[N])
 
         .def(
             "flush", &T::flush,
-                "Write to the memory at the address of this variable from local storage. If n=0, the entire array is written.",
-                "n"_a=0, "starting_at"_a=0)
+                "Write the elements modified in local storage since the last read/flush to the memory at the address of this variable. If n=0, the entire array is checked.\n"
+                "If 'all=True', then every element in the range is written.",
+                "n"_a=0, "starting_at"_a=0, "all"_a=false)
 
         .def(
             "reset", &T::reset,
                 "Clear the memory of the local storage buffer")
 
+        .def_property_readonly(
+            "value_type", &T::type,
+                "Type of the elements of this array")
+
         .def("__repr__", &T::tostring)
         .def("__len__", &T::length)
         .def("__iter__", &T::iter, py::keep_alive<0, 1>())
@@ -789,6 +1214,8 @@ void define_variable_array(py::module& m, const char(&type_name)[N])
         .def("__eq__", &T::operator==)
         .def("__ne__", &T::operator!=);
 
+    define_hack_register_variable<T>(m);
+
      string const_name = "c_" + string{type_name};
      define_const_variable<T>(m, const_name.c_str());
 }
@@ -798,7 +1225,7 @@ void define_variables(py::module& m)
 {   
     define_variable<Ptr>(m, "ptr");
     define_variable_buffer<VariableBuffer>(m, "buf");
-//    define_variable_buffer<VariablePtrToBuffer>(m, "p_buf");
+    define_variable_buffer<VariablePtrToBuffer>(m, "p_buf");
     define_variable_buffer<VariableString>(m, "str");
     define_variable_array<PyVariableArray>(m, "arr");
 
@@ -891,6 +1318,8 @@ PYBIND11_MODULE(c, m)
     
     define_address(m);
 
+    define_address_table(m);
+
     define_buffer(m);
 
     define_hack(m);
@@ -1015,8 +1444,8 @@ class Array(buf, IBufferContainerVariable):
         else:
             self._write_values(values, starting_at)
 
-    def flush(self, n: int = 0, starting_at: int = 0):
-        super().flush(n * self.__value_type.size, starting_at * self.__value_type.size)
+    def flush(self, n: int = 0, starting_at: int = 0, all: bool = False):
+        super().flush(n * self.__value_type.size, starting_at * self.__value_type.size, all)
 
     def reset(self):
         if self.__values is not None:
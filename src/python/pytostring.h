@@ -11,7 +11,7 @@ struct TypeName { const char* operator()() const noexcept { return ""; } };
 #define F(T, name) template<> struct TypeName<T> { const char* operator()() const noexcept { return name; } };
 
 F(Buffer, "buf")
-//F(PtrToBuffer, "p_buf")
+F(PtrToBuffer, "p_buf")
 FOR_EACH_INT_TYPE(F)
 
 #undef F
@@ -92,6 +92,14 @@ static constexpr auto address_tostring = [](Address& v)
     return s;
 };
 
+static constexpr auto address_table_tostring = [](AddressTable& v)
+{
+    string s{"AddressTable(size="};
+    s.append(std::to_string(v.size()));
+    s.append(")");
+    return s;
+};
+
 static constexpr auto buffer_tostring = [](Buffer& v)
 {
     string s{"Buffer(size="};
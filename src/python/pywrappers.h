@@ -8,8 +8,10 @@
 #include "../Hack.h"
 #include "../Buffer.h"
 #include "../Address.h"
+#include "../AddressTable.h"
 #include "../Variable.h"
 #include "../Instruction.h"
+#include "PyBufferView.h"
 
 namespace py = pybind11;
 
@@ -120,6 +122,16 @@ static constexpr auto buffer_write_string = [](Buffer& self, uptr offset, const
 
 //endregion
 
+//region Python wrappers - AddressTable
+
+static constexpr auto address_table_load_all = [](AddressTable& self, bool threaded)
+{
+    py::gil_scoped_release release;
+    self.load_all(threaded);
+};
+
+//endregion
+
 //region Python wrappers - Hack
 
 static constexpr auto hack_find = [](Hack& self, i64 value, uptr begin, usize size)
@@ -128,18 +140,241 @@ static constexpr auto hack_find = [](Hack& self, i64 value, uptr begin, usize si
     return self.find(i8(value), begin, size);
 };
 
+static constexpr auto hack_strlen = [](Hack& self, uptr begin, usize max_len, bool wide)
+{
+    py::gil_scoped_release release;
+    return self.strlen(begin, max_len, wide);
+};
+
 static constexpr auto hack_scan = [](Hack& self, Hack::Scan& scan)
 {
     py::gil_scoped_release release;
     return self.scan(scan);
 };
 
+static constexpr auto hack_update = [](Hack& self)
+{
+    py::gil_scoped_release release;
+    self.update();
+};
+
+static constexpr auto hack_start_background_update = [](Hack& self, double interval)
+{
+    py::gil_scoped_release release;
+    self.start_background_update(interval);
+};
+
+static constexpr auto hack_stop_background_update = [](Hack& self)
+{
+    py::gil_scoped_release release;
+    self.stop_background_update();
+};
+
+// Python objects kept alive by the hack are released with the GIL, because the hack may release them from a thread without it
+static std::shared_ptr<void> hack_python_owner(py::object object)
+{
+    return {new py::object(std::move(object)), [](void* p) {
+        py::gil_scoped_acquire acquire;
+        delete (py::object*)p;
+    }};
+}
+
+// The variable is kept alive by the hack until 'unregister_variable'
+template<typename V>
+static constexpr auto hack_register_variable = [](Hack& self, V& variable, double interval)
+{
+    std::shared_ptr<void> owner = hack_python_owner(py::cast(variable, py::return_value_policy::reference));
+    py::gil_scoped_release release;
+    self.register_variable(Hack::published(variable), interval, std::move(owner));
+};
+
+template<typename V>
+static constexpr auto hack_unregister_variable = [](Hack& self, V& variable)
+{
+    py::gil_scoped_release release;
+    self.unregister_variable(&variable);
+};
+
+// Every variable type that can be registered adds a converter, so that lists of mixed variable types can be watched
+using PublishedVariableConverter = bool(*)(py::handle, Hack::PublishedVariable&);
+
+static std::vector<PublishedVariableConverter>& published_variable_converters()
+{
+    static std::vector<PublishedVariableConverter> converters{};
+    return converters;
+}
+
+template<typename V>
+static bool published_variable_convert(py::handle variable, Hack::PublishedVariable& published)
+{
+    if (!py::isinstance<V>(variable)) return false;
+    published = Hack::published(variable.cast<V&>());
+    return true;
+}
+
+static constexpr auto hack_watch = [](Hack& self, const py::list& variables, const py::object& callback, double interval)
+{
+    std::vector<Hack::PublishedVariable> published(variables.size());
+    for (usize i = 0; i < variables.size(); ++i) {
+        auto& converters = published_variable_converters();
+        const bool converted = std::any_of(converters.begin(), converters.end(), [&](PublishedVariableConverter convert) { 
+            return convert(variables[i], published[i]); 
+        });
+        PGH_ASSERT(converted, "Can only watch variables that can be registered with 'register_variable'");
+    }
+
+    // The watched variables and the callback are kept alive by the hack until 'unwatch'
+    std::shared_ptr<void> owner = hack_python_owner(py::make_tuple(py::list(variables), callback));
+
+    py::gil_scoped_release release;
+    return self.watch(published, interval, std::move(owner));
+};
+
+static constexpr auto hack_unwatch = [](Hack& self, u32 watch)
+{
+    py::gil_scoped_release release;
+    self.unwatch(watch);
+};
+
+static constexpr auto hack_dispatch_changes = [](Hack& self, usize max_changes)
+{
+    std::vector<Hack::VariableChange> changes{};
+    {
+        py::gil_scoped_release release;
+        changes = self.take_changes(max_changes);
+    }
+
+    py::list queued{};
+    for (auto& change: changes) {
+        std::shared_ptr<void> owner = self.watch_owner(change.watch);
+        if (!owner) continue;
+
+        const py::tuple& watched = *(const py::tuple*)owner.get();
+        py::object variable = watched[0].cast<py::list>()[change.index];
+        py::bytes old_value{change.old_value}, new_value{change.new_value};
+
+        if (watched[1].is_none()) { queued.append(py::make_tuple(variable, old_value, new_value)); }
+        else { watched[1](variable, old_value, new_value); }
+    }
+    return queued;
+};
+
 static constexpr auto hack_read_buffer = [](Hack& self, uptr src, Buffer& dst)
 {
     py::gil_scoped_release release;
     return self.read_buffer(src, dst);
 };
 
+static constexpr auto hack_read_many = [](Hack& self, const std::vector<uptr>& src, Buffer& dst, usize size, usize stride)
+{
+    py::gil_scoped_release release;
+    return self.read_many(src, dst, size, stride);
+};
+
+static constexpr auto hack_read_buffers = [](Hack& self, const std::vector<uptr>& src, const std::vector<Buffer*>& dst)
+{
+    py::gil_scoped_release release;
+    return self.read_buffers(src, dst);
+};
+
+static constexpr auto hack_walk_list = [](Hack& self, uptr head, usize next_offset, usize node_size, Buffer& dst, usize max_nodes, uptr sentinel)
+{
+    py::gil_scoped_release release;
+    return self.walk_list(head, next_offset, node_size, dst, max_nodes, sentinel);
+};
+
+static constexpr auto hack_walk_tree = [](Hack& self, uptr root, usize left_offset, usize right_offset, usize node_size, Buffer& dst, usize max_nodes, uptr sentinel)
+{
+    py::gil_scoped_release release;
+    return self.walk_tree(root, left_offset, right_offset, node_size, dst, max_nodes, sentinel);
+};
+
+static constexpr auto hack_gather = [](Hack& self, py::object src, const uptr_path& offsets, py::object dtype, usize count, bool threaded)
+{
+    PGH_ASSERT(count, "Gather count must be greater than 0");
+
+    // The value type is a type name or a pygamehack type, pointer-sized types are read with the pointer size of the process
+    const usize p = self.process().get_ptr_size();
+    string type_name = py::isinstance<py::str>(dtype) ? dtype.cast<string>() : dtype.attr("__name__").cast<string>();
+    if (type_name == "ptr" || type_name == "usize") { type_name = p == 4 ? "u32" : "u64"; }
+    const usize size = std::get<1>(PyBufferView::parse_dtype(type_name)) * count;
+
+    // The pointers are a list of addresses, a buffer of pointers or a buffer variable of pointers (like arr[ptr, N])
+    if (!py::isinstance<Buffer>(src) && py::hasattr(src, "get") && py::isinstance<Buffer>(src.attr("get")())) { src = src.attr("get")(); }
+    std::vector<uptr> ptrs{};
+    if (py::isinstance<Buffer>(src)) {
+        const Buffer& buffer = src.cast<const Buffer&>();
+        ptrs.resize(buffer.size() / p);
+        for (usize i = 0; i < ptrs.size(); ++i) { memcpy(&ptrs[i], buffer.data() + i * p, p); }
+    }
+    else {
+        ptrs = src.cast<std::vector<uptr>>();
+    }
+
+    py::object values = py::cast(Buffer(self, std::max<usize>(1, ptrs.size() * size)));
+    py::object valid = py::cast(Buffer(self, std::max<usize>(1, ptrs.size())));
+    Buffer& values_buffer = values.cast<Buffer&>();
+    Buffer& valid_buffer = valid.cast<Buffer&>();
+    {
+        py::gil_scoped_release release;
+        self.gather(ptrs, offsets, values_buffer, valid_buffer, size, threaded);
+    }
+
+    std::vector<py::ssize_t> shape{py::ssize_t(ptrs.size())};
+    if (count > 1) { shape.push_back(py::ssize_t(count)); }
+    return py::make_tuple(
+        py::memoryview(py::cast(PyBufferView(values, type_name, 0, shape, {}))),
+        py::memoryview(py::cast(PyBufferView(valid, "bool", 0, {py::ssize_t(ptrs.size())}, {}))));
+};
+
+static constexpr auto hack_read_stl = [](Hack& self, Hack::StlContainer container, uptr src, Buffer& dst, usize value_size, usize value_align, usize max_size)
+{
+    py::gil_scoped_release release;
+    return self.read_stl(container, src, dst, value_size, value_align, max_size);
+};
+
+static constexpr auto hack_read_stl_strings = [](Hack& self, const std::vector<uptr>& src, usize char_size, usize max_size)
+{
+    std::vector<string> strings{};
+    {
+        py::gil_scoped_release release;
+        strings = self.read_stl_strings(src, char_size, max_size);
+    }
+    py::list result(strings.size());
+    for (usize i = 0; i < strings.size(); ++i) { result[i] = py::bytes(strings[i]); }
+    return result;
+};
+
+static constexpr auto hack_read_sparse_array = [](Hack& self, uptr src, usize count, usize stride, uptr flags, Buffer& dst, usize value_size)
+{
+    py::gil_scoped_release release;
+    return self.read_sparse_array(src, count, stride, flags, dst, value_size);
+};
+
+static constexpr auto hack_read_chunked_array = [](Hack& self, uptr src, usize count, usize chunk_size, usize stride, usize offset)
+{
+    py::gil_scoped_release release;
+    return self.read_chunked_array(src, count, chunk_size, stride, offset);
+};
+
+static constexpr auto hack_read_fnames = [](Hack& self, uptr src, const std::vector<u32>& ids, usize stride)
+{
+    std::vector<string> names{};
+    {
+        py::gil_scoped_release release;
+        names = self.read_fnames(src, ids, stride);
+    }
+    py::list result(names.size());
+    for (usize i = 0; i < names.size(); ++i) { result[i] = py::str(names[i]); }
+    return result;
+};
+
+static constexpr auto hack_write_buffers = [](Hack& self, const std::vector<uptr>& dst, const std::vector<Buffer*>& src, bool all)
+{
+    py::gil_scoped_release release;
+    return self.write_buffers(dst, src, all);
+};
+
 static constexpr auto hack_write_buffer = [](Hack& self, uptr dst, const Buffer& src)
 {
     py::gil_scoped_release release;
@@ -154,7 +389,7 @@ static constexpr auto hack_read_string = [](Hack& self, uptr src, usize size)
 
 static constexpr auto hack_read_dynamic_string = [](Hack& self, uptr src, usize size, usize max_len)
 {
-    return hack_read_string(self, src, size ? size : self.find(0, src, max_len));
+    return hack_read_string(self, src, size ? size : hack_strlen(self, src, max_len, false));
 };
 
 static constexpr auto hack_write_string = [](Hack& self, uptr dst, const string& data)
@@ -169,6 +404,12 @@ static constexpr auto hack_cheat_engine_load_pointer_scan_file = [](Hack& hack,
     return hack.cheat_engine_load_pointer_scan_file(path, threaded);
 };
 
+static constexpr auto hack_cheat_engine_load_pointer_scan_table = [](Hack& hack, const string& path, bool threaded)
+{
+    py::gil_scoped_release release;
+    return hack.cheat_engine_load_pointer_scan_table(path, threaded);
+};
+
 static constexpr auto hack_cheat_engine_save_pointer_scan_file = [](Hack& hack, const string& path, const Hack::CE::AddressPtrs& addresses, const Hack::CE::Settings& settings, bool single_file)
 {
     py::gil_scoped_release release;
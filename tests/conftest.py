@@ -11,6 +11,7 @@ class Dummy:
 
 def pytest_addoption(parser):
     parser.addoption("--no-gdb", action="store_true")
+    parser.addoption("--benchmark", action="store_true")
 
 
 def pytest_generate_tests(metafunc):
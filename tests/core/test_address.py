@@ -61,6 +61,36 @@ def test_address_dynamic_add_first_offset_to_parent(app):
         hack.detach()
 
 
+def test_address_names():
+    hack = gh.Hack()
+
+    player = gh.Address(hack, 0x1000)
+    player_health = gh.Address(player, [0x10], True)
+    enemy = gh.Address(hack, 0x2000)
+    player.name = 'player'
+    player_health.name = 'player.health'
+    enemy.name = 'enemy'
+
+    assert hack.address('player') is player
+    assert hack.address('player.health') is player_health
+    assert hack.address('missing') is None
+    assert hack.addresses('player') == [player, player_health]
+    assert hack.addresses() == [enemy, player, player_health]
+
+    # Renaming updates the index
+    enemy.name = 'boss'
+    assert hack.address('enemy') is None
+    assert hack.address('boss') is enemy
+
+    # The first address to take a name keeps it until it is renamed
+    other = gh.Address(hack, 0x3000)
+    other.name = 'player'
+    assert hack.address('player') is player
+    player.name = ''
+    assert hack.address('player') is other
+    assert hack.addresses('player') == [other, player_health]
+
+
 """
 def test_address_manual(hack, app):
     addr = gh.Address(hack, app.addr.marker)
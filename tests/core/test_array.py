@@ -63,6 +63,28 @@ def test_variable_array_write_basic(hack, app, reset_app):
             assert variable[i] == 4 - i
 
 
+def test_variable_array_read_structs(hack, app, reset_structs):
+    class Pair(gh.Struct):
+        first: gh.u32 = 0
+        second: gh.u32 = 4
+
+    for addr in app.addr.roots:
+        variable = gh.arr[Pair, 2](gh.Address(hack, addr + app.offsets.Basic.arr))
+
+        # Elements are views into the array, they are decoded without reading memory
+        element = variable[1]
+        assert element is variable[1]
+        assert element.first == 0
+
+        variable.read()
+        assert element.first == app.values.Basic.arr[2]
+        assert element.second == app.values.Basic.arr[3]
+        assert variable.as_records() == [
+            {'first': app.values.Basic.arr[0], 'second': app.values.Basic.arr[1]},
+            {'first': app.values.Basic.arr[2], 'second': app.values.Basic.arr[3]},
+        ]
+
+
 """
 # TODO: Better nested read test
 def test_variable_array_read_nested(hack, app):
@@ -1,3 +1,6 @@
+import copy
+import gc
+import weakref
 import pygamehack as gh
 import pytest
 
@@ -47,6 +50,129 @@ def test_buffer_create_incorrect():
     with pytest.raises(RuntimeError):
         buf2 = gh.Buffer(buf1, 16, 32)
 
+
+def test_buffer_dirty_ranges():
+    hack = gh.Hack()
+    buf1 = gh.Buffer(hack, 64)
+    assert not buf1.dirty
+
+    # Overlapping and adjacent writes are merged
+    buf1.write_u32(8, 1)
+    buf1.write_u32(12, 2)
+    buf1.write_u16(40, 3)
+    buf1.write_u64(4, 4)
+    assert buf1.dirty
+    assert buf1.dirty_ranges() == [(4, 12), (40, 2)]
+    assert buf1.dirty_ranges(10, 32) == [(10, 6), (40, 2)]
+
+    # Views share the dirty ranges of their parent
+    buf2 = gh.Buffer(buf1, 32, 32)
+    assert buf2.dirty_ranges() == [(8, 2)]
+    buf2.write_u8(0, 5)
+    assert buf1.dirty_ranges() == [(4, 12), (32, 1), (40, 2)]
+
+    buf1.clear_dirty(6, 30)
+    assert buf1.dirty_ranges() == [(4, 2), (40, 2)]
+    buf2.clear_dirty()
+    assert buf1.dirty_ranges() == [(4, 2)]
+
+    buf1.clear()
+    assert buf1.dirty_ranges() == [(0, 64)]
+
+
+def test_buffer_pool():
+    hack = gh.Hack()
+    pool = hack.process.buffer_pool
+    pool.trim()
+    assert pool.stats.cached_bytes == 0
+    assert pool.block_size(100) == 128
+
+    # Small buffers do not use the pool
+    allocations = pool.stats.allocations
+    gh.Buffer(hack, 16)
+    assert pool.stats.allocations == allocations
+
+    # Blocks of destroyed buffers are reused by buffers of the same size class
+    buf1 = gh.Buffer(hack, 100)
+    del buf1
+    assert pool.stats.cached_blocks == 1
+    assert pool.stats.cached_bytes == 128
+
+    buf2 = gh.Buffer(hack, 120)
+    assert pool.stats.reuses == 1
+    assert pool.stats.cached_blocks == 0
+    assert buf2.read_u32(0) == 0
+
+    # Resizing within the size class keeps the block
+    buf2.write_u32(0, 5)
+    buf2.resize(128)
+    assert pool.stats.cached_bytes == 0
+    buf2.resize(512)
+    assert buf2.read_u32(0) == 5
+    assert pool.stats.cached_bytes == 128
+    del buf2
+    assert pool.stats.cached_bytes == 128 + 512
+
+    # Disabled pools free blocks immediately
+    pool.enabled = False
+    assert pool.stats.cached_blocks == 0
+    buf3 = gh.Buffer(hack, 100)
+    del buf3
+    assert pool.stats.cached_blocks == 0
+    pool.enabled = True
+
+
+def test_buffer_pool_outlives_hack():
+    hack = gh.Hack()
+    hack_ref = weakref.ref(hack)
+    buf = gh.Buffer(hack, 100)
+    buf.write_u32(0, 5)
+    other = copy.copy(buf)
+
+    # Buffers keep their hack alive
+    del hack
+    gc.collect()
+    assert hack_ref() is not None
+    del buf
+    gc.collect()
+    assert hack_ref() is None
+
+    # Copies keep the pool of their process alive, so they can still allocate and release blocks
+    other.resize(512)
+    assert other.read_u32(0) == 5
+    del other
+    gc.collect()
+
+
+def test_buffer_typed_views():
+    hack = gh.Hack()
+    buf = gh.Buffer(hack, 64)
+    for i in range(16):
+        buf.write_u32(i * 4, i)
+
+    # Contiguous and strided arrays share the memory of the buffer
+    values = buf.read_u32_array(0, 4)
+    assert values.tolist() == [0, 1, 2, 3]
+    assert buf.read_u32_array(4, 4, stride=16).tolist() == [1, 5, 9, 13]
+    buf.write_u32(0, 100)
+    assert values[0] == 100
+    assert buf.read_u16_array(0, 2).tolist() == [100, 0]
+
+    # Views can be multi-dimensional and default to the rest of the buffer
+    view = buf.view('uint32', 8)
+    assert view.shape == [14] and view.strides == [4] and view.offset == 8
+    grid = memoryview(buf.view('u32', 0, [4, 4]))
+    assert grid.shape == (4, 4) and grid.strides == (16, 4)
+    assert grid.tolist()[1] == [4, 5, 6, 7]
+    assert memoryview(buf.view('float32')).format == 'f'
+
+    with pytest.raises(RuntimeError):
+        buf.read_u32_array(0, 17)
+    with pytest.raises(RuntimeError):
+        buf.read_u32_array(0, 2, stride=64)
+    with pytest.raises(RuntimeError):
+        buf.view('complex')
+
 # read_from/write_to
 # read_buffer/write_buffer
 
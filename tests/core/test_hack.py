@@ -1,4 +1,15 @@
+import sys
+import time
 import pygamehack as gh
+import pytest
+
+
+def wait_until(condition, timeout=5.0):
+    # Poll instead of sleeping for a fixed time, so slow machines do not fail and fast machines do not wait
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'Timed out waiting for the background update'
+        time.sleep(0.001)
 
 
 def test_hack_attach_detach(app):
@@ -27,11 +38,177 @@ def test_hack_attach_detach(app):
         assert not hack.process.attached
 
 
-def test_hack_find_strlen(hack, app):
+def test_hack_find_strlen(hack, app, reset_app):
     for addr in app.addr.roots:
         assert hack.find(app.values.Basic.i16, addr + app.offsets.Basic.i16, 32) == 0
         assert hack.find(app.values.Basic.i16, addr + app.offsets.Basic.i16 - 16, 32) == 16
         assert hack.strlen(addr + app.offsets.Basic.str) == len(app.values.Basic.str)
+        assert hack.strlen(addr + app.offsets.Basic.str, max_len=4) == 0
+
+        # UTF-16 terminators must be aligned to the start of the string
+        hack.write_string(addr + app.offsets.Basic.str, 'A\0B\0\0C\0\0')
+        assert hack.strlen(addr + app.offsets.Basic.str) == 1
+        assert hack.strlen(addr + app.offsets.Basic.str, wide=True) == 3
+
+
+def test_hack_update_dependency_order(hack, app, reset_app):
+    for addr in app.addr.roots:
+        hack.write_ptr(addr + app.offsets.Basic.ptr, addr)
+
+        root = gh.Address(hack, addr)
+        parent = gh.Address(root, [app.offsets.Basic.ptr, 0], True)
+        children = [gh.Address(parent, [getattr(app.offsets.Basic, name)], True) for name in ['u32', 'u64']]
+
+        # Children are registered before their parent, update must still resolve the parent first
+        for child in children:
+            child.auto_update()
+        parent.auto_update()
+
+        hack.update()
+
+        assert parent.loaded and parent.value == addr
+        assert children[0].value == addr + app.offsets.Basic.u32
+        assert children[1].value == addr + app.offsets.Basic.u64
+
+        for address in children + [parent]:
+            address.stop_auto_update()
+
+
+def test_hack_update_interval(hack, app):
+    for addr in app.addr.roots:
+        root = gh.Address(hack, addr)
+        fast = gh.Address(root, [app.offsets.Basic.u32], True)
+        slow = gh.Address(root, [app.offsets.Basic.u64], True)
+        slow.update_interval = 10.0
+        assert fast.update_interval == 0.0
+        assert slow.update_interval == 10.0
+
+        fast.auto_update()
+        slow.auto_update()
+        hack.update()
+        assert fast.value == addr + app.offsets.Basic.u32
+        assert slow.value == addr + app.offsets.Basic.u64
+
+        # Addresses are only reloaded once their interval has elapsed
+        fast.pop_offsets()
+        fast.add_offsets([app.offsets.Basic.i16])
+        slow.pop_offsets()
+        slow.add_offsets([app.offsets.Basic.i32])
+        hack.update()
+        assert fast.value == addr + app.offsets.Basic.i16
+        assert slow.value == addr + app.offsets.Basic.u64
+        assert hack.next_update_in() == 0.0
+
+        fast.stop_auto_update()
+        assert 0.0 < hack.next_update_in() <= 10.0
+
+        # Background thread
+        hack.start_background_update(0.001)
+        assert hack.background_update_running
+
+        other = gh.Address(root, [app.offsets.Basic.i8], True).auto_update()
+        wait_until(lambda: other.loaded)
+
+        hack.stop_background_update()
+        assert not hack.background_update_running
+        assert other.loaded and other.value == addr + app.offsets.Basic.i8
+
+        for address in [slow, other]:
+            address.stop_auto_update()
+
+
+def test_hack_published_variables(hack, app, reset_app):
+    assert hack.frame == 0
+    assert hack.sync_variables() == 0
+
+    for addr in app.addr.roots:
+        value = gh.u32(gh.Address(hack, addr + app.offsets.Basic.u32))
+        string = gh.str(gh.Address(hack, addr + app.offsets.Basic.str), 8)
+        hack.register_variable(value)
+        hack.register_variable(string, interval=10.0)
+
+        # Registered variables are only copied into local storage on sync
+        hack.update()
+        assert value.get() == 0
+        frame = hack.sync_variables()
+        assert frame == hack.frame
+        assert value.get() == app.values.Basic.u32
+        assert string.get() == app.values.Basic.str
+
+        hack.write_u32(addr + app.offsets.Basic.u32, 7)
+        hack.write_string(addr + app.offsets.Basic.str, 'AAAA')
+
+        # Wait for a frame that was published after the writes
+        hack.start_background_update(0.001)
+        wait_until(lambda: hack.frame > frame + 1)
+        hack.stop_background_update()
+
+        # The string is not due until its interval has elapsed
+        assert hack.sync_variables() > frame
+        assert value.get() == 7
+        assert string.get() == app.values.Basic.str
+
+        # Registered variables are kept alive by the hack until they are unregistered, 
+        # and by the published frames until frames without them have been published
+        references = sys.getrefcount(value)
+        hack.unregister_variable(value)
+        hack.unregister_variable(string)
+        assert sys.getrefcount(value) == references
+        frame = hack.sync_variables()
+        assert value.get() == 7
+        hack.update()
+        hack.update()
+        assert hack.sync_variables() > frame
+        assert sys.getrefcount(value) == references - 1
+
+
+def test_hack_watch_variables(hack, app, reset_app):
+    for addr in app.addr.roots:
+        value = gh.u32(gh.Address(hack, addr + app.offsets.Basic.u32))
+        string = gh.str(gh.Address(hack, addr + app.offsets.Basic.str), 8)
+        changes = []
+
+        callback_watch = hack.watch([value], lambda v, old, new: changes.append((v, old, new)))
+        queue_watch = hack.watch([string])
+
+        # Nothing has changed since the first frame
+        hack.update()
+        hack.update()
+        assert hack.dispatch_changes() == []
+        assert changes == []
+
+        hack.write_u32(addr + app.offsets.Basic.u32, 7)
+        hack.write_string(addr + app.offsets.Basic.str, 'AAAA')
+        hack.update()
+
+        queued = hack.dispatch_changes()
+        assert len(changes) == 1 and changes[0][0] is value
+        assert int.from_bytes(changes[0][1], 'little') == app.values.Basic.u32
+        assert int.from_bytes(changes[0][2], 'little') == 7
+        assert len(queued) == 1 and queued[0][0] is string
+        assert queued[0][2].startswith(b'AAAA')
+
+        # A variable belongs to at most one watch and cannot be registered while it is watched
+        with pytest.raises(RuntimeError):
+            hack.watch([value])
+        with pytest.raises(RuntimeError):
+            hack.register_variable(string)
+        other = gh.u32(gh.Address(hack, addr + app.offsets.Basic.u64))
+        with pytest.raises(RuntimeError):
+            hack.watch([other, other])
+
+        # Unwatched variables are no longer read, and are released once the frames that refer to them are replaced
+        references = sys.getrefcount(string)
+        hack.unwatch(callback_watch)
+        hack.unwatch(queue_watch)
+        frame = hack.sync_variables()
+        hack.write_u32(addr + app.offsets.Basic.u32, 8)
+        hack.update()
+        hack.update()
+        assert hack.sync_variables() > frame
+        assert hack.dispatch_changes() == []
+        assert len(changes) == 1
+        assert sys.getrefcount(string) == references - 1
 
 
 def test_hack_scan_type(hack, app):
@@ -138,6 +315,17 @@ def test_hack_read_buffer(hack, app):
     assert buffer.read_string() == "TestString"
 
 
+def test_hack_read_many(hack, app, reset_app):
+    o, roots = app.offsets.Basic, app.addr.roots
+
+    # Nearby addresses are read together in any order, null and unreadable addresses are read as zeros
+    addresses = [roots[0] + o.u64, 0, roots[0] + o.u32, 1, roots[1] + o.u32]
+    buffer = gh.Buffer(hack, 8 * len(addresses))
+    assert hack.read_many(addresses, buffer, 4, 8) == 3
+    values = [buffer.read_u32(8 * i) for i in range(len(addresses))]
+    assert values == [app.values.Basic.u64 & 0xFFFFFFFF, 0, app.values.Basic.u32, 0, app.values.Basic.u32]
+
+
 def test_hack_write_buffer(hack, app, set_cleanup):
     hack.attach(app.pid)
     
@@ -174,6 +362,273 @@ def test_hack_write_ptr(hack, app, set_cleanup):
     set_cleanup(cleanup)
 
 
+def test_hack_walk_list_and_tree(hack, app, set_cleanup):
+    hack.attach(app.pid)
+
+    # Three 24-byte nodes in the program memory: u32 value, then two pointers (next or left, and right)
+    root = app.addr.roots[0]
+    nodes = [root + i * 32 for i in range(3)]
+    original = gh.Buffer(hack, 3 * 32)
+    hack.read_buffer(root, original)
+    set_cleanup(lambda: hack.write_buffer(root, original))
+
+    for i, node in enumerate(nodes):
+        hack.write_u32(node, i + 1)
+
+    # The list loops back to its head, the walk stops at the first node that has already been visited
+    for node, next_node in zip(nodes, [nodes[2], nodes[0], nodes[1]]):
+        hack.write_ptr(node + 8, next_node)
+
+    buffer = gh.Buffer(hack, 1)
+    assert hack.walk_list(nodes[0], 8, 24, buffer) == [nodes[0], nodes[2], nodes[1]]
+    assert buffer.size == 3 * 24
+    assert buffer.read_u32_array(0, 3, 24).tolist() == [1, 3, 2]
+    assert hack.walk_list(nodes[0], 8, 24, buffer, max_nodes=2) == [nodes[0], nodes[2]]
+    assert hack.walk_list(nodes[0], 8, 24, buffer, sentinel=nodes[1]) == [nodes[0], nodes[2]]
+
+    # The tree is walked breadth-first, the left child of the last node points back at the root
+    for node, (left, right) in zip(nodes, [(nodes[1], nodes[2]), (0, 0), (nodes[0], 0)]):
+        hack.write_ptr(node + 8, left)
+        hack.write_ptr(node + 16, right)
+
+    assert hack.walk_tree(nodes[0], 8, 16, 24, buffer) == nodes
+    assert buffer.read_u32_array(0, 3, 24).tolist() == [1, 2, 3]
+    assert hack.walk_tree(nodes[0], 8, 16, 24, buffer, sentinel=nodes[2]) == nodes[:2]
+
+
+def test_hack_read_stl_sequences(hack, app, reset_app):
+    # Containers are built in the first 128 bytes of each program, the driver after them is updated by the program
+    p, r = hack.process.ptr_size, app.addr.roots
+    containers = gh.Hack.StlContainer
+    buffer = gh.Buffer(hack, 1)
+
+    # vector: _Myfirst, _Mylast, _Myend, the elements are read with one read
+    data = r[0] + 32
+    for i in range(3):
+        hack.write_u32(data + i * 4, (i + 1) * 10)
+    for i, v in enumerate([data, data + 12, data + 16]):
+        hack.write_ptr(r[0] + i * p, v)
+
+    assert hack.read_stl(containers.Vector, r[0], buffer, 4, 4) == [data, data + 4, data + 8]
+    assert buffer.read_u32_array(0, 3, 4).tolist() == [10, 20, 30]
+    assert hack.read_stl(containers.Vector, r[0], buffer, 4, 4, 2) == [data, data + 4]
+    hack.write_ptr(r[0] + p, data - 4)
+    assert hack.read_stl(containers.Vector, r[0], buffer, 4, 4) == [] and buffer.size == 0
+
+    # list: _Myhead, _Mysize, nodes are _Next, _Prev, _Myval and the last node points back at the head
+    head, nodes = r[1] + 16, [r[1] + 40 + i * 24 for i in range(3)]
+    hack.write_ptr(r[1], head)
+    hack.write_ptr(r[1] + p, 3)
+    for node, next_node, value in zip([head] + nodes, nodes + [head], [0, 1, 2, 3]):
+        hack.write_ptr(node, next_node)
+        hack.write_u32(node + 2 * p, value)
+
+    assert hack.read_stl(containers.List, r[1], buffer, 4, 4) == [n + 2 * p for n in nodes]
+    assert buffer.read_u32_array(0, 3, 4).tolist() == [1, 2, 3]
+    assert hack.read_stl(containers.List, r[1], buffer, 4, 4, 1) == [nodes[0] + 2 * p]
+    hack.write_ptr(r[1] + p, 2)
+    assert hack.read_stl(containers.List, r[1], buffer, 4, 4) == [n + 2 * p for n in nodes[:2]]
+
+    # A cycle that does not go through the head stops at the first node that has already been visited
+    hack.write_ptr(r[1] + p, 10)
+    hack.write_ptr(nodes[2], nodes[0])
+    assert hack.read_stl(containers.List, r[1], buffer, 4, 4) == [n + 2 * p for n in nodes]
+
+    # basic_string: union { _Buf[16], _Ptr }, _Mysize, _Myres, strings with a capacity below 16 bytes are stored inline
+    strings, heap = [r[2], r[2] + 32, r[2] + 64], r[2] + 96
+    for address, text, size, capacity in [(strings[0], 'short', 5, 15), (strings[2], 'h\0i\0', 2, 7)]:
+        hack.write_string(address, text)
+        hack.write_ptr(address + 16, size)
+        hack.write_ptr(address + 16 + p, capacity)
+    hack.write_string(heap, 'a longer heap string')
+    hack.write_ptr(strings[1], heap)
+    hack.write_ptr(strings[1] + 16, 20)
+    hack.write_ptr(strings[1] + 16 + p, 31)
+
+    assert hack.read_stl_strings(strings[:2] + [0]) == [b'short', b'a longer heap string', b'']
+    assert hack.read_stl_strings(strings[:2], max_size=3) == [b'sho', b'a l']
+    assert hack.read_stl_strings([strings[2]], 2) == ['hi'.encode('utf-16-le')]
+
+    # Strings with a size larger than their capacity are corrupt and read as empty
+    hack.write_ptr(strings[0] + 16, 16)
+    assert hack.read_stl_strings([strings[0]]) == [b'']
+
+
+def test_hack_read_stl_maps(hack, app, reset_app):
+    p, r = hack.process.ptr_size, app.addr.roots
+    containers = gh.Hack.StlContainer
+    buffer = gh.Buffer(hack, 1)
+
+    # map: _Myhead, _Mysize, nodes are _Left, _Parent, _Right, _Color, _Isnil, _Myval and the leaves point at the head.
+    # The nodes are stored in a different order than their keys, and the root is the last node
+    value_offset = (3 * p + 2 + 3) // 4 * 4
+    head, nodes = r[0], [r[0] + 32 * (i + 1) for i in range(3)]
+    keys = dict(zip(nodes, [3, 1, 2]))
+    root, left, right = nodes[2], nodes[1], nodes[0]
+    for node, (l, parent, rt) in [(head, (left, root, right)), (root, (left, head, right)),
+                                  (left, (head, root, head)), (right, (head, root, head))]:
+        for i, v in enumerate([l, parent, rt]):
+            hack.write_ptr(node + i * p, v)
+        hack.write_u8(node + 3 * p + 1, int(node == head))
+        hack.write_u32(node + value_offset, keys.get(node, 0))
+    hack.write_ptr(r[1], head)
+    hack.write_ptr(r[1] + p, 3)
+
+    # Elements are in key order
+    assert hack.read_stl(containers.Map, r[1], buffer, 4, 4) == [n + value_offset for n in [left, root, right]]
+    assert buffer.read_u32_array(0, 3, 4).tolist() == [1, 2, 3]
+    assert len(hack.read_stl(containers.Map, r[1], buffer, 4, 4, 2)) == 2
+
+    # A child that points back at the root is only visited once, and the traversal terminates
+    hack.write_ptr(right + 2 * p, root)
+    assert hack.read_stl(containers.Map, r[1], buffer, 4, 4) == [n + value_offset for n in [left, root, right]]
+
+    # unordered_map: _Max_bucket_size, list (_Myhead, _Mysize), _Vec (_Myfirst, _Mylast, _Myend), _Mask, _Maxidx.
+    # Each bucket is the first and last node of its elements in the list, empty buckets hold the head twice
+    header, buckets = r[1] + 16, r[1] + 16 + 5 * p
+    head, nodes = r[2], [r[2] + 24 * (i + 1) for i in range(3)]
+    for node, next_node, value in zip([head] + nodes, nodes + [head], [0, 1, 2, 3]):
+        hack.write_ptr(node, next_node)
+        hack.write_u32(node + 2 * p, value)
+    for i, v in enumerate([nodes[0], nodes[1], nodes[2], nodes[2], head, head]):
+        hack.write_ptr(buckets + i * p, v)
+    for i, v in enumerate([0, head, 3, buckets, buckets + 6 * p]):
+        hack.write_ptr(header + i * p, v)
+
+    # The next node of every bucket is read in each pass, so elements are in bucket order instead of list order
+    assert hack.read_stl(containers.UnorderedMap, header, buffer, 4, 4) == [n + 2 * p for n in [nodes[0], nodes[2], nodes[1]]]
+    assert buffer.read_u32_array(0, 3, 4).tolist() == [1, 3, 2]
+    assert len(hack.read_stl(containers.UnorderedMap, header, buffer, 4, 4, 1)) == 1
+
+    # Without readable buckets, the list is followed instead
+    hack.write_ptr(header + 3 * p, 0)
+    assert hack.read_stl(containers.UnorderedMap, header, buffer, 4, 4) == [n + 2 * p for n in nodes]
+
+
+def write_fname(hack, address, name, wide=False):
+    # FNameEntry: u16 header (bit 0: wide, bits 6-15: length), then the Latin-1 or UCS-2 characters
+    data = name.encode('utf-16-le' if wide else 'latin-1')
+    hack.write_u16(address, (len(name) << 6) | int(wide))
+    for i, c in enumerate(data):
+        hack.write_u8(address + 2 + i, c)
+
+
+def test_hack_read_unreal_containers(hack, app, reset_app):
+    # Containers are built in the first 128 bytes of each program, the driver after them is updated by the program
+    p, r = hack.process.ptr_size, app.addr.roots
+    buffer = gh.Buffer(hack, 1)
+
+    # Sparse array: 40 u16 elements, the allocation flags of elements 0, 31 and 33 are set
+    for i in range(40):
+        hack.write_u16(r[0] + 2 * i, i)
+    hack.write_u32(r[0] + 80, (1 << 31) | 1)
+    hack.write_u32(r[0] + 84, 1 << 1)
+
+    assert hack.read_sparse_array(r[0], 40, 2, r[0] + 80, buffer, 2) == [r[0], r[0] + 62, r[0] + 66]
+    assert buffer.read_u16_array(0, 3, 2).tolist() == [0, 31, 33]
+    assert hack.read_sparse_array(r[0], 40, 2, 0, buffer, 2) == [r[0] + 2 * i for i in range(40)]
+    assert buffer.read_u16_array(0, 40, 2).tolist() == list(range(40))
+    assert hack.read_sparse_array(r[0], 20, 4, 0, buffer, 2) == [r[0] + 4 * i for i in range(20)]
+    assert buffer.read_u16_array(0, 20, 2).tolist() == list(range(0, 40, 2))
+    assert hack.read_sparse_array(0, 40, 2, 0, buffer, 2) == [] and buffer.size == 0
+
+    # Chunked array: table of chunks of 2 elements of 2 pointers, the pointer is the second one and the middle chunk is null
+    chunks = [r[1] + 32, 0, r[1] + 32 + 4 * p]
+    for i, chunk in enumerate(chunks):
+        hack.write_ptr(r[1] + i * p, chunk)
+    for i, pointer in enumerate([0x1000, 0x1001, 0x5000]):
+        hack.write_ptr(r[1] + 32 + (2 * i + 1) * p, pointer)
+
+    assert hack.read_chunked_array(r[1], 5, 2, 2 * p, p) == [0x1000, 0x1001, 0, 0, 0x5000]
+    assert hack.read_chunked_array(r[1], 3, 2, 2 * p, p) == [0x1000, 0x1001, 0]
+    assert hack.read_chunked_array(0, 5, 2, 2 * p, p) == []
+
+    # FNamePool blocks: the entries of a block are read with a single read, ANSI names are Latin-1 and wide names UCS-2
+    blocks = [r[2] + 32, r[2] + 64, 0]
+    for i, block in enumerate(blocks):
+        hack.write_ptr(r[2] + i * p, block)
+    write_fname(hack, blocks[0], 'None')
+    write_fname(hack, blocks[0] + 6, 'Caf\xe9')
+    write_fname(hack, blocks[0] + 12, '\u03a9A', wide=True)
+    write_fname(hack, blocks[1], 'Second')
+
+    ids = [0, 3, 6, 1 << 16, 2 << 16]
+    assert hack.read_fnames(r[2], ids) == ['None', 'Caf\xe9', '\u03a9A', 'Second', '']
+    assert hack.read_fnames(r[2], [6, 0]) == ['\u03a9A', 'None']
+
+    # Entries of a block that are far apart (here in different programs) are read one at a time
+    lo, hi = min(r), max(r)
+    hack.write_ptr(lo, lo + 64)
+    write_fname(hack, lo + 64, 'Near')
+    write_fname(hack, hi + 64, 'Far')
+    assert hack.read_fnames(lo, [0, 1], hi - lo) == ['Near', 'Far']
+
+
+def test_hack_fname_pool_cache(hack, app, reset_app):
+    p, addr = hack.process.ptr_size, app.addr.roots[1]
+
+    # FNameEntryAllocator: FRWLock Lock, u32 CurrentBlock, u32 CurrentByteCursor, u8* Blocks[]
+    block = addr + 32
+    hack.write_ptr(addr + p + 8, block)
+    write_fname(hack, block, 'None')
+    write_fname(hack, block + 6, 'Caf\xe9')
+    write_fname(hack, block + 12, '\u03a9A', wide=True)
+
+    pool = gh.unreal.FNamePool(gh.Address(hack, addr), cache_size=2)
+    assert gh.unreal.FNamePool.of(hack) is pool
+    assert pool.entries([0, 3]) == ['None', 'Caf\xe9']
+    assert list(pool._cache) == [0, 3]
+
+    # Accessing a name makes it the most recently used, so the least recently used name is evicted first
+    assert pool[0] == 'None'
+    assert pool.name(6, 2) == '\u03a9A_1'
+    assert list(pool._cache) == [0, 6]
+
+    # Cached names are not read again, evicted names are
+    write_fname(hack, block, 'Nope')
+    write_fname(hack, block + 6, 'Cafe')
+    assert pool.names([0, 3]) == ['None', 'Cafe']
+    assert list(pool._cache) == [0, 3] and len(pool) == 2
+
+    # FNames are read into the scratch buffer of the pool, which is reused by every batch
+    hack.write_u32(addr + 96, 6)
+    hack.write_u32(addr + 100, 2)
+    assert gh.unreal.FName.decode(hack, [addr + 96]) == ['\u03a9A_1']
+    scratch = pool._scratch
+    assert gh.unreal.FName.decode(hack, [addr + 96, addr + 96]) == ['\u03a9A_1'] * 2
+    assert pool._scratch is scratch
+
+
+def test_hack_gather(hack, app, reset_app):
+    o, roots = app.offsets.Basic, app.addr.roots
+
+    # Null pointers are invalid and read as zeros
+    values, valid = hack.gather(roots + [0], [o.u32], gh.u32)
+    assert values.tolist() == [app.values.Basic.u32] * 3 + [0]
+    assert valid.tolist() == [True] * 3 + [False]
+
+    values, valid = hack.gather(roots, [o.f], 'float', count=2)
+    assert values.tolist() == [[app.values.Basic.f, 0.0]] * 3
+
+    # Paths are followed like dynamic addresses, every pointer along the path must be readable
+    hack.write_ptr(roots[0] + o.ptr, roots[1])
+    values, valid = hack.gather(roots, [o.ptr, o.u32], gh.u32)
+    assert values.tolist() == [app.values.Basic.u32, 0, 0]
+    assert valid.tolist() == [True, False, False]
+
+    # Arrays of pointers are gathered from their local storage, large gathers can be split across threads
+    hack.write_ptr(roots[0] + o.arr, roots[2])
+    pointers = gh.arr(gh.Address(hack, roots[0] + o.arr), 1, type=gh.ptr).read()
+    assert pointers.gather([o.i8], gh.i8)[0].tolist() == [app.values.Basic.i8]
+
+    buffer = gh.Buffer(hack, 3 * 4096 * hack.process.ptr_size)
+    for i in range(3 * 4096):
+        buffer.write_ptr(i * hack.process.ptr_size, roots[i % 3])
+    values, valid = hack.gather(buffer, [o.u64], gh.u64, threaded=True)
+    assert values.tolist() == [app.values.Basic.u64] * (3 * 4096)
+    assert all(valid)
+
+
 def test_hack_find(hack, app):
     hack.attach(app.pid)
 
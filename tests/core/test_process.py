@@ -35,9 +35,36 @@ def test_process_functionalities(app):
     with pytest.raises(RuntimeError):
         x = hack.process.get_base_address("SomeStupidModuleThatDoesntExist")
 
-# TODO: Test process follow
-# def test_process_follow(hack, app):
-#     pass
+def test_process_follow_cache(hack, app, reset_app):
+    for addr in app.addr.roots:
+        hack.write_ptr(addr + app.offsets.Basic.ptr, addr)
+        path = [app.offsets.Basic.ptr, app.offsets.Basic.u32]
+
+        assert not hack.process.follow_cache_enabled
+        assert hack.process.follow(addr, path) == addr + app.offsets.Basic.u32
+
+        hack.process.follow_cache_enabled = True
+        stats = hack.process.follow_cache_stats
+        assert (stats.hits, stats.misses, stats.size) == (0, 0, 0)
+
+        for _ in range(3):
+            assert hack.process.follow(addr, path) == addr + app.offsets.Basic.u32
+
+        stats = hack.process.follow_cache_stats
+        assert (stats.hits, stats.misses, stats.size) == (2, 1, 1)
+
+        # Explicit invalidation forces a new read
+        hack.process.invalidate()
+        assert hack.process.follow(addr, path) == addr + app.offsets.Basic.u32
+        assert hack.process.follow_cache_stats.misses == 2
+        assert hack.process.follow_cache_stats.generation == stats.generation + 1
+
+        # Writing to a cached pointer drops it from the cache
+        hack.write_ptr(addr + app.offsets.Basic.ptr, addr + app.offsets.Basic.i8)
+        assert hack.process.follow(addr, path) == addr + app.offsets.Basic.i8 + app.offsets.Basic.u32
+
+        hack.process.follow_cache_enabled = False
+
 
 # TODO: Test process follow
 # def test_process_iter_regions(hack, app):
@@ -6,7 +6,7 @@ from pygamehack.variable import IBufferVariable
 
 def test_buffer_variable_getitem():
     assert gh.buf[8] == (gh.buf, 8)
-    # assert gh.p_buf[8] == (gh.p_buf, 8)
+    assert gh.p_buf[8] == (gh.p_buf, 8)
 
 
 def test_i_buffer_variable_subclass(reset_structs):
@@ -97,6 +97,45 @@ def test_variable_basic_write(hack, app, set_cleanup):
     set_cleanup(cleanup)
 
 
+def test_variable_buffer_flush_dirty(hack, app, reset_app):
+    for addr in app.addr.roots:
+        variable = gh.buf(gh.Address(hack, addr), 64)
+        buffer = variable.read()
+        assert not buffer.dirty
+
+        # Bytes that were not written locally are not flushed, even if they changed in memory
+        buffer.write_u32(app.offsets.Basic.u32, 7)
+        hack.write_u64(addr + app.offsets.Basic.u64, 9)
+        variable.flush()
+        assert not buffer.dirty
+        assert hack.read_u32(addr + app.offsets.Basic.u32) == 7
+        assert hack.read_u64(addr + app.offsets.Basic.u64) == 9
+
+        # Flushing everything writes the stale local copy
+        variable.flush(all=True)
+        assert hack.read_u64(addr + app.offsets.Basic.u64) == app.values.Basic.u64
+
+
+def test_variable_ptr_to_buffer(hack, app, reset_app):
+    for addr in app.addr.roots:
+        hack.write_ptr(addr + app.offsets.Basic.ptr, addr)
+
+        # Pointer and pointee are read together
+        variable = gh.p_buf(gh.Address(hack, addr + app.offsets.Basic.ptr), 64)
+        buffer = variable.read()
+        assert variable.pointer == addr
+        assert buffer.read_u32(app.offsets.Basic.u32) == app.values.Basic.u32
+
+        # Only the modified bytes are written through the pointer
+        buffer.write_u32(app.offsets.Basic.u32, 7)
+        variable.flush()
+        assert hack.read_u32(addr + app.offsets.Basic.u32) == 7
+
+        # Elements of arrays of pointers are read through their pointer without creating an address
+        array = gh.arr[gh.p_buf[64], 1](gh.Address(hack, addr + app.offsets.Basic.ptr))
+        assert array[0].read_u32(app.offsets.Basic.u32) == 7
+
+
 def test_variable_buffer_read(hack, app):
     hack.attach(app.pid)
 
@@ -0,0 +1,120 @@
+import timeit
+import tracemalloc
+import pytest
+import pygamehack as gh
+
+
+def pytest_generate_tests(metafunc):
+    # Timings depend on the machine, so they are only measured when asked for with '--benchmark'
+    if "overhead" in metafunc.function.__name__:
+        if not metafunc.config.getoption("benchmark"):
+            pytest.skip('Skipping benchmark, run with --benchmark...')
+
+
+def per_access_ns(func, number=20000, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def closure_chain_property(index, offset, read):
+    # Reference for the accessors that the generated ones replaced:
+    # property -> field getter -> lazy variable check -> variable getter -> loaded check -> read
+    def read_variable(variable):
+        if not variable.address.loaded:
+            variable.address.load()
+        return variable.read()
+
+    def get_field(instance):
+        buffer = instance._buffer
+        if buffer is not None:
+            return read(buffer, offset)
+        return read_variable(instance._fields[index])
+
+    return property(lambda instance: get_field(instance))
+
+
+class ClosureChain:
+    __slots__ = ('_buffer', '_fields')
+
+    def __init__(self, buffer, fields):
+        self._buffer = buffer
+        self._fields = fields
+
+
+def test_struct_field_access_overhead(hack, app, reset_structs):
+    o = app.offsets.Basic
+
+    class Bench(gh.Struct):
+        u32: gh.u32 = o.u32
+        d: gh.double = o.d
+
+    ClosureChain.u32 = closure_chain_property(0, o.u32, gh.Buffer.read_u32)
+
+    addr = app.addr.roots[0]
+    buffered = Bench(gh.Address(hack, addr), buffer=True).read()
+    direct = Bench(gh.Address(hack, addr))
+    reference_buffered = ClosureChain(buffered.buffer.get(), [])
+    reference_direct = ClosureChain(None, [gh.u32(gh.Address(hack, addr + o.u32))])
+
+    assert buffered.u32 == direct.u32 == reference_buffered.u32 == reference_direct.u32 == app.values.Basic.u32
+
+    # The generated getters make the same reads as the closure chains that they replaced, with fewer Python calls
+    pairs = {
+        'Struct(buffer=True).u32': (lambda: buffered.u32, lambda: reference_buffered.u32),
+        'Struct.u32': (lambda: direct.u32, lambda: reference_direct.u32),
+    }
+
+    for name, (access, reference) in pairs.items():
+        access_ns, reference_ns = per_access_ns(access), per_access_ns(reference)
+        assert access_ns < reference_ns, f'{name} takes {access_ns:.1f} ns/access, the closure chain takes {reference_ns:.1f} ns/access'
+
+
+def per_instance_bytes(create, number=10000):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        instances = [create() for _ in range(number)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(instances) == number
+    return (after - before) / number
+
+
+class UnslottedLazyField:
+    def __init__(self, field, kwargs):
+        self.field = field
+        self.kwargs = kwargs
+
+
+class Unslotted:
+    # Reference for the instance layout that slots replaced: a '__dict__', a lazy field per field and per-instance getters and setters
+    def __init__(self, address, names, **kwargs):
+        self.address = address
+        self.variables = {}
+        self.size = 0
+        self._getters = [None for _ in names]
+        self._setters = [None for _ in names]
+        kwargs['parent_buffer'] = None
+        for name in names:
+            self.variables[name] = UnslottedLazyField(name, kwargs)
+
+
+def test_struct_instance_memory(hack, app, reset_structs):
+    o = app.offsets.Basic
+
+    class Bench(gh.Struct):
+        u32: gh.u32 = o.u32
+        d: gh.double = o.d
+
+    address = gh.Address(hack, app.addr.roots[0])
+    direct = Bench(address)
+
+    # Instances have a fixed layout and only store the variables of the fields that have been accessed
+    assert not hasattr(direct, '__dict__')
+    assert not hasattr(Bench.dataclass(), '__dict__')
+    assert direct.u32 == app.values.Basic.u32
+    assert list(direct.variables.materialised()) == [('u32', direct.variables['u32'])]
+
+    struct_bytes = per_instance_bytes(lambda: Bench(address))
+    reference_bytes = per_instance_bytes(lambda: Unslotted(address, ['u32', 'd']))
+    assert struct_bytes < reference_bytes, f'Struct takes {struct_bytes:.1f} bytes/instance, the unslotted layout takes {reference_bytes:.1f}'
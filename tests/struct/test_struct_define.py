@@ -1,5 +1,10 @@
+import gc
+import pickle
 import pytest
+import runpy
+import weakref
 import pygamehack as gh
+from pygamehack.struct_meta import StructDependencies
 
 
 #region Read/Write
@@ -88,6 +93,177 @@ def test_struct_read(hack, app, default_structs, basic_name_type_pairs):
             assert value == expected, 'Basic.' + name
 
 
+def test_struct_snapshot(hack, app, reset_app, reset_structs):
+    o = app.offsets.Basic
+
+    class Snapshot(gh.Struct):
+        u32: gh.u32 = o.u32
+        u64: gh.u64 = o.u64
+        ptr: gh.ptr[gh.u32] = o.ptr
+
+    addr = app.addr.roots[0]
+    hack.write_ptr(addr + o.ptr, addr)
+
+    # Direct fields are served from the snapshot until the next snapshot, which only holds the span of those fields
+    struct = Snapshot(gh.Address(hack, addr)).snapshot()
+    assert struct._snapshot.size == o.u64 + 8 - o.u32
+    assert struct.u32 == app.values.Basic.u32
+    assert struct.u64 == app.values.Basic.u64
+    hack.write_u32(addr + o.u32, 7)
+    assert struct.u32 == app.values.Basic.u32
+    assert struct.read(mode='snapshot').u32 == 7
+
+    # Pointer fields are followed from memory
+    hack.write_u32(addr, 11)
+    assert struct.ptr == 11
+
+    # Writes go to memory and to the snapshot
+    struct.u64 = 12
+    assert struct.u64 == 12
+    assert hack.read_u64(addr + o.u64) == 12
+
+    hack.write_u32(addr + o.u32, 13)
+    assert struct.snapshot(False).u32 == 13
+
+    # Snapshots belong to their struct, so structs created every frame do not accumulate buffers
+    other = Snapshot(gh.Address(hack, addr)).snapshot()
+    snapshot = weakref.ref(other._snapshot)
+    del other
+    gc.collect()
+    assert snapshot() is None
+
+    with pytest.raises(RuntimeError):
+        Snapshot(gh.Address(hack, addr), buffer=True).snapshot()
+
+
+def test_struct_read_flush_depth(hack, app, reset_app, reset_structs):
+    o = app.offsets.Basic
+
+    class Inner(gh.Struct):
+        u32: gh.u32 = o.u32
+
+    class Node(gh.Struct):
+        inner: Inner = 0x0
+        u64: gh.u64 = o.u64
+        next: gh.ptr['Node'] = o.ptr
+
+    # The node points at itself, so every depth reads the same memory into a new child buffer
+    addr = app.addr.roots[0]
+    hack.write_ptr(addr + o.ptr, addr)
+
+    node = Node(gh.Address(hack, addr), buffer=True).read(depth=2)
+    assert node.inner.u32 == app.values.Basic.u32
+    assert node.next.u64 == app.values.Basic.u64
+    assert node.next.next.inner.u32 == app.values.Basic.u32
+
+    hack.write_u64(addr + o.u64, 5)
+    assert node.next.u64 == app.values.Basic.u64
+    node.read(depth=1)
+    assert node.u64 == 5
+    assert node.next.u64 == 5
+    assert node.next.next.u64 == app.values.Basic.u64
+
+    # Only the modified bytes of the children up to the given depth are written
+    node.next.u64 = 6
+    node.next.next.inner.u32 = 7
+    node.flush(depth=1)
+    assert hack.read_u64(addr + o.u64) == 6
+    assert hack.read_u32(addr + o.u32) == app.values.Basic.u32
+    node.flush(depth=2)
+    assert hack.read_u32(addr + o.u32) == 7
+
+
+def test_struct_pointer_to_buffer(hack, app, reset_app, reset_structs):
+    o = app.offsets.Basic
+
+    class Holder(gh.Struct):
+        u32: gh.u32 = o.u32
+        data: gh.p_buf[64] = o.ptr
+
+    assert Holder.size == o.ptr + hack.process.ptr_size
+
+    for addr in app.addr.roots:
+        hack.write_ptr(addr + o.ptr, addr)
+
+        # Struct with an address, the pointer and the memory it points to are read when the field is accessed
+        holder = Holder(gh.Address(hack, addr))
+        assert holder.data.read_u32(o.u32) == app.values.Basic.u32
+        hack.write_u32(addr + o.u32, 7)
+        assert holder.data.read_u32(o.u32) == 7
+        assert holder.variables['data'].pointer == addr
+
+        # Buffer struct, the buffer is read and flushed with the pointers to structs of 'read/flush(depth=1)'
+        buffered = Holder(gh.Address(hack, addr), buffer=True).read()
+        assert buffered.data.size == 64
+        assert buffered.data.read_u32(o.u32) == 0
+        buffered.read(depth=1)
+        assert buffered.data.read_u32(o.u32) == 7
+
+        buffered.data.write_u32(o.u32, 8)
+        buffered.flush(depth=1)
+        assert hack.read_u32(addr + o.u32) == 8
+
+
+def test_struct_msvc_struct_elements(hack, app, reset_app, reset_structs):
+    class Entry(gh.Struct):
+        id: gh.u32 = 0x0
+        value: gh.u32 = 0x4
+
+    class Entries(gh.Struct):
+        entries: gh.msvc.vector[Entry] = 0x0
+
+    p, addr = hack.process.ptr_size, app.addr.roots[0]
+    data = addr + 32
+    for i in range(3):
+        hack.write_u32(data + i * 8, i + 1)
+        hack.write_u32(data + i * 8 + 4, (i + 1) * 10)
+    for i, v in enumerate([data, data + 24, data + 24]):
+        hack.write_ptr(addr + i * p, v)
+
+    # Struct elements are views of the local storage of the container, without an address of their own
+    entries = Entries(gh.Address(hack, addr)).entries.read()
+    assert [(e.id, e.value) for e in entries] == [(1, 10), (2, 20), (3, 30)]
+    assert all(e.address is None for e in entries)
+
+    hack.write_u32(data, 5)
+    assert entries.read()[0].id == 5
+
+
+def test_struct_read_records(hack, app, reset_structs):
+    np = pytest.importorskip('numpy')
+    o = app.offsets.Basic
+
+    class Record(gh.Struct):
+        u32: gh.u32 = o.u32
+        u64: gh.u64 = o.u64
+        ptr: gh.ptr[gh.u32] = o.ptr
+
+    for addr in app.addr.roots:
+        hack.write_ptr(addr + o.ptr, addr)
+
+    # One struct from each address, null addresses read as zeros
+    records = hack.read_records(Record, app.addr.roots + [0])
+    assert isinstance(records, np.recarray)
+    assert len(records) == len(app.addr.roots) + 1
+    assert list(records.u32[:-1]) == [app.values.Basic.u32] * len(app.addr.roots)
+    assert list(records.u64[:-1]) == [app.values.Basic.u64] * len(app.addr.roots)
+    assert list(records.ptr[:-1]) == app.addr.roots
+    assert records[-1].u32 == 0 and records[-1].ptr == 0
+
+    # Strided structs from a base address
+    records = hack.read_records(Record, app.addr.roots[0], 1, Record.size + 16)
+    assert records.dtype.itemsize == Record.size + 16
+    assert records[0].u32 == app.values.Basic.u32
+
+    # Records can be read into a buffer that is reused across calls
+    buffer = gh.Buffer(hack, Record.size * len(app.addr.roots))
+    records = hack.read_records(Record, app.addr.roots, buffer=buffer)
+    assert list(records.u32) == [app.values.Basic.u32] * len(app.addr.roots)
+    assert buffer.read_u32(o.u32) == app.values.Basic.u32
+    with pytest.raises(RuntimeError):
+        hack.read_records(Record, app.addr.roots + [0], buffer=buffer)
+
+
 #endregion
 
 #region Write
@@ -184,6 +360,40 @@ def test_define_struct_circular_dependency(hack, reset_structs):
     assert isinstance(b.a, TypeA)
 
 
+def test_define_struct_dependency_resolution(hack, reset_structs):
+
+    class Defined(gh.Struct):
+        value: gh.u32 = 0x0
+
+    # Structs that were declared in an earlier batch resolve forward declarations immediately
+    class Parent(gh.Struct):
+        child: 'Defined' = 0x0
+
+    assert isinstance(Parent(gh.Address(hack, 0)).child, Defined)
+
+    # Undeclared types are reported by the struct that refers to them
+    class Waiting(gh.Struct):
+        missing: 'Missing' = 0x0
+
+    with pytest.raises(RuntimeError, match="Waiting -> 'Missing'"):
+        Waiting(gh.Address(hack, 0))
+
+    class Missing(gh.Struct):
+        value: gh.u32 = 0x0
+
+    assert isinstance(Waiting(gh.Address(hack, 0)).missing, Missing)
+
+    # Definitions come after their dependencies, definitions in a cycle stay together in their original order
+    names = ['a', 'b', 'c', 'd', 'e', 'f']
+    StructDependencies.sort(names, {'a': {'c'}, 'c': {'d'}, 'e': {'f'}, 'f': {'e'}}, get_key=lambda k: k)
+    assert names == ['b', 'd', 'e', 'f', 'c', 'a']
+
+    # Definitions that depend on a cycle come after every definition in the cycle
+    names = ['a', 'b', 'c', 'd', 'e', 'f']
+    StructDependencies.sort(names, {'a': {'c'}, 'b': {'f'}, 'c': {'d'}, 'e': {'f'}, 'f': {'e'}}, get_key=lambda k: k)
+    assert names == ['d', 'e', 'f', 'c', 'b', 'a']
+
+
 def test_struct_derived_class(arch, default_structs, reset_structs):
     class Derived(default_structs.Basic):
         pass
@@ -212,6 +422,182 @@ def test_user_defined_struct_type(hack, reset_structs):
     assert isinstance(parent.fwd, int)
 
 
+def test_define_struct_dtype(reset_structs):
+    np = pytest.importorskip('numpy')
+
+    class Child(gh.Struct):
+        f: gh.float = 0x0
+        d: gh.double = 0x8
+
+    class Parent(gh.Struct):
+        b: gh.bool = 0x0
+        i16: gh.i16 = 0x2
+        name: gh.str[8] = 0x4
+        p: gh.ptr[gh.u32] = 0x10
+        child: Child = 0x18
+
+    for arch, ptr_type in [(32, np.uint32), (64, np.uint64)]:
+        dtype = Parent.dtype(arch)
+        assert dtype.itemsize == gh.Struct.struct(Parent, arch).size
+        assert dtype.names == ('b', 'i16', 'name', 'p', 'child')
+        assert dtype.fields['i16'] == (np.dtype(np.int16), 0x2)
+        assert dtype.fields['name'] == (np.dtype('S8'), 0x4)
+        assert dtype.fields['p'] == (np.dtype(ptr_type), 0x10)
+        assert dtype.fields['child'][0].fields['d'] == (np.dtype(np.float64), 0x8)
+        assert Parent.dtype(arch, 64).itemsize == 64
+
+    class WithArray(gh.Struct):
+        values: gh.arr[gh.u32, 4] = 0x0
+
+    with pytest.raises(RuntimeError):
+        WithArray.dtype(64)
+    with pytest.raises(RuntimeError):
+        Parent.dtype(64, 4)
+
+
+def test_define_struct_lazy_architecture(reset_structs):
+    class Lazy(gh.Struct):
+        value: gh.u32 = 0x0
+        ptr: gh.usize = 0x8
+
+    class LazyParent(gh.Struct):
+        lazy: Lazy = 0x0
+
+    # Definitions are only parsed when they are first used with an architecture
+    assert gh.Struct.struct(LazyParent, 64).size == 0x10
+    assert Lazy.size == 0x10
+    assert gh.Struct.named('Lazy', 32).size == 0xC
+    assert gh.Struct.struct(LazyParent, 32).size == 0xC
+
+    # The size is the largest of every architecture, so it parses the definitions that are still pending
+    class LazySized(gh.Struct):
+        value: gh.u32 = 0x0
+        ptr: gh.usize = 0x8
+
+    assert LazySized.size == 0x10
+    assert gh.Struct.named('LazySized', 32).size == 0xC
+
+
+def test_define_struct_msvc_containers(reset_structs):
+    class Entry(gh.Struct):
+        id: gh.u32 = 0x0
+        value: gh.double = 0x8
+
+    class Name(gh.Struct):
+        name: gh.msvc.string = 0x0
+
+    class Ids(gh.Struct):
+        ids: gh.msvc.vector[gh.u32] = 0x0
+
+    class Entries(gh.Struct):
+        entries: gh.msvc.map[gh.u32, Entry] = 0x0
+
+    class Lookup(gh.Struct):
+        lookup: gh.msvc.unordered_map[gh.u64, gh.msvc.wstring] = 0x0
+
+    # Container fields have the size of the container object in the process, not the size of its elements
+    for arch, p in [(32, 4), (64, 8)]:
+        sizes = [gh.Struct.struct(t, arch).size for t in [Name, Ids, Entries, Lookup]]
+        assert sizes == [16 + 2 * p, 3 * p, 2 * p, 8 * p]
+
+    # Map elements are std::pair<const Key, Value>, where the value is aligned after the key
+    assert gh.msvc._layout(gh.msvc.pair(gh.u32, Entry), 4) == (24, 8)
+    assert gh.msvc._layout(gh.msvc.pair(gh.u32, gh.msvc.string), 4) == (28, 4)
+    assert gh.msvc._layout(gh.msvc.pair(gh.u64, gh.msvc.wstring), 8) == (40, 8)
+
+
+def test_define_struct_unreal_containers(reset_structs):
+    class Row(gh.Struct):
+        id: gh.u32 = 0x0
+        value: gh.double = 0x8
+
+    class Actor(gh.Struct):
+        name: gh.unreal.FName = 0x18
+        children: gh.unreal.TArray[gh.ptr[Row]] = 0x20
+        rows: gh.unreal.TMap[gh.unreal.FName, Row] = 0x30
+        tags: gh.unreal.TSet[gh.unreal.FName] = 0x90
+
+    # TArray is a pointer and two i32, TSet and TMap are a sparse array, bit array and hash
+    assert gh.Struct.struct(Actor, 32).size == 0x90 + 0x3C
+    assert gh.Struct.struct(Actor, 64).size == 0x90 + 0x50
+
+    # FNames are two i32, so they are 4-byte aligned on both architectures
+    assert gh.msvc._layout(gh.msvc.pair(gh.unreal.FName, gh.u32), 8) == (12, 4)
+    assert gh.msvc._layout(gh.msvc.pair(gh.unreal.FName, Row), 8) == (24, 8)
+    assert gh.unreal.FUObjectArray.item_size(4) == 16
+    assert gh.unreal.FUObjectArray.item_size(8) == 24
+
+
+CACHED_STRUCTS_SRC = """
+import pygamehack as gh
+
+
+class CachedChild(gh.Struct):
+    value: gh.u32 = 0x4
+
+
+class CachedParent(gh.Struct):
+    child: 'CachedChild' = 0x8
+    ptr: gh.ptr[gh.u64] = 0x10
+"""
+
+
+def test_define_struct_cache(tmp_path, reset_structs):
+    path = tmp_path / 'cached_structs.py'
+
+    def define(src):
+        path.write_text(src)
+        gh.Struct.clear_types()
+        with gh.Struct.cached(str(path)) as cache:
+            namespace = runpy.run_path(str(path))
+        parent = namespace['CachedParent']
+        return cache.hit, [(gh.Struct.struct(parent, a).offsets, gh.Struct.struct(parent, a).size) for a in [32, 64]]
+
+    # The first definition is parsed and stored, the second is loaded from the cache
+    hit, definitions = define(CACHED_STRUCTS_SRC)
+    assert not hit
+    assert (tmp_path / '__pycache__' / 'cached_structs.pygamehack.cache').exists()
+    assert define(CACHED_STRUCTS_SRC) == (True, definitions)
+    assert definitions[1] == ({'child': [0x8], 'ptr': [0x10, 0]}, 0x18)
+
+    # Changing the file invalidates the cache
+    hit, changed = define(CACHED_STRUCTS_SRC.replace('0x10', '0x20'))
+    assert not hit
+    assert changed[1][0]['ptr'] == [0x20, 0]
+
+    # Corrupt files and entries that cannot be loaded are misses, and are replaced by the parsed definitions
+    cache_path = tmp_path / '__pycache__' / 'cached_structs.pygamehack.cache'
+    cache_path.write_bytes(b'\x80\x04corrupt')
+    assert define(CACHED_STRUCTS_SRC) == (False, definitions)
+
+    cached = pickle.loads(cache_path.read_bytes())
+    cached['classes']['CachedChild']['code'] = b'not bytecode'
+    cache_path.write_bytes(pickle.dumps(cached))
+    assert define(CACHED_STRUCTS_SRC) == (False, definitions)
+    assert define(CACHED_STRUCTS_SRC) == (True, definitions)
+
+
+def test_define_struct_cache_other_files(tmp_path, reset_structs):
+    path = tmp_path / 'cached_structs.py'
+    other_path = tmp_path / 'cached_other.py'
+    path.write_text(CACHED_STRUCTS_SRC.replace("'CachedChild'", "'CachedOther'"))
+
+    def define(other_src):
+        other_path.write_text(other_src)
+        gh.Struct.clear_types()
+        with gh.Struct.cached(str(path)) as cache:
+            runpy.run_path(str(other_path))
+            namespace = runpy.run_path(str(path))
+        assert gh.Struct.struct(namespace['CachedParent'], 64) is not None
+        return cache.hit, gh.Struct.named('CachedOther', 64).offsets
+
+    # Structs declared in other files inside of the context are part of the key
+    other_src = CACHED_STRUCTS_SRC.replace('CachedChild', 'CachedOther').split('class CachedParent')[0]
+    assert define(other_src) == (False, {'value': [0x4]})
+    assert define(other_src) == (True, {'value': [0x4]})
+    assert define(other_src.replace('0x4', '0x20')) == (False, {'value': [0x20]})
+
+
 #endregion
 
 #region Incorrect
@@ -83,6 +83,32 @@ def test_hack_cheat_engine_load_pointer_scan_file_compressed(pointer_scan_file_r
     assert settings.ends_with_offsets == []
 
 
+def test_hack_cheat_engine_load_pointer_scan_table(pointer_scan_file_read, pointer_scan_file_offsets):
+    hack = gh.Hack()
+
+    table, settings = hack.cheat_engine_load_pointer_scan_table(pointer_scan_file_read, True)
+    assert len(table) == len(pointer_scan_file_offsets)
+    assert table.modules == ['TestProgram-64.exe']
+    for i in range(len(table)):
+        assert table.module_name(i) == 'TestProgram-64.exe'
+        assert table.module_offset(i) == pointer_scan_file_offsets[i]
+    assert settings.max_level == 7
+
+    # Modules of an unattached process are never loaded
+    table.load_all()
+    assert table.values.tolist() == [0] * len(table)
+    assert len(table.filter_value(0)) == len(table)
+
+    filtered = table.filter([i % 2 == 0 for i in range(len(table))])
+    assert len(filtered) == (len(table) + 1) // 2
+    assert filtered.module_offset(1) == pointer_scan_file_offsets[2]
+
+    address = filtered.to_address(1)
+    assert address.type == gh.Address.Type.Dynamic
+    assert address.parent.module_offset == pointer_scan_file_offsets[2]
+    assert address.offsets == filtered.offsets(1)
+
+
 def test_hack_cheat_engine_save_pointer_scan_file_compressed(pointer_scan_file_write, pointer_scan_file_offsets):
     hack = gh.Hack()
 